@@ -0,0 +1,20 @@
+# Generated by Django 5.1.3 on 2026-10-18 07:03
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookmarks', '0002_alter_postbookmark_id'),
+        ('posts', '0013_added_post_comment_count'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='postbookmark',
+            index=models.Index(fields=['user', '-created_at'], name='bookmarks_user_created_idx'),
+        ),
+    ]
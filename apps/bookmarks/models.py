@@ -15,6 +15,9 @@ class PostBookmark(AbstractBookmark):
     class Meta:
         ordering = ['-created_at',]
         unique_together = ['post', 'user']
+        indexes = [
+            models.Index(fields=['user', '-created_at'], name='bookmarks_user_created_idx'),
+        ]
         verbose_name = 'Post Bookmark'
         verbose_name_plural = 'Post Bookmarks'
 
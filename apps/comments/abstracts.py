@@ -4,8 +4,11 @@ from django.contrib.auth.models import User
 
 from django.core.validators import MinValueValidator, MaxValueValidator
 
+from core.html import HTML_VERSION, content_hash, render_text
 from core.models import TimeStampedModel
 
+REMOVED_MESSAGE = "This comment has been removed"
+
 
 class AbstractComment(TimeStampedModel):
     user = models.ForeignKey(
@@ -15,6 +18,9 @@ class AbstractComment(TimeStampedModel):
         related_name="%(class)s_comments",
     )
     _comment = models.TextField(max_length=3000)
+    comment_html = models.TextField(blank=True, default='', editable=False)
+    comment_hash = models.CharField(max_length=64, blank=True, default='', editable=False)
+    html_version = models.PositiveSmallIntegerField(default=0, editable=False)
     is_removed = models.BooleanField(
         default=False,
         help_text='Check this box if the comment is inappropriate. '
@@ -38,10 +44,39 @@ class AbstractComment(TimeStampedModel):
     def _get_comment(self):
         comment = self._comment
         if self.is_removed:
-            comment = "This comment has been removed"
+            comment = REMOVED_MESSAGE
         return comment
     comment = property(_get_comment)
 
+    def _get_comment_html(self):
+        if self.is_removed:
+            return render_text(REMOVED_MESSAGE)
+        return self.comment_html
+
+    def render_comment(self):
+        """
+        Renders the comment HTML unless it was already rendered from the same
+        text with the current rules. Returns whether it was rendered.
+        """
+        digest = content_hash(self._comment)
+        if digest == self.comment_hash and self.html_version == HTML_VERSION:
+            return False
+        self.comment_html = render_text(self._comment)
+        self.comment_hash = digest
+        self.html_version = HTML_VERSION
+        return True
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if '_comment' not in self.get_deferred_fields() and (
+                update_fields is None or '_comment' in update_fields):
+            self.render_comment()
+            if update_fields is not None:
+                kwargs['update_fields'] = {
+                    *update_fields, 'comment_html', 'comment_hash', 'html_version'
+                }
+        super().save(*args, **kwargs)
+
 
 class AbstractCommentVote(TimeStampedModel):
     user = models.ForeignKey(
@@ -0,0 +1,52 @@
+# Generated by Django 5.1.3 on 2026-10-18 05:43
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def remove_redundant_votes(apps, schema_editor):
+    """
+    Keeps only the most recent vote of each user on a comment and drops
+    votes of 0.
+    """
+    PostCommentVote = apps.get_model('comments', 'PostCommentVote')
+    duplicates = PostCommentVote.objects.values('post_comment', 'user')\
+        .annotate(total=Count('pk')).filter(total__gt=1).order_by()
+    for row in duplicates:
+        votes = PostCommentVote.objects.filter(
+            post_comment=row['post_comment'], user=row['user'])
+        keep = votes.order_by('-updated_at', '-pk').values_list('pk', flat=True).first()
+        votes.exclude(pk=keep).delete()
+    PostCommentVote.objects.filter(vote=0).delete()
+
+
+def count_scores(apps, schema_editor):
+    PostComment = apps.get_model('comments', 'PostComment')
+    PostCommentVote = apps.get_model('comments', 'PostCommentVote')
+    rows = PostCommentVote.objects.values('post_comment')\
+        .annotate(total=Sum('vote')).order_by()
+    for row in rows:
+        PostComment.objects.filter(pk=row['post_comment']).update(score=row['total'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('comments', '0003_alter_postcomment_id_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='postcomment',
+            name='score',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(remove_redundant_votes, migrations.RunPython.noop),
+        migrations.RunPython(count_scores, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='postcommentvote',
+            constraint=models.UniqueConstraint(fields=('post_comment', 'user'), name='comments_postcommentvote_unique_voter'),
+        ),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 5.1.3 on 2026-10-18 06:37
+
+import hashlib
+
+from django.db import migrations, models
+from django.utils.html import linebreaks
+
+# The comment renderer as of this migration (HTML_VERSION 1), see core.html
+HTML_VERSION = 1
+
+
+def content_hash(text):
+    return hashlib.sha256((text or '').encode('utf-8')).hexdigest()
+
+
+def render_html(apps, schema_editor):
+    PostComment = apps.get_model('comments', 'PostComment')
+    fields = ['comment_html', 'comment_hash', 'html_version']
+    comments = []
+    for comment in PostComment.objects.only('pk', '_comment').iterator():
+        comment.comment_html = linebreaks(comment._comment or '', autoescape=True)
+        comment.comment_hash = content_hash(comment._comment)
+        comment.html_version = HTML_VERSION
+        comments.append(comment)
+        if len(comments) == 500:
+            PostComment.objects.bulk_update(comments, fields)
+            comments = []
+    PostComment.objects.bulk_update(comments, fields)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('comments', '0004_added_comment_score'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='postcomment',
+            name='comment_hash',
+            field=models.CharField(blank=True, default='', editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='postcomment',
+            name='comment_html',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        migrations.AddField(
+            model_name='postcomment',
+            name='html_version',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(render_html, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,75 @@
+# Generated by Django 5.1.3 on 2026-10-18 06:43
+
+import string
+
+from django.conf import settings
+from django.db import migrations, models
+
+# The path format as of this migration, see comments.paths
+SEGMENT_LENGTH = 7
+DIGITS = string.digits + string.ascii_lowercase
+
+
+def path_segment(pk):
+    segment = ''
+    rest = pk
+    while rest:
+        rest, digit = divmod(rest, len(DIGITS))
+        segment = DIGITS[digit] + segment
+    if len(segment) > SEGMENT_LENGTH:
+        raise ValueError(f'Comment id {pk} does not fit in a path segment')
+    return segment.rjust(SEGMENT_LENGTH, '0')
+
+
+def compute_paths(apps, schema_editor):
+    PostComment = apps.get_model('comments', 'PostComment')
+    parents = dict(PostComment.objects.values_list('pk', 'parent_id'))
+    paths = {}
+    depths = {}
+
+    def resolve(pk):
+        chain = []
+        while pk is not None and pk not in paths:
+            chain.append(pk)
+            pk = parents[pk]
+        for node in reversed(chain):
+            parent = parents[node]
+            if parent is None:
+                paths[node], depths[node] = path_segment(node), 0
+            else:
+                paths[node] = paths[parent] + path_segment(node)
+                depths[node] = depths[parent] + 1
+
+    for pk in parents:
+        resolve(pk)
+    comments = [
+        PostComment(pk=pk, path=paths[pk], depth=depths[pk]) for pk in sorted(parents)
+    ]
+    PostComment.objects.bulk_update(comments, ['path', 'depth'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('comments', '0005_added_rendered_html'),
+        ('posts', '0012_added_rendered_html'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='postcomment',
+            name='depth',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='postcomment',
+            name='path',
+            field=models.TextField(blank=True, default='', editable=False, help_text='Ids of the ancestors and of the comment, see comments.paths'),
+        ),
+        migrations.RunPython(compute_paths, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='postcomment',
+            index=models.Index(fields=['post', 'path'], name='comments_comment_path_idx'),
+        ),
+    ]
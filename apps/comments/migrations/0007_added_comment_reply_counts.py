@@ -0,0 +1,51 @@
+# Generated by Django 5.1.3 on 2026-10-18 06:48
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def count_replies(apps, schema_editor):
+    PostComment = apps.get_model('comments', 'PostComment')
+
+    def count(replies):
+        return Coalesce(Subquery(
+            replies.filter(is_removed=False)
+            .order_by()
+            .annotate(total=Count('pk'))
+            .values('total')[:1]
+        ), Value(0))
+
+    PostComment.objects.update(
+        child_count=count(
+            PostComment.objects.filter(parent=OuterRef('pk')).values('parent')
+        ),
+        descendant_count=count(
+            PostComment.objects.filter(
+                post=OuterRef('post'),
+                path__startswith=OuterRef('path'),
+                path__gt=OuterRef('path'),
+            ).values('post')
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('comments', '0006_added_comment_paths'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='postcomment',
+            name='child_count',
+            field=models.PositiveIntegerField(default=0, help_text='Replies that are not removed'),
+        ),
+        migrations.AddField(
+            model_name='postcomment',
+            name='descendant_count',
+            field=models.PositiveIntegerField(default=0, help_text='Replies at any depth that are not removed'),
+        ),
+        migrations.RunPython(count_replies, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,103 @@
+# Generated by Django 5.1.3 on 2026-10-18 06:56
+
+import math
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+# The sort key formulas as of this migration, see comments.ranking
+WILSON_Z = 1.281551565545
+
+
+def best_rank(upvotes, downvotes):
+    total = upvotes + downvotes
+    if not total:
+        return 0.0
+    share = upvotes / total
+    z2 = WILSON_Z * WILSON_Z
+    bound = (
+        share + z2 / (2 * total)
+        - WILSON_Z * math.sqrt((share * (1 - share) + z2 / (4 * total)) / total)
+    ) / (1 + z2 / total)
+    return round(bound, 7)
+
+
+def controversy(upvotes, downvotes):
+    if upvotes <= 0 or downvotes <= 0:
+        return 0.0
+    balance = min(upvotes, downvotes) / max(upvotes, downvotes)
+    return round((upvotes + downvotes) ** balance, 7)
+
+
+def compute_ranks(apps, schema_editor):
+    PostComment = apps.get_model('comments', 'PostComment')
+    PostCommentVote = apps.get_model('comments', 'PostCommentVote')
+
+    def vote_count(value):
+        votes = PostCommentVote.objects\
+            .filter(post_comment=OuterRef('pk'), vote=value)\
+            .order_by()\
+            .values('post_comment')\
+            .annotate(total=Count('pk'))\
+            .values('total')
+        return Coalesce(Subquery(votes), Value(0))
+
+    PostComment.objects.update(upvotes=vote_count(1), downvotes=vote_count(-1))
+    comments = []
+    for comment in PostComment.objects.filter(upvotes__gt=0)\
+            .only('pk', 'upvotes', 'downvotes').iterator():
+        comment.best_rank = best_rank(comment.upvotes, comment.downvotes)
+        comment.controversy = controversy(comment.upvotes, comment.downvotes)
+        comments.append(comment)
+    PostComment.objects.bulk_update(comments, ['best_rank', 'controversy'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('comments', '0007_added_comment_reply_counts'),
+        ('posts', '0013_added_post_comment_count'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='postcomment',
+            name='best_rank',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name='postcomment',
+            name='controversy',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name='postcomment',
+            name='downvotes',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='postcomment',
+            name='upvotes',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(compute_ranks, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='postcomment',
+            index=models.Index(fields=['post', 'parent', '-best_rank', '-id'], name='comments_comment_best_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='postcomment',
+            index=models.Index(fields=['post', 'parent', '-score', '-id'], name='comments_comment_top_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='postcomment',
+            index=models.Index(fields=['post', 'parent', '-created_at', '-id'], name='comments_comment_new_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='postcomment',
+            index=models.Index(fields=['post', 'parent', '-controversy', '-id'], name='comments_comment_contro_idx'),
+        ),
+    ]
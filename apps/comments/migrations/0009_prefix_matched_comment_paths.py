@@ -0,0 +1,24 @@
+# Generated by Django 5.1.3 on 2026-10-18 07:22
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('comments', '0008_added_comment_ranks'),
+        ('posts', '0014_added_hot_query_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='postcomment',
+            name='comments_comment_path_idx',
+        ),
+        migrations.AddIndex(
+            model_name='postcomment',
+            index=models.Index(fields=['post', 'path'], name='comments_comment_path_idx', opclasses=['int8_ops', 'text_pattern_ops']),
+        ),
+    ]
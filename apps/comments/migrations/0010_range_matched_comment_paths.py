@@ -0,0 +1,24 @@
+# Generated by Django 5.1.3 on 2026-10-18 07:52
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('comments', '0009_prefix_matched_comment_paths'),
+        ('posts', '0015_added_group_public_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='postcomment',
+            name='comments_comment_path_idx',
+        ),
+        migrations.AddIndex(
+            model_name='postcomment',
+            index=models.Index(fields=['post', 'path'], name='comments_comment_path_idx'),
+        ),
+    ]
@@ -1,11 +1,18 @@
-from django.db import models
-from django.db.models import Sum
+from collections import defaultdict
+
+from django.db import models, transaction
+from django.db.models import F, Value
+from django.db.models.functions import Concat, Substr
 
 from comments.abstracts import AbstractComment, AbstractCommentVote
+from comments.paths import ancestor_ids, path_segment, subtree_filter
+from comments.ranking import best_rank, controversy
+from core.models import StoredCountersMixin
+from core.services import vote_deltas
 from posts.models import Post
 
 
-class PostComment(AbstractComment):
+class PostComment(StoredCountersMixin, AbstractComment):
     post = models.ForeignKey(
         Post,
         verbose_name='post',
@@ -18,22 +25,168 @@ class PostComment(AbstractComment):
         related_name="comments",
         on_delete=models.CASCADE
     )
+    score = models.IntegerField(default=0)
+    upvotes = models.PositiveIntegerField(default=0)
+    downvotes = models.PositiveIntegerField(default=0)
+    best_rank = models.FloatField(default=0)
+    controversy = models.FloatField(default=0)
+    path = models.TextField(
+        blank=True, default='', editable=False,
+        help_text='Ids of the ancestors and of the comment, see comments.paths'
+    )
+    depth = models.PositiveSmallIntegerField(default=0, editable=False)
+    child_count = models.PositiveIntegerField(
+        default=0,
+        help_text='Replies that are not removed'
+    )
+    descendant_count = models.PositiveIntegerField(
+        default=0,
+        help_text='Replies at any depth that are not removed'
+    )
+
+    STORED_COUNTERS = (
+        'score', 'upvotes', 'downvotes', 'best_rank', 'controversy',
+        'child_count', 'descendant_count'
+    )
 
     class Meta:
         ordering = ['created_at',]
         verbose_name = "Post Comment"
         verbose_name_plural = "Post Comments"
+        indexes = [
+            models.Index(fields=['post', 'path'], name='comments_comment_path_idx'),
+            models.Index(fields=['post', 'parent', '-best_rank', '-id'], name='comments_comment_best_idx'),
+            models.Index(fields=['post', 'parent', '-score', '-id'], name='comments_comment_top_idx'),
+            models.Index(fields=['post', 'parent', '-created_at', '-id'], name='comments_comment_new_idx'),
+            models.Index(
+                fields=['post', 'parent', '-controversy', '-id'],
+                name='comments_comment_contro_idx'
+            ),
+        ]
 
     def __str__(self):
         return f"Comment: {self.post.title} by {self.user.username}"
 
-    def _get_score(self):
-        score = 0
-        votes = PostCommentVote.objects.filter(post_comment=self)
-        if votes.exists():
-    	    score = votes.aggregate(Sum('vote'))['vote__sum'] or 0
-        return score
-    score = property(_get_score)
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        stored = dict(zip(field_names, values))
+        instance._stored_parent_id = stored.get('parent_id')
+        instance._stored_is_removed = stored.get('is_removed')
+        return instance
+
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        moved = not adding and hasattr(self, '_stored_parent_id')\
+            and self.parent_id != self._stored_parent_id
+        if moved and self.parent_id is not None\
+                and self.parent.path.startswith(self.path):
+            raise ValueError('A comment cannot be moved under its own replies')
+        if adding:
+            self.depth = self.parent.depth + 1 if self.parent_id else 0
+        was_shown = not getattr(self, '_stored_is_removed', self.is_removed)
+        path = self.path
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if adding:
+                self.path = self.parent_path() + path_segment(self.pk)
+                PostComment.objects.filter(pk=self.pk).update(path=self.path)
+                if not self.is_removed:
+                    self.shift_reply_counts([(self.path, 1, 1)])
+                    Post.shift_counters({self.post_id: {'comment_count': 1}})
+            else:
+                if moved:
+                    self.move_subtree()
+                if moved or was_shown != (not self.is_removed):
+                    shown = int(not self.is_removed)
+                    self.shift_reply_counts([
+                        (path, -int(was_shown), -(self.descendant_count + was_shown)),
+                        (self.path, shown, self.descendant_count + shown),
+                    ])
+                    Post.shift_counters({self.post_id: {'comment_count': shown - was_shown}})
+        self._stored_parent_id = self.parent_id
+        self._stored_is_removed = self.is_removed
+
+    @classmethod
+    def shift_reply_counts(cls, changes):
+        """
+        Shifts the stored reply counts of the ancestors of comments with one
+        UPDATE. ``changes`` holds (path, replies, descendants) triples: the
+        parent of the comment at ``path`` gets ``replies`` more children and
+        every ancestor ``descendants`` more descendants.
+        """
+        deltas = defaultdict(lambda: {'child_count': 0, 'descendant_count': 0})
+        for path, replies, descendants in changes:
+            ids = ancestor_ids(path)
+            for pk in ids:
+                deltas[pk]['descendant_count'] += descendants
+            if ids:
+                deltas[ids[-1]]['child_count'] += replies
+        return cls.shift_counters(deltas)
+
+    def parent_path(self):
+        return self.parent.path if self.parent_id else ''
+
+    def move_subtree(self):
+        """
+        Rewrites the paths and depths of the comment and its replies after
+        its parent changed.
+        """
+        path = self.parent_path() + path_segment(self.pk)
+        depth = self.parent.depth + 1 if self.parent_id else 0
+        PostComment.objects\
+            .filter(post_id=self.post_id, **subtree_filter(self.path))\
+            .update(
+                path=Concat(Value(path), Substr('path', len(self.path) + 1)),
+                depth=F('depth') + (depth - self.depth)
+            )
+        self.path, self.depth = path, depth
+
+    def subtree(self):
+        """
+        Returns the comment and all its replies, in path order.
+        """
+        return PostComment.objects\
+            .filter(post_id=self.post_id, **subtree_filter(self.path))\
+            .order_by('path')
+
+    @classmethod
+    def refresh_ranks(cls, comment_ids):
+        """
+        Recomputes the stored sort keys of the given comments from their
+        vote counters.
+        """
+        comments = list(
+            cls.objects.filter(pk__in=comment_ids)
+            .only('pk', 'upvotes', 'downvotes')
+        )
+        for comment in comments:
+            comment.best_rank = best_rank(comment.upvotes, comment.downvotes)
+            comment.controversy = controversy(comment.upvotes, comment.downvotes)
+        cls.objects.bulk_update(comments, ['best_rank', 'controversy'])
+        return len(comments)
+
+    @classmethod
+    def apply_vote_change(cls, comment_id, previous, current):
+        """
+        Shift the stored vote counters of a comment for a vote going from
+        ``previous`` to ``current``, where 0 means no vote.
+        """
+        cls.apply_vote_deltas({comment_id: vote_deltas(previous, current)})
+
+    @classmethod
+    def apply_vote_deltas(cls, deltas):
+        """
+        Shift the stored vote counters of several comments at once and
+        recompute their sort keys. ``deltas`` maps comment ids to (score,
+        upvotes, downvotes) changes.
+        """
+        changed = cls.shift_counters({
+            comment_id: {'score': score, 'upvotes': upvotes, 'downvotes': downvotes}
+            for comment_id, (score, upvotes, downvotes) in deltas.items()
+        })
+        if changed:
+            cls.refresh_ranks([comment_id for comment_id, delta in deltas.items() if any(delta)])
 
 
 class PostCommentVote(AbstractCommentVote):
@@ -45,8 +198,27 @@ class PostCommentVote(AbstractCommentVote):
 
     class Meta:
         ordering = ['created_at',]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['post_comment', 'user'],
+                name='comments_postcommentvote_unique_voter'
+            ),
+        ]
         verbose_name = "Post Comment Vote"
         verbose_name_plural = "Post Comment Votes"
 
     def __str__(self):
         return f"{self.vote} point by {self.user.username}"
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._stored_vote = dict(zip(field_names, values)).get('vote', 0)
+        return instance
+
+    def save(self, *args, **kwargs):
+        previous = getattr(self, '_stored_vote', 0)
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            PostComment.apply_vote_change(self.post_comment_id, previous, self.vote)
+        self._stored_vote = self.vote
@@ -0,0 +1,109 @@
+"""
+Materialized paths of comments.
+
+The ``path`` of a comment is the path of its parent followed by its own id
+in base 36, zero padded to ``SEGMENT_LENGTH`` characters, and its ``depth``
+is the number of its ancestors. Paths sort a thread depth first with
+siblings in id order, and the subtree of a comment is the set of paths
+starting with its own. Subtrees are read as the range from the path up to
+the path followed by ``SUBTREE_END``, a segment no comment gets: any index
+on (post, path) serves it on every backend, where ``LIKE 'path%'`` is a full
+scan on SQLite. The bound is a letter rather than a punctuation sentinel
+such as ``~``, since locale collations (PostgreSQL with en_US or ICU) sort
+punctuation before digits and letters but keep those in ASCII order.
+"""
+import string
+
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Concat
+
+SEGMENT_LENGTH = 7
+DIGITS = string.digits + string.ascii_lowercase
+# Sorts after the segment of every comment, which is why no id maps to it
+SUBTREE_END = DIGITS[-1] * SEGMENT_LENGTH
+
+
+def path_segment(pk):
+    segment = ''
+    rest = pk
+    while rest:
+        rest, digit = divmod(rest, len(DIGITS))
+        segment = DIGITS[digit] + segment
+    segment = segment.rjust(SEGMENT_LENGTH, '0')
+    if len(segment) > SEGMENT_LENGTH or segment == SUBTREE_END:
+        raise ValueError(f'Comment id {pk} does not fit in a path segment')
+    return segment
+
+
+def ancestor_ids(path):
+    """
+    Returns the ids of the ancestors of the comment at ``path``, root first.
+    """
+    return [
+        int(path[start:start + SEGMENT_LENGTH], len(DIGITS))
+        for start in range(0, len(path) - SEGMENT_LENGTH, SEGMENT_LENGTH)
+    ]
+
+
+def subtree_filter(path):
+    """
+    Returns the lookups of the comments whose path starts with ``path``.
+    """
+    return {'path__gte': path, 'path__lt': path + SUBTREE_END}
+
+
+def reply_counts(model):
+    """
+    Returns the expressions recounting the ``child_count`` and
+    ``descendant_count`` of comments of ``model`` from their replies, for
+    use in ``update()``.
+    """
+    def count(replies):
+        return Coalesce(Subquery(
+            replies.filter(is_removed=False)
+            .order_by()
+            .annotate(total=Count('pk'))
+            .values('total')[:1]
+        ), Value(0))
+
+    return {
+        'child_count': count(model.objects.filter(parent=OuterRef('pk')).values('parent')),
+        'descendant_count': count(
+            model.objects.filter(
+                post=OuterRef('post'),
+                path__gt=OuterRef('path'),
+                path__lt=Concat(OuterRef('path'), Value(SUBTREE_END)),
+            ).values('post')
+        ),
+    }
+
+
+def rebuild_paths(model, batch_size=1000):
+    """
+    Recomputes the path and depth of every comment of ``model`` from the
+    parent ids. Returns the number of comments.
+    """
+    parents = dict(model.objects.values_list('pk', 'parent_id'))
+    paths = {}
+    depths = {}
+
+    def resolve(pk):
+        chain = []
+        while pk is not None and pk not in paths:
+            chain.append(pk)
+            pk = parents[pk]
+        for node in reversed(chain):
+            parent = parents[node]
+            if parent is None:
+                paths[node], depths[node] = path_segment(node), 0
+            else:
+                paths[node] = paths[parent] + path_segment(node)
+                depths[node] = depths[parent] + 1
+
+    for pk in parents:
+        resolve(pk)
+    comments = [
+        model(pk=pk, path=paths[pk], depth=depths[pk]) for pk in sorted(parents)
+    ]
+    model.objects.bulk_update(comments, ['path', 'depth'], batch_size=batch_size)
+    return len(comments)
@@ -0,0 +1,51 @@
+"""
+Ranking formulas of comment listings.
+
+Every comment stores its vote counters and sort keys in columns indexed per
+(post, parent), so a listing of the top-level comments of a post or of the
+replies of a comment is a plain index-ordered read in any sort. The keys
+only depend on the vote counters and are recomputed whenever one of the
+comment's votes changes.
+"""
+import math
+
+# z-score of the confidence of the "best" lower bound (80%, as on Reddit)
+WILSON_Z = 1.281551565545
+
+SORTS = {
+    'best': ('-best_rank', '-id'),
+    'top': ('-score', '-id'),
+    'new': ('-created_at', '-id'),
+    'old': ('created_at', 'id'),
+    'controversial': ('-controversy', '-id'),
+}
+DEFAULT_SORT = 'old'
+
+
+def best_rank(upvotes, downvotes):
+    """
+    Lower bound of the Wilson score interval of the share of upvotes: the
+    share the comment is likely to reach at least once more people vote.
+    """
+    total = upvotes + downvotes
+    if not total:
+        return 0.0
+    share = upvotes / total
+    z2 = WILSON_Z * WILSON_Z
+    bound = (
+        share + z2 / (2 * total)
+        - WILSON_Z * math.sqrt((share * (1 - share) + z2 / (4 * total)) / total)
+    ) / (1 + z2 / total)
+    return round(bound, 7)
+
+
+def controversy(upvotes, downvotes):
+    """
+    Number of votes raised to the power of their balance (the smaller side
+    over the larger one), so many evenly split votes rank first. Comments
+    voted only one way are not controversial.
+    """
+    if upvotes <= 0 or downvotes <= 0:
+        return 0.0
+    balance = min(upvotes, downvotes) / max(upvotes, downvotes)
+    return round((upvotes + downvotes) ** balance, 7)
@@ -5,7 +5,9 @@ from rest_framework.pagination import PageNumberPagination
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
+from comments import ranking
 from comments.models import PostComment, PostCommentVote
+from core.serializers import DynamicFieldsModelSerializer
 from profiles.serializers import UserSerializer
 
 
@@ -17,36 +19,67 @@ class PostCommentLightSerializer(serializers.ModelSerializer):
         fields = ('id', 'comment', 'created_at')
 
 
-class PostCommentSerializer(serializers.ModelSerializer):
+class PostCommentSerializer(DynamicFieldsModelSerializer):
     user = UserSerializer()
     comment = serializers.ReadOnlyField(source='_get_comment')
-    votes = serializers.ReadOnlyField(source='_get_score')
+    comment_html = serializers.ReadOnlyField(source='_get_comment_html')
+    votes = serializers.ReadOnlyField(source='score')
     mentioned_users = UserSerializer(many=True, required=False)
     edited = serializers.ReadOnlyField(source='is_edited')
-    child_count = serializers.SerializerMethodField()
 
     class Meta:
         model = PostComment
         fields = (
-            'id', 'user', 'mentioned_users', 'comment', 'votes',
+            'id', 'user', 'mentioned_users', 'comment', 'comment_html', 'votes',
             'flair', 'created_at', 'edited', 'is_removed',
-            'updated_at', 'is_nesting_permitted', 'child_count', 'parent'
+            'updated_at', 'is_nesting_permitted', 'child_count',
+            'descendant_count', 'parent'
         )
         read_only_fields = (
-            'id', 'created_at', 'updated_at', 'child_count')
+            'id', 'created_at', 'updated_at', 'child_count', 'descendant_count')
 
-    def get_child_count(self, obj):
-        return PostComment.objects\
-            .filter(parent=obj)\
-            .exclude(is_removed=True)\
-            .count()
+
+class PostCommentTreeSerializer(serializers.ModelSerializer):
+    """
+    Comment of a thread built by ``comments.services.build_comment_tree``,
+    with its placed replies nested. Reads only the comment row and its user.
+    """
+    user = UserSerializer()
+    comment = serializers.ReadOnlyField(source='_get_comment')
+    comment_html = serializers.ReadOnlyField(source='_get_comment_html')
+    votes = serializers.ReadOnlyField(source='score')
+    edited = serializers.ReadOnlyField(source='is_edited')
+    more_replies = serializers.ReadOnlyField()
+    replies = serializers.SerializerMethodField()
+
+    class Meta:
+        model = PostComment
+        fields = (
+            'id', 'user', 'comment', 'comment_html', 'votes', 'flair',
+            'created_at', 'edited', 'is_removed', 'updated_at',
+            'is_nesting_permitted', 'parent', 'child_count',
+            'descendant_count', 'more_replies', 'replies'
+        )
+        read_only_fields = fields
+
+    def get_replies(self, obj):
+        return PostCommentTreeSerializer(obj.replies, many=True, context=self.context).data
+
+
+class ThreadRequestSerializer(serializers.Serializer):
+    # Upper bound of comments returned by one thread request
+    MAX_NODES = 2000
+
+    depth = serializers.IntegerField(min_value=1, max_value=50, default=10)
+    limit = serializers.IntegerField(min_value=1, max_value=MAX_NODES, default=500)
+    root = serializers.IntegerField(min_value=1, required=False)
+    sort = serializers.ChoiceField(choices=list(ranking.SORTS), default=ranking.DEFAULT_SORT)
 
 
 class PostCommentCreateSerializer(serializers.ModelSerializer):
     comment = serializers.CharField(max_length=3000, min_length=4)
     mentioned_users = UserSerializer(many=True, required=False)
     edited = serializers.ReadOnlyField(source='is_edited')
-    child_count = serializers.SerializerMethodField()
 
     class Meta:
         model = PostComment
@@ -72,9 +105,6 @@ class PostCommentCreateSerializer(serializers.ModelSerializer):
         instance.save()
         return instance
 
-    def get_child_count(self, obj):
-        return 0
-
 
 class PostCommentVoteSerializer(serializers.ModelSerializer):
     post_comment = PostCommentLightSerializer()
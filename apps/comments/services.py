@@ -1,16 +1,44 @@
+import re
+from collections import defaultdict, deque
+
 from django.core.exceptions import ValidationError
 from django.contrib.auth.models import User
+from django.db.models import Q
 
+from comments.models import PostCommentVote
+from core.buffers import get_vote_buffer
+from core.services import upsert_vote
+
+# "@" followed by a username, not preceded by a name character (so emails
+# do not match) and not ending with punctuation
+MENTION_PATTERN = re.compile(r'(?<![\w@.+-])@([\w.+-]*\w)')
+MAX_MENTIONS = 50
 
-def add_mentioned_users(user_id, comment):
-    try:
-        user = User.objects.get(pk=user_id)
-    except User.DoesNotExist:
-        pass
-    else:
-        comment.mentioned_users.add(user)
-        comment.save()
-    return comment
+
+def mention_users(comment, user_ids=(), text=''):
+    """
+    Adds the users with the ids ``user_ids`` and the users named by
+    ``@username`` tokens in ``text`` to the mentions of ``comment``. All of
+    them are resolved by one query and linked by one bulk insert; unknown
+    ids and names are ignored, and at most ``MAX_MENTIONS`` of each are
+    read. Returns the mentioned users.
+    """
+    ids = list(dict.fromkeys(int(pk) for pk in user_ids if str(pk).isdigit()))
+    names = list(dict.fromkeys(MENTION_PATTERN.findall(text or '')))
+    if not ids and not names:
+        return []
+    users = list(User.objects.filter(
+        Q(pk__in=ids[:MAX_MENTIONS]) | Q(username__in=names[:MAX_MENTIONS])
+    ))
+    mentions = comment.mentioned_users
+    mentions.through.objects.bulk_create([
+        mentions.through(**{
+            f'{mentions.source_field_name}_id': comment.pk,
+            f'{mentions.target_field_name}_id': user.pk,
+        })
+        for user in users
+    ], ignore_conflicts=True)
+    return users
 
 
 def remove_users(user_id, comment):
@@ -22,3 +50,57 @@ def remove_users(user_id, comment):
         comment.mentioned_users.remove(user)
         comment.save()
         return comment
+
+
+def vote_comment(comment, user, value):
+    """
+    Sets ``user``'s vote on ``comment`` to ``value`` (1, -1, or 0 to remove
+    it) and returns the previous vote. The vote is queued instead of written
+    when the vote buffer is enabled.
+    """
+    buffer = get_vote_buffer()
+    if buffer is not None:
+        return buffer.add(PostCommentVote, 'post_comment', comment.pk, user.pk, value)
+    return upsert_vote(PostCommentVote, 'post_comment', comment, user, value)
+
+
+def build_comment_tree(comments, max_depth, max_nodes, parent_id=None):
+    """
+    Nests the comments of a thread, given in display order, under their
+    parents in one pass, starting from the replies of ``parent_id``.
+    Removed comments are kept only when they have replies left. Levels are
+    filled breadth first until ``max_nodes`` comments are placed or
+    ``max_depth`` levels are reached.
+
+    Every comment gets ``replies`` (its placed replies) and
+    ``more_replies`` (the number of its replies left out). Returns the
+    top-level comments placed and the number of top-level comments left
+    out.
+    """
+    children = defaultdict(list)
+    for comment in comments:
+        children[comment.parent_id].append(comment)
+        comment.replies = []
+        comment.more_replies = 0
+
+    roots = []
+    more_roots = 0
+    placed = 0
+    queue = deque([(None, 1)])
+    while queue:
+        parent, depth = queue.popleft()
+        replies = [
+            comment for comment in children.get(parent.pk if parent else parent_id, ())
+            if not comment.is_removed or comment.descendant_count
+        ]
+        if depth > max_depth:
+            parent.more_replies = len(replies)
+            continue
+        kept = replies[:max(max_nodes - placed, 0)]
+        placed += len(kept)
+        if parent is None:
+            roots, more_roots = kept, len(replies) - len(kept)
+        else:
+            parent.replies, parent.more_replies = kept, len(replies) - len(kept)
+        queue.extend((comment, depth + 1) for comment in kept)
+    return roots, more_roots
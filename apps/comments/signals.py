@@ -0,0 +1,21 @@
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+from core.services import vote_counters_deferred
+from comments.models import PostComment, PostCommentVote
+from posts.models import Post
+
+
+@receiver(post_delete, sender=PostCommentVote)
+def comment_vote_deleted_hook(sender, instance, **kwargs):
+    if vote_counters_deferred():
+        return
+    previous = getattr(instance, '_stored_vote', instance.vote)
+    PostComment.apply_vote_change(instance.post_comment_id, previous, 0)
+
+
+@receiver(post_delete, sender=PostComment)
+def comment_deleted_hook(sender, instance, **kwargs):
+    # Replies deleted along with it run this hook themselves
+    if not instance.is_removed:
+        PostComment.shift_reply_counts([(instance.path, -1, -1)])
+        Post.shift_counters({instance.post_id: {'comment_count': -1}})
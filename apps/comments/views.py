@@ -1,18 +1,29 @@
 from django.db import models
 from django.db.models import Q, F
-from django.core.exceptions import ValidationError
 from django.utils.decorators import method_decorator
 from django.views.decorators.cache import cache_page
 from rest_framework import status
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from core.views import BaseReadOnlyViewSet, BaseViewSet
 from posts.models import Post
+from comments import ranking
 from comments.models import PostComment, PostCommentVote
-from comments.serializers import PostCommentSerializer, PostCommentCreateSerializer
-from comments.services import add_mentioned_users
+from comments.serializers import (
+    PostCommentSerializer, PostCommentCreateSerializer,
+    PostCommentTreeSerializer, ThreadRequestSerializer,
+)
+from comments.services import build_comment_tree, mention_users, vote_comment
+from core.buffers import get_vote_buffer
+from core.conditional import conditional_response, fingerprint
+from core.services import VOTE_VALUES, vote_deltas
+
+
+# Comments listed: those not removed and removed ones that still have replies
+SHOWN_COMMENTS = Q(is_removed=False) | Q(descendant_count__gt=0)
 
 
 class PostCommentPagination(PageNumberPagination):
@@ -20,7 +31,9 @@ class PostCommentPagination(PageNumberPagination):
 
 
 class PostCommentViewSet(BaseViewSet):
-    queryset = PostComment.objects.all()
+    queryset = PostComment.objects.all()\
+        .select_related('user')\
+        .prefetch_related('mentioned_users')
     pagination_class = PostCommentPagination
     serializer_class = PostCommentSerializer
     serializer_action_classes = {
@@ -36,15 +49,37 @@ class PostCommentViewSet(BaseViewSet):
                 return self.queryset.filter(post__uuid=self.kwargs['post_uuid'])
         return queryset
 
+    def get_ordering(self, request):
+        """
+        Returns the ordering of the ``?sort=`` asked for, see
+        ``comments.ranking.SORTS``.
+        """
+        sort = request.query_params.get('sort', ranking.DEFAULT_SORT)
+        if sort not in ranking.SORTS:
+            raise ValidationError(
+                {'error': f"Unknown sort '{sort}'. Use one of: {', '.join(ranking.SORTS)}"}
+            )
+        return ranking.SORTS[sort]
+
+    def get_response_validators(self, request, post_uuid=None, pk=None):
+        """
+        Versions a comment listing by the comments of the post and their
+        votes, which covers edits, removals, replies and score changes.
+        """
+        comments = PostComment.objects.filter(post__uuid=post_uuid)
+        version = (
+            fingerprint(comments),
+            fingerprint(PostCommentVote.objects.filter(post_comment__post__uuid=post_uuid)),
+        )
+        if not version[0][0]:
+            return None
+        return version, version[0][1]
+
+    @conditional_response
     def list(self, request, post_uuid=None):
-        deleted_with_children = PostComment.objects\
-            .filter(
-                parent=None,
-                post__uuid=post_uuid,
-                is_removed=True)\
-            .exclude(comments=None).distinct()
-        queryset = self.get_queryset().filter(parent=None, is_removed=False).distinct()
-        queryset = queryset | deleted_with_children
+        queryset = self.get_queryset()\
+            .filter(SHOWN_COMMENTS, parent=None)\
+            .order_by(*self.get_ordering(request))
         return self.paginated_response(queryset)
 
     def create(self, request, post_uuid=None):
@@ -72,9 +107,7 @@ class PostCommentViewSet(BaseViewSet):
         serializer = serializer_class(data=data)
         if serializer.is_valid():
             comment = serializer.save()
-            if mentioned_users is not None:
-                for user in mentioned_users:
-                    comment = add_mentioned_users(user, comment)
+            mention_users(comment, mentioned_users or (), comment._comment)
             serializer = PostCommentSerializer(instance=comment)
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
@@ -116,39 +149,77 @@ class PostCommentViewSet(BaseViewSet):
         comment.save()
         return Response({'success': True}, status=status.HTTP_200_OK)
 
+    @action(detail=False)
+    @conditional_response
+    def thread(self, request, post_uuid=None):
+        """
+        Returns the comment tree of a post, read with one query and nested in
+        memory. ``?depth=`` bounds the levels and ``?limit=`` the comments
+        returned; comments cut off report their left out replies in
+        ``more_replies``. ``?root=<id>`` returns the subtree of a comment
+        instead, read by its path range. ``?sort=`` orders the replies of
+        every comment.
+        """
+        params = ThreadRequestSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        root = params.validated_data.get('root')
+        if root is not None:
+            root = PostComment.objects\
+                .filter(pk=root, post__uuid=post_uuid)\
+                .only('pk', 'post', 'parent', 'path')\
+                .first()
+            if root is None:
+                return Response({'error': 'Wrong comment'}, status=status.HTTP_404_NOT_FOUND)
+            comments = root.subtree()
+        else:
+            comments = PostComment.objects.filter(post__uuid=post_uuid)
+        comments = list(
+            comments.select_related('user')
+            .order_by(*ranking.SORTS[params.validated_data['sort']])
+        )
+        if not comments and not Post.objects.filter(uuid=post_uuid).exists():
+            return Response({'error': 'Wrong UUID'}, status=status.HTTP_404_NOT_FOUND)
+        roots, more_replies = build_comment_tree(
+            comments, params.validated_data['depth'], params.validated_data['limit'],
+            parent_id=root.parent_id if root is not None else None
+        )
+        serializer = PostCommentTreeSerializer(roots, many=True, context={'request': request})
+        return Response({
+            'count': len(comments),
+            'more_replies': more_replies,
+            'results': serializer.data,
+        }, status=status.HTTP_200_OK)
+
     @action(detail=True)
+    @conditional_response
     def children(self, request, post_uuid=None, pk=None):
         comment = self.get_object()
-        children_comments = PostComment.objects.filter(parent=comment)
-        deleted_with_children = children_comments.filter(is_removed=True)\
-            .exclude(comments=None).distinct()
-        queryset = children_comments.filter(is_removed=False).distinct()
-        queryset = queryset | deleted_with_children
+        queryset = self.queryset\
+            .filter(SHOWN_COMMENTS, parent=comment)\
+            .order_by(*self.get_ordering(request))
         return self.paginated_response(queryset)
 
     @action(detail=True)
     def check_vote(self, request, post_uuid=None, pk=None):
-        vote = False
+        vote = 0
         comment = self.get_object()
         if request.user.is_authenticated:
-            vote = PostCommentVote.objects.filter(post_comment=comment, user=request.user)
-            if vote.exists():
-                user_vote = PostCommentVote.objects.get(post_comment=comment, user=request.user)
-                return Response({"vote": user_vote.vote, "votes": comment.score}, status=status.HTTP_200_OK)
-        return Response({"vote": 0, "votes": comment.score}, status=status.HTTP_200_OK)
+            vote = PostCommentVote.objects\
+                .filter(post_comment=comment, user=request.user)\
+                .values_list('vote', flat=True).first() or 0
+            buffer = get_vote_buffer()
+            if buffer is not None:
+                vote = buffer.pending_votes(
+                    PostCommentVote, 'post_comment', request.user.pk, [comment.pk]
+                ).get(comment.pk, vote)
+        return Response({"vote": vote, "votes": comment.score}, status=status.HTTP_200_OK)
 
     def _common_vote_method(self, request, method):
         comment = self.get_object()
-        user = request.user
-        vote, created = PostCommentVote.objects.get_or_create(post_comment=comment, user=user)
-        if method == "upvote":
-            vote.vote = 1
-        elif method == "downvote":
-            vote.vote = -1
-        else:
-            vote.vote = 0
-        vote.save()
-        return Response({"vote": vote.vote, "votes": comment.score}, status=status.HTTP_200_OK)
+        value = VOTE_VALUES.get(method, 0)
+        previous = vote_comment(comment, request.user, value)
+        votes = comment.score + vote_deltas(previous, value)[0]
+        return Response({"vote": value, "votes": votes}, status=status.HTTP_200_OK)
 
     @action(detail=True, methods=['put'])
     def upvote(self, request, post_uuid=None, pk=None):
@@ -0,0 +1,295 @@
+"""
+Write-behind buffer for votes.
+
+With ``VOTE_BUFFER['ENABLED']`` set, the vote endpoints do not write votes
+themselves. Each vote is queued in process memory under its
+(vote model, target, user) key, so repeated toggles by the same user collapse
+into their last value, and the queue is flushed:
+
+* when it holds ``BATCH_SIZE`` votes,
+* ``FLUSH_INTERVAL`` seconds after the first vote was queued,
+* when the process exits normally (``atexit``).
+
+A flush runs in one transaction: it reads the stored votes of the queued
+keys, upserts the changed ones with one INSERT ... ON CONFLICT per vote
+model, deletes removed ones with one DELETE, and shifts the target counters
+once with the summed change.
+
+Until a vote is flushed, the voter still sees it: ``pending_votes`` is laid
+over the stored votes wherever a user's own vote is read.
+
+Crash semantics:
+
+* A vote is acknowledged before it is durable. A process killed without
+  running its exit handlers (SIGKILL, OOM killer, power loss) loses the votes
+  it queued since its last flush, at most ``BATCH_SIZE`` votes or
+  ``FLUSH_INTERVAL`` seconds worth.
+* A flush is all-or-nothing, so the counters always match the votes table.
+* When a flush fails, its votes are queued again unless a newer vote for the
+  same key arrived meanwhile, and the next flush retries them.
+* Votes whose target or voter was deleted after they were queued are
+  dropped by the flush, since they can never be written.
+* Every process has its own queue. If a user's votes on one target reach
+  two processes, the one flushed last wins.
+"""
+from collections import defaultdict
+import atexit
+import logging
+import threading
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.db import connections, transaction
+from django.dispatch import receiver
+
+from core.services import deferred_vote_counters, vote_deltas
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'ENABLED': False,
+    'BATCH_SIZE': 500,
+    'FLUSH_INTERVAL': 1.0,
+}
+
+
+class VoteBuffer(object):
+    def __init__(self, batch_size=DEFAULTS['BATCH_SIZE'],
+                 flush_interval=DEFAULTS['FLUSH_INTERVAL']):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._pending = {}
+        self._flushing = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._timer = None
+
+    def __len__(self):
+        return len(self._pending)
+
+    def add(self, vote_model, target_field, target_id, user_id, value):
+        """
+        Queues a vote and returns the vote it replaces (0 if none).
+        """
+        key = (vote_model, target_field, target_id, user_id)
+        previous = self.pending_votes(vote_model, target_field, user_id, [target_id])\
+            .get(target_id)
+        if previous is None:
+            previous = vote_model.objects\
+                .filter(**{target_field: target_id, 'user': user_id})\
+                .values_list('vote', flat=True).first() or 0
+        with self._lock:
+            self._pending[key] = value
+            full = len(self._pending) >= self.batch_size
+            if not full:
+                self._schedule()
+        if full:
+            self.flush()
+        return previous
+
+    def pending_votes(self, vote_model, target_field, user_id, target_ids):
+        """
+        Returns the not yet stored votes of a user, keyed by target id.
+        """
+        votes = {}
+        with self._lock:
+            for queue in (self._flushing, self._pending):
+                for target_id in target_ids:
+                    key = (vote_model, target_field, target_id, user_id)
+                    if key in queue:
+                        votes[target_id] = queue[key]
+        return votes
+
+    def flush(self):
+        """
+        Writes the queued votes and returns how many were written.
+        """
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, {}
+                self._flushing = batch
+                self._cancel()
+            if not batch:
+                return 0
+            try:
+                self._write(batch)
+            except Exception:
+                with self._lock:
+                    for key, value in batch.items():
+                        self._pending.setdefault(key, value)
+                    self._schedule()
+                raise
+            finally:
+                with self._lock:
+                    self._flushing = {}
+            return len(batch)
+
+    def close(self):
+        """
+        Flushes the queue and stops the flush timer.
+        """
+        try:
+            self.flush()
+        finally:
+            with self._lock:
+                self._cancel()
+
+    def _write(self, batch):
+        groups = defaultdict(dict)
+        for (vote_model, target_field, target_id, user_id), value in batch.items():
+            groups[(vote_model, target_field)][(target_id, user_id)] = value
+
+        with transaction.atomic(), deferred_vote_counters():
+            self._drop_deleted(groups)
+            for (vote_model, target_field), votes in groups.items():
+                field = vote_model._meta.get_field(target_field)
+                stored = {}
+                rows = vote_model.objects\
+                    .filter(**{
+                        f'{target_field}__in': {target_id for target_id, user_id in votes},
+                        'user__in': {user_id for target_id, user_id in votes},
+                    })\
+                    .select_for_update()\
+                    .values_list('pk', field.attname, 'user_id', 'vote')
+                for pk, target_id, user_id, vote in rows:
+                    stored[(target_id, user_id)] = (pk, vote)
+
+                upserts, deletes = [], []
+                deltas = defaultdict(lambda: (0, 0, 0))
+                for (target_id, user_id), value in votes.items():
+                    pk, previous = stored.get((target_id, user_id), (None, 0))
+                    if previous == value:
+                        continue
+                    if value == 0:
+                        deletes.append(pk)
+                    else:
+                        upserts.append(vote_model(**{
+                            field.attname: target_id, 'user_id': user_id, 'vote': value
+                        }))
+                    deltas[target_id] = tuple(
+                        total + change for total, change
+                        in zip(deltas[target_id], vote_deltas(previous, value))
+                    )
+
+                if upserts:
+                    vote_model.objects.bulk_create(
+                        upserts,
+                        update_conflicts=True,
+                        unique_fields=[target_field, 'user'],
+                        update_fields=['vote', 'updated_at'],
+                    )
+                if deletes:
+                    vote_model.objects.filter(pk__in=deletes).delete()
+                field.related_model.apply_vote_deltas(deltas)
+
+    def _drop_deleted(self, groups):
+        """
+        Removes from ``groups`` the votes whose target or voter no longer
+        exists, with one query per model. The remaining targets are locked
+        until the flush commits, so they cannot be deleted meanwhile.
+        """
+        user_ids = defaultdict(set)
+        for (vote_model, target_field), votes in groups.items():
+            user_model = vote_model._meta.get_field('user').related_model
+            user_ids[user_model].update(user_id for target_id, user_id in votes)
+        users = {
+            user_model: set(user_model.objects.filter(pk__in=ids).values_list('pk', flat=True))
+            for user_model, ids in user_ids.items()
+        }
+
+        for (vote_model, target_field), votes in groups.items():
+            target_model = vote_model._meta.get_field(target_field).related_model
+            user_model = vote_model._meta.get_field('user').related_model
+            targets = set(
+                target_model.objects
+                .filter(pk__in={target_id for target_id, user_id in votes})
+                .select_for_update()
+                .values_list('pk', flat=True)
+            )
+            deleted = [
+                key for key in votes
+                if key[0] not in targets or key[1] not in users[user_model]
+            ]
+            for key in deleted:
+                del votes[key]
+            if deleted:
+                logger.warning(
+                    'Dropped %d queued %s votes of deleted targets or users',
+                    len(deleted), vote_model.__name__
+                )
+
+    def _schedule(self):
+        if self._timer is None:
+            self._timer = threading.Timer(self.flush_interval, self._flush_on_timer)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _cancel(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    def _flush_on_timer(self):
+        with self._lock:
+            self._timer = None
+        try:
+            self.flush()
+        except Exception:
+            logger.exception('Vote buffer flush failed, votes were queued again')
+        finally:
+            connections.close_all()
+
+
+_buffer = None
+_buffer_lock = threading.Lock()
+
+
+def get_vote_buffer():
+    """
+    Returns the process vote buffer, or None when votes are written directly.
+    """
+    global _buffer
+    config = {**DEFAULTS, **getattr(settings, 'VOTE_BUFFER', {})}
+    if not config['ENABLED']:
+        return None
+    with _buffer_lock:
+        if _buffer is None:
+            _buffer = VoteBuffer(config['BATCH_SIZE'], config['FLUSH_INTERVAL'])
+        return _buffer
+
+
+@atexit.register
+def close_vote_buffer():
+    global _buffer
+    with _buffer_lock:
+        buffer, _buffer = _buffer, None
+    if buffer is not None:
+        buffer.close()
+
+
+@receiver(setting_changed)
+def vote_buffer_setting_changed(setting, **kwargs):
+    if setting == 'VOTE_BUFFER':
+        close_vote_buffer()
+
+
+def overlay_pending_votes(votes, vote_model, target_field, user, target_ids):
+    """
+    Updates ``votes`` (target id -> vote instance) in place with the user's
+    queued votes, so a voter reads their own vote before it is flushed.
+    """
+    buffer = get_vote_buffer()
+    if buffer is None or user is None or not user.is_authenticated:
+        return votes
+    pending = buffer.pending_votes(vote_model, target_field, user.pk, target_ids)
+    for target_id, value in pending.items():
+        if value == 0:
+            votes.pop(target_id, None)
+        elif target_id in votes:
+            votes[target_id].vote = value
+        else:
+            votes[target_id] = vote_model(
+                **{vote_model._meta.get_field(target_field).attname: target_id},
+                user=user, vote=value
+            )
+    return votes
@@ -0,0 +1,171 @@
+"""
+Response cache for read-only API views.
+
+Cached entries hold the serialized response data of anonymous GET requests,
+keyed by action, path and query string. Every entry records the version of
+each scope it was built from (e.g. ``listing`` or ``post:42``); invalidating
+a scope gives it a new version, and entries built from the old one stop
+matching. Versions live in the same cache as the entries, so invalidation is
+seen by every process sharing a backend.
+
+``RESPONSE_CACHE['ALIAS']`` selects the Django cache used: the default
+local-memory cache, or any shared backend (Redis, Memcached, database)
+configured in ``CACHES``. Entries also expire after ``RESPONSE_CACHE['TIMEOUT']``
+seconds, which bounds staleness from changes no signal reports.
+"""
+from functools import wraps
+from urllib.parse import urlencode
+import threading
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.cache import get_conditional_response
+from django.utils.http import parse_http_date
+from rest_framework import status
+from rest_framework.response import Response
+
+DEFAULTS = {
+    'ALIAS': 'default',
+    'TIMEOUT': 60,
+}
+
+
+class ResponseCache(object):
+    def __init__(self, namespace, scopes=()):
+        self.namespace = namespace
+        self.scopes = tuple(scopes)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @property
+    def config(self):
+        return {**DEFAULTS, **getattr(settings, 'RESPONSE_CACHE', {})}
+
+    @property
+    def cache(self):
+        return caches[self.config['ALIAS']]
+
+    def entry_key(self, request, action):
+        query = urlencode(sorted(request.query_params.lists()), doseq=True)
+        return f'{self.namespace}:entry:{action}:{request.path}?{query}'
+
+    def version_key(self, scope):
+        return f'{self.namespace}:version:{scope}'
+
+    def versions(self, scopes):
+        """
+        Returns the current version of each scope, giving a version to those
+        that have none yet.
+        """
+        keys = {self.version_key(scope): scope for scope in scopes}
+        found = self.cache.get_many(keys)
+        for key in set(keys) - set(found):
+            self.cache.add(key, uuid.uuid4().hex, None)
+        if len(found) < len(keys):
+            found = self.cache.get_many(keys)
+        return {keys[key]: version for key, version in found.items()}
+
+    def invalidate(self, *scopes):
+        self.cache.set_many(
+            {self.version_key(scope): uuid.uuid4().hex for scope in scopes},
+            None
+        )
+
+    def get(self, key):
+        """
+        Returns the entry (``data``, ``headers``) cached under ``key``, or
+        None when it is missing or one of its scopes was invalidated since it
+        was stored.
+        """
+        entry = self.cache.get(key)
+        if entry is not None:
+            keys = [self.version_key(scope) for scope in entry['versions']]
+            current = self.cache.get_many(keys)
+            if all(current.get(self.version_key(scope)) == version
+                   for scope, version in entry['versions'].items()):
+                self._count(hit=True)
+                return entry
+        self._count(hit=False)
+        return None
+
+    def set(self, key, data, versions, headers=None):
+        entry = {'data': data, 'versions': versions, 'headers': headers or {}}
+        self.cache.set(key, entry, self.config['TIMEOUT'])
+
+    def stats(self):
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses}
+
+    def _count(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+
+# Validators of a cached response, set by core.conditional.conditional_response
+CACHED_HEADERS = ('ETag', 'Last-Modified', 'Vary')
+
+
+def not_modified(request, headers):
+    """
+    Returns a 304 response when the request is conditional and the cached
+    validators in ``headers`` still match it.
+    """
+    if 'ETag' not in headers and 'Last-Modified' not in headers:
+        return None
+    last_modified = headers.get('Last-Modified')
+    return get_conditional_response(
+        request,
+        etag=headers.get('ETag'),
+        last_modified=parse_http_date(last_modified) if last_modified else None,
+    )
+
+
+def cache_response(method):
+    """
+    Serves an action of a ``CachedResponseMixin`` viewset from its response
+    cache for anonymous GET requests. The scopes known before the action
+    runs come from ``get_cache_scopes``; the action adds the scopes of what
+    it shows with ``add_cache_scopes`` once it has loaded them.
+    """
+    @wraps(method)
+    def wrapper(self, request, *args, **kwargs):
+        response_cache = self.response_cache
+        if response_cache is None or request.method != 'GET' \
+                or request.user.is_authenticated:
+            return method(self, request, *args, **kwargs)
+
+        key = response_cache.entry_key(request, self.action)
+        entry = response_cache.get(key)
+        if entry is not None:
+            response = not_modified(request, entry['headers'])\
+                or Response(entry['data'], status=status.HTTP_200_OK)
+            for header, value in entry['headers'].items():
+                response[header] = value
+            response['X-Cache'] = 'HIT'
+            return response
+
+        # Versions are read before the objects they cover are serialized, so
+        # a change made meanwhile invalidates the entry being stored. Scopes
+        # added by the action are read again once the response is built: one
+        # that changed while serializing means the data may already be stale
+        # under its new version, so the response is not stored.
+        versions = response_cache.versions(self.get_cache_scopes(request, *args, **kwargs))
+        fixed = set(versions)
+        self.cache_versions = versions
+        response = method(self, request, *args, **kwargs)
+        added = {scope: versions[scope] for scope in set(versions) - fixed}
+        if response.status_code == status.HTTP_200_OK \
+                and (not added or response_cache.versions(added) == added):
+            headers = {
+                header: response[header] for header in CACHED_HEADERS
+                if response.has_header(header)
+            }
+            response_cache.set(key, response.data, versions, headers)
+        response['X-Cache'] = 'MISS'
+        return response
+    return wrapper
@@ -0,0 +1,70 @@
+"""
+Conditional GET support for API views.
+
+Actions decorated with ``conditional_response`` ask their viewset for the
+validators of the response about to be built, with
+``get_response_validators(request, *args, **kwargs)``. It returns
+``(version, last_modified)``, where ``version`` is any value that changes
+whenever the response would (object timestamps, vote counters, related row
+fingerprints, the viewer's own state), or None when the action cannot
+validate the request. The ETag is a hash of ``version``; ``Last-Modified``
+is the newest ``updated_at`` of the objects shown.
+
+A request whose If-None-Match matches the ETag, or, without If-None-Match,
+whose If-Modified-Since is not older than Last-Modified, is answered with a
+304 before the action runs, so nothing is serialized. The ETag is the
+precise validator: Last-Modified follows edits only, not vote counters or
+related rows, so clients should poll with If-None-Match.
+"""
+from functools import wraps
+import hashlib
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+from rest_framework import status
+
+
+def make_etag(version):
+    return quote_etag(hashlib.md5(repr(version).encode()).hexdigest())
+
+
+def fingerprint(queryset, field='updated_at'):
+    """
+    Returns (row count, newest ``field``) of a queryset. Any insert, delete
+    or save of a timestamped row changes it.
+    """
+    values = queryset.order_by().aggregate(total=Count('pk'), newest=Max(field))
+    return (values['total'], values['newest'])
+
+
+def newest(objects, field='updated_at'):
+    """
+    Returns the newest ``field`` value of ``objects``, or None.
+    """
+    return max((getattr(obj, field) for obj in objects), default=None)
+
+
+def conditional_response(method):
+    @wraps(method)
+    def wrapper(self, request, *args, **kwargs):
+        validators = None
+        if request.method in ('GET', 'HEAD'):
+            validators = self.get_response_validators(request, *args, **kwargs)
+        if validators is None:
+            return method(self, request, *args, **kwargs)
+
+        version, last_modified = validators
+        etag = make_etag((request.user.pk, version))
+        timestamp = int(last_modified.timestamp()) if last_modified is not None else None
+        response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+        if response is None:
+            response = method(self, request, *args, **kwargs)
+            if response.status_code != status.HTTP_200_OK:
+                return response
+        response['ETag'] = etag
+        if timestamp is not None:
+            response['Last-Modified'] = http_date(timestamp)
+        patch_vary_headers(response, ('Authorization', 'Cookie'))
+        return response
+    return wrapper
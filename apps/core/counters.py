@@ -0,0 +1,194 @@
+"""
+Write-behind view counters.
+
+With ``VIEW_COUNTER['ENABLED']`` set, detail actions decorated with
+``count_view`` add one to the ``views`` counter of the object shown, served
+from the response cache or answered with a 304 included. Increments are
+summed in process memory per row and written by a flush, which runs:
+
+* when ``BATCH_SIZE`` rows have pending increments,
+* ``FLUSH_INTERVAL`` seconds after the first increment was added,
+* when the process exits normally (``atexit``).
+
+A flush runs in one transaction with one
+``UPDATE ... SET views = views + n WHERE <lookup> IN (...)`` per model and
+distinct increment ``n``. Counters are not part of response validators, so
+cached responses and ETags do not follow them; a shown count can be up to
+``RESPONSE_CACHE['TIMEOUT']`` seconds old.
+
+Crash semantics:
+
+* A view counts before it is durable. A process killed without running its
+  exit handlers (SIGKILL, OOM killer, power loss) loses the views it counted
+  since its last flush, at most ``FLUSH_INTERVAL`` seconds worth or the
+  views of ``BATCH_SIZE`` rows.
+* When a flush fails, its increments are added back to the pending ones and
+  the next flush retries them.
+* Every process counts on its own; the stored counter is the sum of what
+  all processes flushed.
+"""
+from collections import defaultdict
+from functools import wraps
+import atexit
+import logging
+import threading
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.db import connections, transaction
+from django.db.models import F
+from django.dispatch import receiver
+from rest_framework import status
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'ENABLED': False,
+    'BATCH_SIZE': 1000,
+    'FLUSH_INTERVAL': 10.0,
+}
+
+
+class CounterBuffer(object):
+    def __init__(self, batch_size=DEFAULTS['BATCH_SIZE'],
+                 flush_interval=DEFAULTS['FLUSH_INTERVAL']):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._pending = defaultdict(int)
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._timer = None
+
+    def __len__(self):
+        return len(self._pending)
+
+    def add(self, model, field, lookup, value, count=1):
+        """
+        Adds ``count`` to the ``field`` counter of the ``model`` row whose
+        ``lookup`` field equals ``value``.
+        """
+        with self._lock:
+            self._pending[(model, field, lookup, value)] += count
+            full = len(self._pending) >= self.batch_size
+            if not full:
+                self._schedule()
+        if full:
+            self.flush()
+
+    def flush(self):
+        """
+        Writes the pending increments and returns the number of rows they
+        were added to.
+        """
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, defaultdict(int)
+                self._cancel()
+            if not batch:
+                return 0
+            try:
+                self._write(batch)
+            except Exception:
+                with self._lock:
+                    for key, count in batch.items():
+                        self._pending[key] += count
+                    self._schedule()
+                raise
+            return len(batch)
+
+    def close(self):
+        """
+        Flushes the pending increments and stops the flush timer.
+        """
+        try:
+            self.flush()
+        finally:
+            with self._lock:
+                self._cancel()
+
+    def _write(self, batch):
+        groups = defaultdict(lambda: defaultdict(list))
+        for (model, field, lookup, value), count in batch.items():
+            groups[(model, field, lookup)][count].append(value)
+
+        with transaction.atomic():
+            for (model, field, lookup), values_by_count in groups.items():
+                for count, values in values_by_count.items():
+                    model.objects\
+                        .filter(**{f'{lookup}__in': values})\
+                        .update(**{field: F(field) + count})
+
+    def _schedule(self):
+        if self._timer is None:
+            self._timer = threading.Timer(self.flush_interval, self._flush_on_timer)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _cancel(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    def _flush_on_timer(self):
+        with self._lock:
+            self._timer = None
+        try:
+            self.flush()
+        except Exception:
+            logger.exception('View counter flush failed, views were added back')
+        finally:
+            connections.close_all()
+
+
+_counter = None
+_counter_lock = threading.Lock()
+
+
+def get_view_counter():
+    """
+    Returns the process view counter, or None when views are not counted.
+    """
+    global _counter
+    config = {**DEFAULTS, **getattr(settings, 'VIEW_COUNTER', {})}
+    if not config['ENABLED']:
+        return None
+    with _counter_lock:
+        if _counter is None:
+            _counter = CounterBuffer(config['BATCH_SIZE'], config['FLUSH_INTERVAL'])
+        return _counter
+
+
+@atexit.register
+def close_view_counter():
+    global _counter
+    with _counter_lock:
+        counter, _counter = _counter, None
+    if counter is not None:
+        counter.close()
+
+
+@receiver(setting_changed)
+def view_counter_setting_changed(setting, **kwargs):
+    if setting == 'VIEW_COUNTER':
+        close_view_counter()
+
+
+def count_view(method):
+    """
+    Counts a view of the object of a successful detail action in the
+    ``views`` counter of the viewset model, found by the viewset lookup
+    field. Wraps the response cache, so cache hits and 304s are counted.
+    """
+    @wraps(method)
+    def wrapper(self, request, *args, **kwargs):
+        response = method(self, request, *args, **kwargs)
+        counter = get_view_counter()
+        if counter is not None and response.status_code in (
+                status.HTTP_200_OK, status.HTTP_304_NOT_MODIFIED):
+            lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+            counter.add(
+                self.queryset.model, 'views',
+                self.lookup_field, str(kwargs[lookup_url_kwarg])
+            )
+        return response
+    return wrapper
@@ -0,0 +1,163 @@
+"""
+Render-once HTML of user content.
+
+Post content is CKEditor HTML and comments are plain text. Both are
+rendered to safe HTML when they are saved, and the result is stored next to
+the source with a hash of the source and the ``HTML_VERSION`` it was
+rendered with. Saving unchanged source skips rendering, and reads serve the
+stored HTML as is.
+
+The post sanitizer keeps the tags, attributes and URL schemes allowed below
+and drops everything else; the content of ``script``-like tags is dropped
+with them. Bump ``HTML_VERSION`` whenever these rules or the comment
+renderer change, then run ``python manage.py render_html`` to re-render the
+rows stamped with an older version.
+"""
+from html import escape
+from html.parser import HTMLParser
+import hashlib
+import re
+from urllib.parse import urlsplit
+
+from django.utils.html import linebreaks
+
+HTML_VERSION = 1
+
+ALLOWED_TAGS = {
+    'a', 'b', 'blockquote', 'br', 'code', 'em', 'figcaption', 'figure', 'h2',
+    'h3', 'h4', 'hr', 'i', 'img', 'li', 'ol', 'p', 'pre', 's', 'span', 'strong',
+    'sub', 'sup', 'table', 'tbody', 'td', 'th', 'thead', 'tr', 'u', 'ul',
+}
+ALLOWED_ATTRIBUTES = {
+    'a': {'href', 'title'},
+    'img': {'src', 'alt', 'width', 'height'},
+    'td': {'colspan', 'rowspan'},
+    'th': {'colspan', 'rowspan'},
+}
+URL_ATTRIBUTES = {'href', 'src'}
+ALLOWED_SCHEMES = {'', 'http', 'https', 'mailto'}
+VOID_TAGS = {'br', 'hr', 'img'}
+# Tags dropped together with their content
+DROPPED_TAGS = {'script', 'style', 'iframe', 'object', 'embed', 'template', 'noscript', 'svg', 'math'}
+
+# Browsers ignore these characters inside a URL scheme ("java\tscript:")
+URL_IGNORED = re.compile(r'[\x00-\x20\x7f]+')
+
+
+def content_hash(text):
+    return hashlib.sha256((text or '').encode('utf-8')).hexdigest()
+
+
+def allowed_url(url):
+    try:
+        scheme = urlsplit(URL_IGNORED.sub('', url)).scheme
+    except ValueError:
+        return False
+    return scheme.lower() in ALLOWED_SCHEMES
+
+
+class Sanitizer(HTMLParser):
+    def __init__(self):
+        super(Sanitizer, self).__init__(convert_charrefs=True)
+        self.output = []
+        self.open_tags = []
+        self.dropping = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in DROPPED_TAGS:
+            self.dropping += 1
+            return
+        if self.dropping or tag not in ALLOWED_TAGS:
+            return
+        allowed = ALLOWED_ATTRIBUTES.get(tag, set())
+        kept = []
+        for name, value in attrs:
+            if name not in allowed or value is None:
+                continue
+            if name in URL_ATTRIBUTES and not allowed_url(value):
+                continue
+            kept.append(f' {name}="{escape(value, quote=True)}"')
+        if tag == 'a':
+            kept.append(' rel="nofollow noopener"')
+        self.output.append(f"<{tag}{''.join(kept)}>")
+        if tag not in VOID_TAGS:
+            self.open_tags.append(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag in DROPPED_TAGS:
+            self.dropping -= 1
+        elif tag not in VOID_TAGS and self.open_tags and self.open_tags[-1] == tag \
+                and not self.dropping:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        if tag in DROPPED_TAGS:
+            self.dropping = max(self.dropping - 1, 0)
+            return
+        if self.dropping or tag not in self.open_tags:
+            return
+        while self.open_tags:
+            name = self.open_tags.pop()
+            self.output.append(f'</{name}>')
+            if name == tag:
+                break
+
+    def handle_data(self, data):
+        if not self.dropping:
+            self.output.append(escape(data, quote=False))
+
+    def render(self, html):
+        self.feed(html or '')
+        self.close()
+        for name in reversed(self.open_tags):
+            self.output.append(f'</{name}>')
+        self.open_tags = []
+        return ''.join(self.output)
+
+
+def sanitize_html(html):
+    """
+    Returns ``html`` with only the allowed tags, attributes and URLs left,
+    its text escaped and every tag closed.
+    """
+    return Sanitizer().render(html)
+
+
+def render_text(text):
+    """
+    Returns plain ``text`` escaped, with blank lines as paragraphs and line
+    breaks as ``<br>``.
+    """
+    return linebreaks(text or '', autoescape=True)
+
+
+def render_rows(queryset, source, html_field, hash_field, render,
+                batch_size=500, on_batch=None):
+    """
+    Renders the ``source`` field of the rows of ``queryset`` into their
+    ``html_field`` with ``render``, stamping them with the source hash and
+    ``HTML_VERSION``. Rows are read and written in primary key batches of
+    ``batch_size``, and ``on_batch`` is called with the primary keys of each
+    written batch. Returns the number of rows rendered.
+    """
+    fields = [html_field, hash_field, 'html_version']
+    rendered = 0
+    last_pk = None
+    while True:
+        batch = queryset.order_by('pk').only('pk', source, *fields)
+        if last_pk is not None:
+            batch = batch.filter(pk__gt=last_pk)
+        rows = list(batch[:batch_size])
+        if not rows:
+            return rendered
+        for row in rows:
+            text = getattr(row, source)
+            setattr(row, html_field, render(text))
+            setattr(row, hash_field, content_hash(text))
+            row.html_version = HTML_VERSION
+        queryset.model.objects.bulk_update(rows, fields)
+        if on_batch is not None:
+            on_batch([row.pk for row in rows])
+        rendered += len(rows)
+        last_pk = rows[-1].pk
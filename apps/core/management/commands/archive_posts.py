@@ -0,0 +1,87 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from groups.models import Group
+from posts.cache import group_scope, post_cache, post_scope
+from posts.models import Post
+
+
+class Command(BaseCommand):
+    help = (
+        'Archive the public posts of groups with archive_posts set once they '
+        'are older than the group archive_after_months (run periodically, e.g. daily)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=500,
+            help='Number of posts archived per UPDATE and transaction'
+        )
+        parser.add_argument(
+            '--sleep', type=float, default=0,
+            help='Seconds to pause between batches'
+        )
+        parser.add_argument(
+            '--group', type=int, action='append', dest='groups',
+            help='Only archive the posts of this group id (repeatable)'
+        )
+
+    def archive_group(self, group, now, batch_size, pause):
+        """
+        Archives the due public posts of a group in batches ordered by
+        creation date, read from the partial index of public posts. Archived
+        posts leave the index, so each batch starts where the last one ended
+        and an interrupted run, a back-dated post or one moved into the group
+        are picked up by the next run.
+        """
+        cutoff = group.archive_cutoff(now)
+        posts = Post.objects.filter(
+            group=group, status=Post.STATUS.PUBLIC, created_at__lt=cutoff
+        )
+        archived = 0
+        while True:
+            with transaction.atomic():
+                pks = list(
+                    posts.order_by('created_at', 'id')
+                    .values_list('pk', flat=True)[:batch_size]
+                )
+                if not pks:
+                    return archived
+                archived += Post.objects\
+                    .filter(pk__in=pks, status=Post.STATUS.PUBLIC)\
+                    .update(status=Post.STATUS.ARCHIVED, updated_at=now)
+            post_cache.invalidate(
+                'listing', group_scope(group.pk), *[post_scope(pk) for pk in pks]
+            )
+            if len(pks) < batch_size:
+                return archived
+            if pause:
+                time.sleep(pause)
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        groups = Group.objects.filter(archive_posts=True).order_by('pk')
+        if options['groups']:
+            groups = groups.filter(pk__in=options['groups'])
+
+        started = time.monotonic()
+        total = 0
+        for group in groups:
+            group_started = time.monotonic()
+            archived = self.archive_group(
+                group, now, options['batch_size'], options['sleep']
+            )
+            total += archived
+            elapsed = time.monotonic() - group_started
+            self.stdout.write(
+                f'{group.name}: archived {archived} posts in {elapsed:.1f}s '
+                f'({archived / max(elapsed, 1e-6):.0f} rows/s)'
+            )
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Archived {total} posts in {elapsed:.1f}s '
+            f'({total / max(elapsed, 1e-6):.0f} rows/s)'
+        ))
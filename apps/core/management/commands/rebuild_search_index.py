@@ -0,0 +1,52 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from posts.models import Post
+from comments.models import PostComment
+from search.backends import get_backend, index_post, index_comment
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text search index of posts and comments'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=500,
+            help='Number of objects loaded per query'
+        )
+
+    def index_all(self, queryset, index, backend, batch_size):
+        last_pk = 0
+        indexed = 0
+        while True:
+            batch = list(queryset.filter(pk__gt=last_pk).order_by('pk')[:batch_size])
+            if not batch:
+                return indexed
+            for obj in batch:
+                index(obj, backend=backend)
+            indexed += len(batch)
+            last_pk = batch[-1].pk
+
+    def handle(self, *args, **options):
+        backend = get_backend()
+        started = time.monotonic()
+        # Searches keep reading the old index until the new one is committed,
+        # and a failed rebuild leaves the old index in place.
+        with transaction.atomic():
+            backend.clear()
+            posts = self.index_all(
+                Post.objects.exclude(status=Post.STATUS.DRAFT),
+                index_post, backend, options['batch_size']
+            )
+            comments = self.index_all(
+                PostComment.objects.filter(is_removed=False)
+                .exclude(post__status=Post.STATUS.DRAFT)
+                .select_related('post').defer('post__content', 'post__content_html'),
+                index_comment, backend, options['batch_size']
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f'Indexed {posts} posts and {comments} comments '
+            f'in {time.monotonic() - started:.1f}s'
+        ))
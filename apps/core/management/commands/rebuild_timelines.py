@@ -0,0 +1,47 @@
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from timelines.services import rebuild_timeline, refresh_pull_sources
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the pull sources and the home timelines of all or some users'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'usernames', nargs='*',
+            help='Users whose timelines are rebuilt (default: all users)'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=100,
+            help='Number of timelines rebuilt per transaction'
+        )
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        sources = refresh_pull_sources()
+        users = User.objects.all()
+        if options['usernames']:
+            users = users.filter(username__in=options['usernames'])
+
+        last_pk = 0
+        rebuilt = 0
+        while True:
+            batch = list(
+                users.filter(pk__gt=last_pk).order_by('pk')
+                .values_list('pk', flat=True)[:options['batch_size']]
+            )
+            if not batch:
+                break
+            with transaction.atomic():
+                for user_id in batch:
+                    rebuild_timeline(user_id)
+            rebuilt += len(batch)
+            last_pk = batch[-1]
+        self.stdout.write(self.style.SUCCESS(
+            f'Rebuilt {rebuilt} timelines with {sources} pull sources '
+            f'in {time.monotonic() - started:.1f}s'
+        ))
@@ -0,0 +1,162 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+from comments.models import PostComment, PostCommentVote
+from comments.paths import reply_counts
+from posts.cache import group_scope, post_cache, post_scope
+from posts.models import Post, PostTag, PostVote
+from tags.models import Tag
+
+
+class Command(BaseCommand):
+    help = (
+        'Rebuild stored counters from their tables: post and comment votes, '
+        'post comment counts, comment reply counts and tag post counts. '
+        'Recounts every family unless some are picked with their flags'
+    )
+
+    FAMILIES = {
+        'post_votes': 'the post scores, vote counts and feed ranks',
+        'comment_votes': 'the comment scores, vote counts and sort keys',
+        'post_comments': 'the post comment counts',
+        'comment_replies': 'the comment child and descendant counts',
+        'tag_posts': 'the tag post counts',
+    }
+
+    def add_arguments(self, parser):
+        for family, description in self.FAMILIES.items():
+            parser.add_argument(
+                f"--{family.replace('_', '-')}", action='store_true', dest=family,
+                help=f'Recount {description}'
+            )
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Number of rows updated per statement'
+        )
+
+    def vote_count(self, value):
+        votes = PostVote.objects\
+            .filter(post=OuterRef('pk'), vote=value)\
+            .order_by()\
+            .values('post')\
+            .annotate(total=Count('pk'))\
+            .values('total')
+        return Coalesce(Subquery(votes), Value(0))
+
+    def comment_vote_count(self, value):
+        votes = PostCommentVote.objects\
+            .filter(post_comment=OuterRef('pk'), vote=value)\
+            .order_by()\
+            .values('post_comment')\
+            .annotate(total=Count('pk'))\
+            .values('total')
+        return Coalesce(Subquery(votes), Value(0))
+
+    def comment_score(self):
+        votes = PostCommentVote.objects\
+            .filter(post_comment=OuterRef('pk'))\
+            .order_by()\
+            .values('post_comment')\
+            .annotate(total=Sum('vote'))\
+            .values('total')
+        return Coalesce(Subquery(votes), Value(0))
+
+    def post_comment_count(self):
+        comments = PostComment.objects\
+            .filter(post=OuterRef('pk'), is_removed=False)\
+            .order_by()\
+            .values('post')\
+            .annotate(total=Count('pk'))\
+            .values('total')
+        return Coalesce(Subquery(comments), Value(0))
+
+    def tag_post_count(self):
+        posts = PostTag.objects\
+            .filter(tag=OuterRef('pk'))\
+            .order_by()\
+            .values('tag')\
+            .annotate(total=Count('pk'))\
+            .values('total')
+        return Coalesce(Subquery(posts), Value(0))
+
+    def invalidate_posts(self, pks):
+        """
+        Drops the cached responses showing the recounted posts.
+        """
+        group_ids = set(
+            Post.objects.filter(pk__in=pks, group__isnull=False)
+            .values_list('group_id', flat=True)
+        )
+        post_cache.invalidate(
+            'listing',
+            *[group_scope(group_id) for group_id in group_ids],
+            *[post_scope(pk) for pk in pks]
+        )
+
+    def refresh_posts(self, pks):
+        """
+        Recomputes the feed ranks of the recounted posts from their fixed
+        scores and drops the cached responses showing them.
+        """
+        Post.refresh_ranks(pks)
+        self.invalidate_posts(pks)
+
+    def recount(self, model, batch_size, refresh=None, **counters):
+        last_pk = 0
+        updated = 0
+        while True:
+            pks = list(
+                model.objects.filter(pk__gt=last_pk)
+                .order_by('pk')
+                .values_list('pk', flat=True)[:batch_size]
+            )
+            if not pks:
+                break
+            updated += model.objects.filter(pk__in=pks).update(**counters)
+            if refresh is not None:
+                refresh(pks)
+            last_pk = pks[-1]
+        return updated
+
+    def recount_post_votes(self, batch_size):
+        posts = self.recount(
+            Post, batch_size,
+            refresh=self.refresh_posts,
+            upvotes=self.vote_count(1),
+            downvotes=self.vote_count(-1),
+            score=self.vote_count(1) - self.vote_count(-1),
+        )
+        return f'Recounted votes of {posts} posts'
+
+    def recount_comment_votes(self, batch_size):
+        comments = self.recount(
+            PostComment, batch_size,
+            refresh=PostComment.refresh_ranks,
+            upvotes=self.comment_vote_count(1),
+            downvotes=self.comment_vote_count(-1),
+            score=self.comment_score(),
+        )
+        return f'Recounted votes of {comments} comments'
+
+    def recount_post_comments(self, batch_size):
+        posts = self.recount(
+            Post, batch_size,
+            refresh=self.invalidate_posts,
+            comment_count=self.post_comment_count(),
+        )
+        return f'Recounted comments of {posts} posts'
+
+    def recount_comment_replies(self, batch_size):
+        comments = self.recount(PostComment, batch_size, **reply_counts(PostComment))
+        return f'Recounted replies of {comments} comments'
+
+    def recount_tag_posts(self, batch_size):
+        tags = self.recount(Tag, batch_size, post_count=self.tag_post_count())
+        return f'Recounted posts of {tags} tags'
+
+    def handle(self, *args, **options):
+        families = [family for family in self.FAMILIES if options[family]] or list(self.FAMILIES)
+        for family in families:
+            message = getattr(self, f'recount_{family}')(options['batch_size'])
+            self.stdout.write(self.style.SUCCESS(message))
@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+from django.utils import timezone
+
+from posts.cache import post_cache
+from posts.models import Post
+from posts.ranking import RISING_WINDOW
+
+
+class Command(BaseCommand):
+    help = 'Recompute the stored feed ranks (hot, rising) of posts'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all', action='store_true',
+            help='Recompute every post instead of the rising window only'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Number of posts recomputed per batch'
+        )
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        queryset = Post.objects.all()
+        if not options['all']:
+            # Recent posts decay, older ones still ranked as rising drop to 0
+            queryset = queryset.filter(
+                Q(created_at__gte=now - RISING_WINDOW) | ~Q(rising_rank=0)
+            )
+
+        last_pk = 0
+        refreshed = 0
+        while True:
+            pks = list(
+                queryset.filter(pk__gt=last_pk)
+                .order_by('pk')
+                .values_list('pk', flat=True)[:options['batch_size']]
+            )
+            if not pks:
+                break
+            refreshed += Post.refresh_ranks(pks, now=now)
+            last_pk = pks[-1]
+        post_cache.invalidate('listing')
+        self.stdout.write(self.style.SUCCESS(f'Refreshed ranks of {refreshed} posts'))
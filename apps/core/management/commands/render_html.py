@@ -0,0 +1,50 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from comments.models import PostComment
+from core.html import HTML_VERSION, render_rows, render_text, sanitize_html
+from posts.cache import post_cache, post_scope
+from posts.models import Post
+
+
+class Command(BaseCommand):
+    help = (
+        'Render the stored HTML of posts and comments rendered with older '
+        'sanitizer rules (run after bumping core.html.HTML_VERSION)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=500,
+            help='Number of rows rendered per UPDATE'
+        )
+        parser.add_argument(
+            '--all', action='store_true',
+            help='Render every row instead of only the stale ones'
+        )
+
+    def stale(self, model, hash_field, everything):
+        queryset = model.objects.all()
+        if not everything:
+            queryset = queryset.filter(
+                Q(html_version__lt=HTML_VERSION) | Q(**{hash_field: ''})
+            )
+        return queryset
+
+    def invalidate_posts(self, pks):
+        post_cache.invalidate('listing', *[post_scope(pk) for pk in pks])
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        posts = render_rows(
+            self.stale(Post, 'content_hash', options['all']),
+            'content', 'content_html', 'content_hash', sanitize_html,
+            batch_size=batch_size, on_batch=self.invalidate_posts
+        )
+        self.stdout.write(self.style.SUCCESS(f'Rendered {posts} posts'))
+        comments = render_rows(
+            self.stale(PostComment, 'comment_hash', options['all']),
+            '_comment', 'comment_html', 'comment_hash', render_text,
+            batch_size=batch_size
+        )
+        self.stdout.write(self.style.SUCCESS(f'Rendered {comments} comments'))
@@ -1,6 +1,9 @@
 from rest_framework.response import Response
 from rest_framework import serializers
 from rest_framework import status
+from rest_framework.settings import api_settings
+from .pagination import KeysetPagination
+from .serializers import DynamicFieldsMixin
 
 
 class MultiSerializerViewSetMixin(object):
@@ -62,30 +65,122 @@ class MultiPermissionViewSetMixin(object):
 
 
 class PaginatedResponseMixin(object):
-    def paginated_response(self, queryset, context=None, paginator=None, fields=None):
+    # Set to True to always use cursor pagination in paginated_response
+    keyset_pagination = False
+    # (paginator, page) loaded by paginate_for_validators
+    validated_page = None
+
+    def use_keyset_pagination(self):
+        """
+        Cursor (keyset) pagination is used when the viewset opts in, or when
+        the request asks for it with ``?pagination=cursor`` or by following a
+        ``?cursor=`` link.
+        """
+        params = self.request.query_params
+        return self.keyset_pagination or 'cursor' in params\
+            or params.get('pagination') == 'cursor'
+
+    def get_keyset_paginator(self):
+        paginator = KeysetPagination()
+        paginator.page_size = getattr(self.pagination_class, 'page_size', None)\
+            or api_settings.PAGE_SIZE or paginator.page_size
+        return paginator
+
+    def get_page_serializer_context(self, page, context=None):
         """
-        This function should be called when a paginated response is needed
+        Hook to add page-level data (e.g. state loaded in bulk for all the
+        objects of the page) to the serializer context before serializing
+        a page. Returns the context unchanged by default.
         """
-        page = None
+        return context
 
+    def paginate_page(self, queryset, paginator=None):
+        """
+        Returns ``(paginator, page)`` for the request, where ``paginator`` is
+        None when the viewset's own paginator is used and ``page`` is None
+        when the viewset does not paginate.
+        """
+        if paginator is None and self.use_keyset_pagination():
+            paginator = self.get_keyset_paginator()
         if paginator is not None:
-            page = paginator.paginate_queryset(queryset, request=self.request)
+            return paginator, paginator.paginate_queryset(queryset, request=self.request)
+        return None, self.paginate_queryset(queryset)
+
+    def paginate_for_validators(self, queryset):
+        """
+        Returns the objects of the requested page of ``queryset`` without
+        building a response, e.g. to compute conditional GET validators.
+        The page is kept, and the next paginated_response serializes it
+        instead of querying the page (and its count) again.
+        """
+        serializer = self.get_serializer()
+        if isinstance(serializer, DynamicFieldsMixin):
+            queryset = serializer.restrict_queryset(queryset)
+        paginator, page = self.paginate_page(queryset)
+        if page is None:
+            return list(queryset)
+        self.validated_page = (paginator, page)
+        return page
+
+    def paginated_response(self, queryset, context=None, paginator=None, fields=None):
+        """
+        This function should be called when a paginated response is needed.
+        ``fields`` limits the serialized fields, otherwise the ``?fields=``
+        and ``?omit=`` query parameters do for dynamic fields serializers.
+        A page already loaded by paginate_for_validators is reused.
+        """
+        if context is None:
+            context = self.get_serializer_context()
+        kwargs = {}
+        if fields is not None:
+            kwargs = {'fields': fields}
+
+        serializer = self.get_serializer(context=context, **kwargs)
+        if isinstance(serializer, DynamicFieldsMixin):
+            queryset = serializer.restrict_queryset(queryset)
+
+        if self.validated_page is not None:
+            paginator, page = self.validated_page
         else:
-            page = self.paginate_queryset(queryset)
+            paginator, page = self.paginate_page(queryset, paginator)
 
         if page is not None:
-            kwargs = {}
-            if fields is not None:
-                kwargs = {'fields': fields}
+            context = self.get_page_serializer_context(page, context)
             serializer = self.get_serializer(page, context=context, many=True, **kwargs)
             if paginator is not None:
                 return paginator.get_paginated_response(serializer.data)
             return self.get_paginated_response(serializer.data)
 
-        serializer = self.get_serializer(queryset, context=context, many=True, fields=fields)
+        serializer = self.get_serializer(queryset, context=context, many=True, **kwargs)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
+class CachedResponseMixin(object):
+    # core.cache.ResponseCache used by the actions decorated with
+    # core.cache.cache_response
+    response_cache = None
+    # Version of each scope the response being cached depends on
+    cache_versions = None
+
+    def get_cache_scopes(self, request, *args, **kwargs):
+        """
+        Returns the scopes every response of the action depends on, the
+        fixed scopes of the response cache by default.
+        """
+        return self.response_cache.scopes
+
+    def add_cache_scopes(self, *scopes):
+        """
+        Records scopes the response being built depends on, when it is going
+        to be cached. Their versions are read right away, before the objects
+        they cover are serialized.
+        """
+        if self.cache_versions is not None:
+            added = set(scopes) - set(self.cache_versions)
+            if added:
+                self.cache_versions.update(self.response_cache.versions(added))
+
+
 class DestroyModelMixin:
     """
     Destroy a model instance.
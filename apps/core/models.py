@@ -1,6 +1,9 @@
 from django.db import models
+from django.db.models import Case, F, When
 import datetime
 
+from core.signals import counters_changed
+
 
 class TimeStampedModel(models.Model):
     """
@@ -19,3 +22,59 @@ class TimeStampedModel(models.Model):
     def is_edited(self):
         return (self.updated_at - self.created_at).total_seconds() > 1
     edited = property(is_edited)
+
+
+class StoredCountersMixin(object):
+    """
+    Mixin for models whose ``STORED_COUNTERS`` columns are maintained with
+    queryset updates (e.g. ``F('score') + 1``). Saving a loaded instance does
+    not write them back, since they may have moved since it was loaded.
+    """
+    STORED_COUNTERS = ()
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            deferred = self.get_deferred_fields()
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in self.STORED_COUNTERS
+                and field.attname not in deferred
+            ]
+        super().save(*args, **kwargs)
+
+    @classmethod
+    def shift_counters(cls, deltas, derived=None):
+        """
+        Adds ``deltas`` (``{pk: {counter: change}}``) to the stored counters
+        of several rows with a single UPDATE, then sends ``counters_changed``.
+        ``derived`` maps columns computed from the counters to a function
+        of a row's changes returning the expression of their new value, so
+        the same UPDATE keeps them in step. Returns the number of rows.
+        """
+        deltas = {
+            pk: changes for pk, changes in deltas.items()
+            if any(changes.values())
+        }
+        if not deltas:
+            return 0
+        updates = {}
+        for name in {name for changes in deltas.values() for name in changes}:
+            whens = [
+                When(pk=pk, then=F(name) + changes[name])
+                for pk, changes in deltas.items() if changes.get(name)
+            ]
+            if whens:
+                updates[name] = Case(
+                    *whens, default=F(name),
+                    output_field=cls._meta.get_field(name)
+                )
+        for name, expression in (derived or {}).items():
+            updates[name] = Case(
+                *[When(pk=pk, then=expression(changes)) for pk, changes in deltas.items()],
+                default=F(name),
+                output_field=cls._meta.get_field(name)
+            )
+        updated = cls.objects.filter(pk__in=list(deltas)).update(**updates)
+        counters_changed.send(sender=cls, pks=list(deltas))
+        return updated
@@ -0,0 +1,132 @@
+import base64
+import json
+from collections import OrderedDict
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination keyed on the whole ordering of the queryset, e.g.
+    ``(created_at, id)`` or ``(hot_rank, id)``.
+
+    Pages are fetched by seeking past the last row of the previous page on
+    the index of the ordering instead of using an OFFSET, and no ``COUNT(*)``
+    is run, so the cost of a page does not depend on its depth. The primary
+    key is appended to the ordering when missing to keep it unique. Ordering
+    fields must be non-null columns of the model itself.
+    """
+    page_size = 24
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.model = queryset.model
+        self.ordering = self.get_ordering(queryset)
+
+        cursor = self.decode_cursor(request)
+        reverse = False
+        ordering = self.ordering
+        if cursor is not None:
+            values, reverse = cursor
+            if reverse:
+                ordering = [(name, not descending) for name, descending in ordering]
+            queryset = queryset.filter(self.seek_filter(ordering, values))
+
+        order_by = [('-' if descending else '') + name for name, descending in ordering]
+        results = list(queryset.order_by(*order_by)[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+
+        if reverse:
+            results.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, cursor is not None
+        self.page = results
+        return results
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+    def get_ordering(self, queryset):
+        """
+        Returns the ordering of the queryset as (field name, descending) pairs,
+        ending with the primary key.
+        """
+        order_by = queryset.query.order_by or queryset.model._meta.ordering
+        pk_name = self.model._meta.pk.name
+        ordering = []
+        for item in order_by:
+            if not isinstance(item, str):
+                raise ValueError('Keyset pagination only supports ordering by field names')
+            name = item.lstrip('-')
+            name = pk_name if name == 'pk' else name
+            ordering.append((name, item.startswith('-')))
+        if pk_name not in [name for name, descending in ordering]:
+            descending = ordering[0][1] if ordering else False
+            ordering.append((pk_name, descending))
+        return ordering
+
+    def seek_filter(self, ordering, values):
+        """
+        Builds ``a <= x AND (a < x OR (a = x AND b < y))`` for the ordering
+        (with the comparisons flipped for ascending fields). The bound on the
+        leading column lets the database range scan its index.
+        """
+        seek = Q()
+        equal = Q()
+        for (name, descending), value in zip(ordering, values):
+            lookup = 'lt' if descending else 'gt'
+            seek |= equal & Q(**{f'{name}__{lookup}': value})
+            equal &= Q(**{name: value})
+        name, descending = ordering[0]
+        bound = Q(**{f"{name}__{'lte' if descending else 'gte'}": values[0]})
+        return bound & seek
+
+    def encode_cursor(self, obj, reverse):
+        values = [
+            self.model._meta.get_field(name).value_to_string(obj)
+            for name, descending in self.ordering
+        ]
+        payload = json.dumps({'v': values, 'r': int(reverse)}, separators=(',', ':'))
+        cursor = base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii')
+        return replace_query_param(self.request.build_absolute_uri(), self.cursor_query_param, cursor)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')))
+            values = [
+                self.model._meta.get_field(name).to_python(value)
+                for (name, descending), value in zip(self.ordering, payload['v'])
+            ]
+            if len(values) != len(self.ordering):
+                raise ValueError
+            return values, bool(payload.get('r'))
+        except (TypeError, ValueError, KeyError, ValidationError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.request.build_absolute_uri(), self.cursor_query_param)
+        return self.encode_cursor(self.page[0], reverse=True)
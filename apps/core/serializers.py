@@ -1,3 +1,4 @@
+from django.core.exceptions import FieldDoesNotExist
 from django.db.models.query import QuerySet
 from rest_framework import serializers
 from django.apps import apps
@@ -14,3 +15,84 @@ class ModelReadOnlySerializer(serializers.ModelSerializer):
     class Meta:
         read_only_fields = ('id',)
     pass
+
+
+class DynamicFieldsMixin(object):
+    """
+    Serializer mixin that keeps only the fields asked for, either with the
+    ``fields`` / ``omit`` keyword arguments or with the comma-separated
+    ``?fields=`` / ``?omit=`` query parameters of the request passed in the
+    context. Dropped fields are never evaluated, so their
+    SerializerMethodFields run no queries.
+    """
+    def __init__(self, *args, **kwargs):
+        fields = kwargs.pop('fields', None)
+        omit = kwargs.pop('omit', None)
+        super(DynamicFieldsMixin, self).__init__(*args, **kwargs)
+
+        if fields is None and omit is None and 'context' in kwargs:
+            fields, omit = self.requested_fields(kwargs['context'])
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+        for name in set(omit or ()) & set(self.fields):
+            self.fields.pop(name)
+
+    @staticmethod
+    def requested_fields(context):
+        """
+        Returns the (fields, omit) lists asked for by the request in
+        ``context``, None for each parameter it does not send.
+        """
+        request = (context or {}).get('request', None)
+        if request is None:
+            return None, None
+        params = getattr(request, 'query_params', request.GET)
+        return tuple(
+            [name.strip() for name in params[param].split(',') if name.strip()]
+            if param in params else None
+            for param in ('fields', 'omit')
+        )
+
+    def restrict_queryset(self, queryset):
+        """
+        Limits ``queryset`` to the columns and relations the kept fields
+        read: ``.only()`` their model fields and drop the select_related and
+        prefetch_related lookups they do not use. The queryset is returned
+        unchanged when a kept field reads something other than a model
+        field (a SerializerMethodField or a property), since its needs are
+        unknown.
+        """
+        model = queryset.model
+        names = set()
+        for field in self.fields.values():
+            if field.source == '*':
+                return queryset
+            try:
+                names.add(model._meta.get_field(field.source_attrs[0]).name)
+            except FieldDoesNotExist:
+                return queryset
+
+        columns = {model._meta.pk.name}
+        for name in names:
+            model_field = model._meta.get_field(name)
+            if model_field.concrete and not model_field.many_to_many:
+                columns.add(name)
+        for ordering in queryset.query.order_by:
+            if isinstance(ordering, str) and '__' not in ordering:
+                columns.add(ordering.lstrip('-'))
+
+        related = queryset.query.select_related
+        if isinstance(related, dict):
+            queryset = queryset.select_related(None)\
+                .select_related(*[name for name in related if name in names])
+        prefetches = [
+            lookup for lookup in queryset._prefetch_related_lookups
+            if isinstance(lookup, str) and lookup.split('__')[0] in names
+        ]
+        return queryset.prefetch_related(None).prefetch_related(*prefetches)\
+            .only(*columns)
+
+
+class DynamicFieldsModelSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    pass
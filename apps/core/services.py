@@ -1,8 +1,11 @@
 from django.conf import settings
 from django.core.mail import send_mail
+from django.db import transaction
 from django.template import Context, Template
 
+from contextlib import contextmanager
 import os
+import threading
 
 
 def get_env_variable(var_name):
@@ -15,3 +18,71 @@ def get_env_variable(var_name):
 
 def mail(subject, email_template, recipient, context):
     pass
+
+
+VOTE_VALUES = {'upvote': 1, 'downvote': -1, 'remove_vote': 0}
+
+_vote_counters = threading.local()
+
+
+@contextmanager
+def deferred_vote_counters():
+    """
+    Within this block deleting a vote does not shift its target's counters;
+    the caller applies the summed change itself.
+    """
+    _vote_counters.deferred = True
+    try:
+        yield
+    finally:
+        _vote_counters.deferred = False
+
+
+def vote_counters_deferred():
+    return getattr(_vote_counters, 'deferred', False)
+
+
+def vote_deltas(previous, current):
+    """
+    Returns the (score, upvotes, downvotes) change caused by a vote moving
+    from ``previous`` to ``current``, each being -1, 0 or 1.
+    """
+    return (
+        current - previous,
+        int(current == 1) - int(previous == 1),
+        int(current == -1) - int(previous == -1),
+    )
+
+
+def upsert_vote(vote_model, target_field, target, user, value):
+    """
+    Records ``user``'s vote of ``value`` on ``target`` and returns the vote
+    it replaced (0 if none).
+
+    The vote row is written with a single INSERT ... ON CONFLICT statement
+    against the (target, user) unique constraint; a value of 0 deletes the
+    row instead of storing it. The target's stored counters are shifted by
+    the change through ``apply_vote_change``.
+
+    The target row is locked before the previous vote is read: on a first
+    vote there is no vote row to lock yet, and two concurrent first votes
+    would otherwise both read 0 and both shift the counters.
+    """
+    with transaction.atomic():
+        type(target).objects.filter(pk=target.pk).select_for_update()\
+            .values_list('pk', flat=True).first()
+        votes = vote_model.objects.filter(**{target_field: target, 'user': user})
+        previous = votes.select_for_update().values_list('vote', flat=True).first() or 0
+        if previous == value:
+            return previous
+        if value == 0:
+            votes.delete()
+            return previous
+        vote_model.objects.bulk_create(
+            [vote_model(**{target_field: target, 'user': user, 'vote': value})],
+            update_conflicts=True,
+            unique_fields=[target_field, 'user'],
+            update_fields=['vote', 'updated_at'],
+        )
+        type(target).apply_vote_change(target.pk, previous, value)
+    return previous
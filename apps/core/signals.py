@@ -0,0 +1,5 @@
+from django.dispatch import Signal
+
+# Sent by StoredCountersMixin.shift_counters with the pks of the rows whose
+# counters were updated in bulk, which bypasses post_save
+counters_changed = Signal()
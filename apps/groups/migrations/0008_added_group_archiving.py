@@ -0,0 +1,23 @@
+# Generated by Django 5.1.3 on 2026-10-18 06:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('groups', '0007_alter_group_id_alter_groupinvite_id_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='group',
+            name='archive_after_months',
+            field=models.PositiveSmallIntegerField(default=6, help_text='Age in months after which posts are archived, when archive_posts is set'),
+        ),
+        migrations.AddField(
+            model_name='group',
+            name='posts_archived_until',
+            field=models.DateTimeField(blank=True, editable=False, help_text='Creation date up to which posts have been archived, where archiving resumes', null=True),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.3 on 2026-10-18 07:03
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('groups', '0008_added_group_archiving'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='groupmember',
+            index=models.Index(fields=['group', 'user'], name='groups_member_group_user_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='memberrequest',
+            index=models.Index(fields=['group', 'user'], name='groups_request_group_user_idx'),
+        ),
+    ]
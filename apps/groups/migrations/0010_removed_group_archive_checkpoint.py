@@ -0,0 +1,17 @@
+# Generated by Django 5.1.3 on 2026-10-18 07:51
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('groups', '0009_added_hot_query_indexes'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='group',
+            name='posts_archived_until',
+        ),
+    ]
@@ -1,3 +1,5 @@
+import calendar
+
 from django.db import models
 from core.models import TimeStampedModel
 from django.contrib.auth.models import User
@@ -27,6 +29,10 @@ class Group(TimeStampedModel):
         default=False,
         help_text="Posts after a period of X months will be archived automatically"
     )
+    archive_after_months = models.PositiveSmallIntegerField(
+        default=6,
+        help_text="Age in months after which posts are archived, when archive_posts is set"
+    )
     topics = models.ManyToManyField(
         Tag, blank=True,
         verbose_name="topics",
@@ -40,3 +46,13 @@ class Group(TimeStampedModel):
 
     def __str__(self):
         return f"Group: {self.name}"
+
+    def archive_cutoff(self, now):
+        """
+        Returns the date ``archive_after_months`` calendar months before
+        ``now``; posts created before it are due for archiving.
+        """
+        month = now.year * 12 + now.month - 1 - self.archive_after_months
+        year, month = divmod(month, 12)
+        day = min(now.day, calendar.monthrange(year, month + 1)[1])
+        return now.replace(year=year, month=month + 1, day=day)
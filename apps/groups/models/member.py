@@ -49,6 +49,9 @@ class GroupMember(TimeStampedModel):
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=['group', 'user'], name='groups_member_group_user_idx'),
+        ]
         verbose_name = "Group Member"
         verbose_name_plural = "Group Members"
 
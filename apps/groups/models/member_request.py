@@ -19,6 +19,9 @@ class MemberRequest(TimeStampedModel):
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=['group', 'user'], name='groups_request_group_user_idx'),
+        ]
         verbose_name = "Member Request"
         verbose_name_plural = "Member Requests"
 
@@ -3,16 +3,22 @@ from rest_framework.response import Response
 from rest_framework.decorators import action
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.permissions import IsAuthenticated
+from core.cache import cache_response
+from core.conditional import conditional_response, fingerprint
+from core.mixins import CachedResponseMixin
 from core.views import BaseViewSet, BaseReadOnlyViewSet
-from groups.models import Group, GroupMember, MemberRequest
+from groups.models import Group, GroupMember, GroupRule, MemberRequest
 from django.contrib.auth.models import User
 from groups.filters import GroupFilterSet
 from groups.serializers import (
     GroupReadOnlySerializer, GroupSerializer,
     GroupCreateSerializer, GroupHeavySerializer
 )
+from posts import ranking
+from posts.cache import group_scope, post_cache, post_scope
 from posts.models import Post
-from posts.serializers import PostReadOnlySerializer
+from posts.serializers import PostListSerializer
+from posts.services import load_viewer_state
 from groups.permissions import (
     HasGroupEditPermissions, HasGroupDeletePermissions
 )
@@ -22,14 +28,14 @@ class GroupPagination(PageNumberPagination):
     page_size = 24
 
 
-class GroupViewSet(BaseViewSet):
+class GroupViewSet(CachedResponseMixin, BaseViewSet):
     queryset = Group.objects.all().order_by('created_at')
     serializer_class = GroupSerializer
     serializer_action_classes = {
         'create' : GroupCreateSerializer,
         'update' : GroupCreateSerializer,
         'retrieve' : GroupHeavySerializer,
-        'posts': PostReadOnlySerializer
+        'posts': PostListSerializer
     }
     permission_action_classes = {
         'update': [HasGroupEditPermissions,],
@@ -39,13 +45,53 @@ class GroupViewSet(BaseViewSet):
     }
     pagination_class = GroupPagination
     filterset_class = GroupFilterSet
+    response_cache = post_cache
 
+    def get_cache_scopes(self, request, pk=None):
+        if self.action == 'posts':
+            return {group_scope(pk)}
+        return super(GroupViewSet, self).get_cache_scopes(request, pk)
+
+    def get_page_serializer_context(self, page, context=None):
+        self.add_cache_scopes(*[post_scope(post.pk) for post in page])
+        if self.action == 'posts':
+            context = dict(context or self.get_serializer_context())
+            context['viewer_state'] = load_viewer_state(page, self.request.user)
+        return super(GroupViewSet, self).get_page_serializer_context(page, context)
+
+    def get_response_validators(self, request, pk=None):
+        """
+        Versions a response by the shown groups, their topics, members and
+        rules, and the viewer's membership requests.
+        """
+        groups = Group.objects.all()
+        if self.action == 'retrieve':
+            if not str(pk).isdigit():
+                return None
+            groups = groups.filter(pk=pk)
+        if not groups.exists():
+            return None
+        version = [
+            fingerprint(groups),
+            fingerprint(Group.topics.through.objects.filter(group__in=groups), 'id'),
+            fingerprint(GroupMember.objects.filter(group__in=groups)),
+        ]
+        if self.action == 'retrieve':
+            version.append(fingerprint(GroupRule.objects.filter(group__in=groups)))
+        if request.user.is_authenticated:
+            version.append(fingerprint(
+                MemberRequest.objects.filter(group__in=groups, user=request.user)
+            ))
+        return version, version[0][1]
+
+    @conditional_response
     def list(self, request):
         queryset = self.queryset
         serializer_class = self.get_serializer_class()
         serializer = serializer_class(queryset, many=True, context={'request': request })
         return Response(serializer.data, status=status.HTTP_200_OK)
 
+    @conditional_response
     def retrieve(self, request, pk=None):
         group = self.get_object()
         serializer_class = self.get_serializer_class()
@@ -84,12 +130,30 @@ class GroupViewSet(BaseViewSet):
         return Response(status=status.HTTP_403_FORBIDDEN)
 
     @action(detail=True)
+    @cache_response
     def posts(self, request, pk=None):
+        """
+        Lists the published posts of a group with the feed sorts, paged with
+        a cursor over the per-group sort indexes.
+        """
+        sort = request.query_params.get('sort', ranking.DEFAULT_SORT)
+        if sort not in ranking.SORTS:
+            return Response(
+                {'error': f"Unknown sort '{sort}'. Use one of: {', '.join(ranking.SORTS)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         group = self.get_object()
-        queryset = Post.objects.filter(group=group)
-        serializer_class = self.get_serializer_class()
-        serializer = serializer_class(queryset, many=True, context={'user': request.user })
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        queryset = Post.objects\
+            .filter(group=group)\
+            .exclude(status=Post.STATUS.DRAFT)\
+            .select_related('author', 'group')\
+            .prefetch_related('tags__tag_type')\
+            .defer('content', 'content_html')\
+            .order_by(*ranking.SORTS[sort])
+        return self.paginated_response(
+            queryset, context={'request': request},
+            paginator=self.get_keyset_paginator()
+        )
 
     @action(detail=True)
     def add_topic(self, request, pk=None):
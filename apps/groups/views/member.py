@@ -28,6 +28,7 @@ class GroupMemberViewSet(BaseReadOnlyViewSet):
                 queryset = queryset.filter(group__pk=self.kwargs['group_pk'])
         return queryset
 
-    # def list(self, request, group_pk=None):
-    #     queryset = self.filter_queryset(self.get_queryset())
-    #     return self.paginated_response(queryset, context={'request': request})
+    def list(self, request, group_pk=None):
+        queryset = self.filter_queryset(self.get_queryset())\
+            .select_related('group', 'user')
+        return self.paginated_response(queryset, context={'request': request})
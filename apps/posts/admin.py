@@ -1,7 +1,7 @@
 from django import forms
 from django.contrib import admin
 from django_ckeditor_5.widgets import CKEditor5Widget
-from posts.models import Post
+from posts.models import Post, PostTag
 
 
 class PostForm(forms.ModelForm):
@@ -12,6 +12,14 @@ class PostForm(forms.ModelForm):
         fields = '__all__'
 
 
+class PostTagInline(admin.TabularInline):
+    model = PostTag
+    raw_id_fields = ('tag',)
+    extra = 1
+    verbose_name = 'Tag'
+    verbose_name_plural = 'Typology'
+
+
 @admin.register(Post)
 class PostAdmin(admin.ModelAdmin):
     list_display = (
@@ -29,7 +37,7 @@ class PostAdmin(admin.ModelAdmin):
     )
     list_editable = ('status', 'group',)
     raw_id_fields = ('author', 'group',)
-    filter_horizontal = ['tags']
+    inlines = [PostTagInline]
     search_fields = ('title', 'content',)
     date_hierarchy = 'created_at'
     form = PostForm
@@ -37,9 +45,6 @@ class PostAdmin(admin.ModelAdmin):
         ('Post Info', {
             'fields': ('title', 'content', 'author', 'group',),
         }),
-        ('Typology', {
-            'fields': ('tags',),
-        }),
         ('Status', {
             'fields': ('status',),
         }),
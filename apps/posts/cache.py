@@ -0,0 +1,15 @@
+from core.cache import ResponseCache
+
+# Cache of the anonymous PostViewSet responses. Every entry depends on the
+# 'listing' scope, which changes when posts are added, edited or removed,
+# and on the scope of each post it shows. Group post listings depend on the
+# scope of their group instead of 'listing'.
+post_cache = ResponseCache('posts', scopes=('listing',))
+
+
+def post_scope(post_id):
+    return f'post:{post_id}'
+
+
+def group_scope(group_id):
+    return f'group:{group_id}'
@@ -1,12 +1,36 @@
 import django_filters
-from posts.models import Post
+from posts.models import Post, PostTag
 from django.db import models
 
 
+class NumberInFilter(django_filters.BaseInFilter, django_filters.NumberFilter):
+    pass
+
+
 class PostFilterSet(django_filters.FilterSet):
+    """
+    ``tags`` keeps posts having any of the given tag ids and ``tags_all``
+    posts having all of them (``?tags=1,2``). Both match post ids read from
+    the (tag, post) index of the through table, so no join or DISTINCT is
+    needed over the posts.
+    """
     title = django_filters.CharFilter(field_name='title', lookup_expr='contains')
     author = django_filters.CharFilter(field_name='author__username', lookup_expr='exact')
+    tags = NumberInFilter(method='filter_any_tags')
+    tags_all = NumberInFilter(method='filter_all_tags')
 
     class Meta:
         model = Post
-        fields = ('title', 'status', 'group', 'author')
+        fields = ('title', 'status', 'group', 'author', 'tags', 'tags_all')
+
+    @staticmethod
+    def tagged_post_ids(tag_ids):
+        return PostTag.objects.filter(tag__in=tag_ids).values('post')
+
+    def filter_any_tags(self, queryset, name, value):
+        return queryset.filter(pk__in=self.tagged_post_ids(value))
+
+    def filter_all_tags(self, queryset, name, value):
+        for tag_id in set(value):
+            queryset = queryset.filter(pk__in=self.tagged_post_ids([tag_id]))
+        return queryset
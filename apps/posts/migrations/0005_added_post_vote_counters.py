@@ -0,0 +1,48 @@
+# Generated by Django 5.1.3 on 2026-10-18 05:31
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def count_votes(apps, schema_editor):
+    Post = apps.get_model('posts', 'Post')
+    PostVote = apps.get_model('posts', 'PostVote')
+    counts = {}
+    rows = PostVote.objects.exclude(vote=0).values('post', 'vote')\
+        .annotate(total=Count('pk')).order_by()
+    for row in rows:
+        counts.setdefault(row['post'], {})[row['vote']] = row['total']
+    for post_id, totals in counts.items():
+        upvotes = totals.get(1, 0)
+        downvotes = totals.get(-1, 0)
+        Post.objects.filter(pk=post_id).update(
+            score=upvotes - downvotes,
+            upvotes=upvotes,
+            downvotes=downvotes,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0004_alter_post_id_alter_postvote_id'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='downvotes',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='score',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='upvotes',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(count_votes, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,75 @@
+# Generated by Django 5.1.3 on 2026-10-18 05:34
+
+from datetime import datetime, timedelta, timezone as dt_timezone
+import math
+
+from django.conf import settings
+from django.db import migrations, models
+from django.utils import timezone
+
+# The rank formulas as of this migration, see posts.ranking
+HOT_EPOCH = datetime(2005, 12, 8, 7, 46, 43, tzinfo=dt_timezone.utc)
+HOT_DECAY_SECONDS = 45000
+RISING_WINDOW = timedelta(hours=24)
+
+
+def hot_rank(score, created_at):
+    order = math.log10(max(abs(score), 1))
+    sign = (score > 0) - (score < 0)
+    seconds = (created_at - HOT_EPOCH).total_seconds()
+    return round(sign * order + seconds / HOT_DECAY_SECONDS, 7)
+
+
+def rising_rank(score, created_at, now):
+    age = now - created_at
+    if age >= RISING_WINDOW:
+        return 0.0
+    hours = max(age.total_seconds() / 3600, 1.0)
+    return round(score / hours, 7)
+
+
+def compute_ranks(apps, schema_editor):
+    Post = apps.get_model('posts', 'Post')
+    now = timezone.now()
+    posts = []
+    for post in Post.objects.only('pk', 'score', 'created_at').iterator():
+        post.hot_rank = hot_rank(post.score, post.created_at)
+        post.rising_rank = rising_rank(post.score, post.created_at, now)
+        posts.append(post)
+    Post.objects.bulk_update(posts, ['hot_rank', 'rising_rank'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('groups', '0007_alter_group_id_alter_groupinvite_id_and_more'),
+        ('posts', '0005_added_post_vote_counters'),
+        ('tags', '0004_alter_tag_id_alter_tagtype_id'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='hot_rank',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='rising_rank',
+            field=models.FloatField(default=0),
+        ),
+        migrations.RunPython(compute_ranks, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['-hot_rank', '-id'], name='posts_post_hot_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['-rising_rank', '-id'], name='posts_post_rising_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['-score', '-id'], name='posts_post_top_idx'),
+        ),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 5.1.3 on 2026-10-18 05:43
+
+from datetime import datetime, timezone as dt_timezone
+import math
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+
+# The hot rank formula as of this migration, see posts.ranking
+HOT_EPOCH = datetime(2005, 12, 8, 7, 46, 43, tzinfo=dt_timezone.utc)
+HOT_DECAY_SECONDS = 45000
+
+
+def hot_rank(score, created_at):
+    order = math.log10(max(abs(score), 1))
+    sign = (score > 0) - (score < 0)
+    seconds = (created_at - HOT_EPOCH).total_seconds()
+    return round(sign * order + seconds / HOT_DECAY_SECONDS, 7)
+
+
+def remove_redundant_votes(apps, schema_editor):
+    """
+    Keeps only the most recent vote of each user on a post, drops votes of 0
+    and recounts the posts that lost votes. Rising ranks depend on the time
+    the migration runs and are left to the refresh_post_ranks command.
+    """
+    Post = apps.get_model('posts', 'Post')
+    PostVote = apps.get_model('posts', 'PostVote')
+    affected = set(PostVote.objects.filter(vote=0).values_list('post', flat=True))
+    duplicates = PostVote.objects.values('post', 'user')\
+        .annotate(total=Count('pk')).filter(total__gt=1).order_by()
+    for row in duplicates:
+        votes = PostVote.objects.filter(post=row['post'], user=row['user'])
+        keep = votes.order_by('-updated_at', '-pk').values_list('pk', flat=True).first()
+        votes.exclude(pk=keep).delete()
+        affected.add(row['post'])
+    PostVote.objects.filter(vote=0).delete()
+
+    for post in Post.objects.filter(pk__in=affected).only('pk', 'created_at'):
+        votes = PostVote.objects.filter(post=post)
+        post.upvotes = votes.filter(vote=1).count()
+        post.downvotes = votes.filter(vote=-1).count()
+        post.score = post.upvotes - post.downvotes
+        post.hot_rank = hot_rank(post.score, post.created_at)
+        post.save(update_fields=['score', 'upvotes', 'downvotes', 'hot_rank'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0006_added_post_ranks'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_redundant_votes, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='postvote',
+            constraint=models.UniqueConstraint(fields=('post', 'user'), name='posts_postvote_unique_voter'),
+        ),
+    ]
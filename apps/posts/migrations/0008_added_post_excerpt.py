@@ -0,0 +1,72 @@
+# Generated by Django 5.1.3 on 2026-10-18 06:07
+
+from html import unescape
+import math
+import re
+
+from django.db import migrations, models
+from django.utils.html import strip_tags
+from django.utils.text import Truncator
+
+# The text helpers as of this migration, see posts.text
+EXCERPT_LENGTH = 280
+WORDS_PER_MINUTE = 200
+WHITESPACE = re.compile(r'\s+')
+
+
+def plain_text(html):
+    html = re.sub(r'<(br|/p|/div|/li|/h[1-6]|/blockquote)\b[^>]*>', ' ', html or '')
+    return WHITESPACE.sub(' ', unescape(strip_tags(html))).strip()
+
+
+def excerpt(text, length=EXCERPT_LENGTH):
+    return Truncator(text).chars(length)
+
+
+def word_count(text):
+    return len(text.split())
+
+
+def reading_time(words):
+    return math.ceil(words / WORDS_PER_MINUTE) if words else 0
+
+
+def compute_text_stats(apps, schema_editor):
+    Post = apps.get_model('posts', 'Post')
+    posts = []
+    for post in Post.objects.only('pk', 'content').iterator():
+        text = plain_text(post.content)
+        post.excerpt = excerpt(text)
+        post.word_count = word_count(text)
+        post.reading_time = reading_time(post.word_count)
+        posts.append(post)
+        if len(posts) == 500:
+            Post.objects.bulk_update(posts, ['excerpt', 'word_count', 'reading_time'])
+            posts = []
+    Post.objects.bulk_update(posts, ['excerpt', 'word_count', 'reading_time'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0007_added_unique_post_votes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='excerpt',
+            field=models.CharField(blank=True, default='', max_length=280),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='reading_time',
+            field=models.PositiveIntegerField(default=0, help_text='Estimated reading time in minutes'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='word_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(compute_text_stats, migrations.RunPython.noop),
+    ]
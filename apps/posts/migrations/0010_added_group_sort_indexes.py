@@ -0,0 +1,33 @@
+# Generated by Django 5.1.3 on 2026-10-18 06:23
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('groups', '0007_alter_group_id_alter_groupinvite_id_and_more'),
+        ('posts', '0009_added_post_tag_model'),
+        ('tags', '0005_added_tag_post_count'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['group', '-created_at', '-id'], name='posts_post_group_new_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['group', '-hot_rank', '-id'], name='posts_post_group_hot_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['group', '-rising_rank', '-id'], name='posts_post_group_rising_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['group', '-score', '-id'], name='posts_post_group_top_idx'),
+        ),
+    ]
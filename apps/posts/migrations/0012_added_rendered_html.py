@@ -0,0 +1,142 @@
+# Generated by Django 5.1.3 on 2026-10-18 06:37
+
+from html import escape
+from html.parser import HTMLParser
+import hashlib
+import re
+from urllib.parse import urlsplit
+
+from django.db import migrations, models
+
+# The sanitizer as of this migration (HTML_VERSION 1), see core.html
+HTML_VERSION = 1
+
+ALLOWED_TAGS = {
+    'a', 'b', 'blockquote', 'br', 'code', 'em', 'figcaption', 'figure', 'h2',
+    'h3', 'h4', 'hr', 'i', 'img', 'li', 'ol', 'p', 'pre', 's', 'span', 'strong',
+    'sub', 'sup', 'table', 'tbody', 'td', 'th', 'thead', 'tr', 'u', 'ul',
+}
+ALLOWED_ATTRIBUTES = {
+    'a': {'href', 'title'},
+    'img': {'src', 'alt', 'width', 'height'},
+    'td': {'colspan', 'rowspan'},
+    'th': {'colspan', 'rowspan'},
+}
+URL_ATTRIBUTES = {'href', 'src'}
+ALLOWED_SCHEMES = {'', 'http', 'https', 'mailto'}
+VOID_TAGS = {'br', 'hr', 'img'}
+DROPPED_TAGS = {'script', 'style', 'iframe', 'object', 'embed', 'template', 'noscript', 'svg', 'math'}
+URL_IGNORED = re.compile(r'[\x00-\x20\x7f]+')
+
+
+def content_hash(text):
+    return hashlib.sha256((text or '').encode('utf-8')).hexdigest()
+
+
+def allowed_url(url):
+    try:
+        scheme = urlsplit(URL_IGNORED.sub('', url)).scheme
+    except ValueError:
+        return False
+    return scheme.lower() in ALLOWED_SCHEMES
+
+
+class Sanitizer(HTMLParser):
+    def __init__(self):
+        super(Sanitizer, self).__init__(convert_charrefs=True)
+        self.output = []
+        self.open_tags = []
+        self.dropping = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in DROPPED_TAGS:
+            self.dropping += 1
+            return
+        if self.dropping or tag not in ALLOWED_TAGS:
+            return
+        allowed = ALLOWED_ATTRIBUTES.get(tag, set())
+        kept = []
+        for name, value in attrs:
+            if name not in allowed or value is None:
+                continue
+            if name in URL_ATTRIBUTES and not allowed_url(value):
+                continue
+            kept.append(f' {name}="{escape(value, quote=True)}"')
+        if tag == 'a':
+            kept.append(' rel="nofollow noopener"')
+        self.output.append(f"<{tag}{''.join(kept)}>")
+        if tag not in VOID_TAGS:
+            self.open_tags.append(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag in DROPPED_TAGS:
+            self.dropping -= 1
+        elif tag not in VOID_TAGS and self.open_tags and self.open_tags[-1] == tag \
+                and not self.dropping:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        if tag in DROPPED_TAGS:
+            self.dropping = max(self.dropping - 1, 0)
+            return
+        if self.dropping or tag not in self.open_tags:
+            return
+        while self.open_tags:
+            name = self.open_tags.pop()
+            self.output.append(f'</{name}>')
+            if name == tag:
+                break
+
+    def handle_data(self, data):
+        if not self.dropping:
+            self.output.append(escape(data, quote=False))
+
+    def render(self, html):
+        self.feed(html or '')
+        self.close()
+        for name in reversed(self.open_tags):
+            self.output.append(f'</{name}>')
+        self.open_tags = []
+        return ''.join(self.output)
+
+
+def render_html(apps, schema_editor):
+    Post = apps.get_model('posts', 'Post')
+    fields = ['content_html', 'content_hash', 'html_version']
+    posts = []
+    for post in Post.objects.only('pk', 'content').iterator():
+        post.content_html = Sanitizer().render(post.content)
+        post.content_hash = content_hash(post.content)
+        post.html_version = HTML_VERSION
+        posts.append(post)
+        if len(posts) == 500:
+            Post.objects.bulk_update(posts, fields)
+            posts = []
+    Post.objects.bulk_update(posts, fields)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0011_added_post_views'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='content_hash',
+            field=models.CharField(blank=True, default='', editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='content_html',
+            field=models.TextField(blank=True, default='', editable=False, help_text='Sanitized content, rendered when the content is saved'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='html_version',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(render_html, migrations.RunPython.noop),
+    ]
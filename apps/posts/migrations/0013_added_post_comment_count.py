@@ -0,0 +1,34 @@
+# Generated by Django 5.1.3 on 2026-10-18 06:53
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def count_comments(apps, schema_editor):
+    Post = apps.get_model('posts', 'Post')
+    PostComment = apps.get_model('comments', 'PostComment')
+    comments = PostComment.objects\
+        .filter(post=OuterRef('pk'), is_removed=False)\
+        .order_by()\
+        .values('post')\
+        .annotate(total=Count('pk'))\
+        .values('total')
+    Post.objects.update(comment_count=Coalesce(Subquery(comments), Value(0)))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0012_added_rendered_html'),
+        ('comments', '0007_added_comment_reply_counts'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0, help_text='Comments that are not removed'),
+        ),
+        migrations.RunPython(count_comments, migrations.RunPython.noop),
+    ]
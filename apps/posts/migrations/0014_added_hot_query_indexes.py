@@ -0,0 +1,25 @@
+# Generated by Django 5.1.3 on 2026-10-18 07:03
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('groups', '0009_added_hot_query_indexes'),
+        ('posts', '0013_added_post_comment_count'),
+        ('tags', '0005_added_tag_post_count'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(condition=models.Q(('status', 'DRAFT'), _negated=True), fields=['-created_at', '-id'], name='posts_post_new_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['author', '-created_at', '-id'], name='posts_post_author_new_idx'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.1.3 on 2026-10-18 07:51
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('groups', '0010_removed_group_archive_checkpoint'),
+        ('posts', '0014_added_hot_query_indexes'),
+        ('tags', '0005_added_tag_post_count'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(condition=models.Q(('status', 'PUBLIC')), fields=['group', 'created_at', 'id'], name='posts_post_group_public_idx'),
+        ),
+    ]
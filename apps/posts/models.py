@@ -1,14 +1,18 @@
-from django.db import models
-from django.db.models import Sum
+from django.db import models, transaction
 from django.contrib.auth.models import User
+from django.utils import timezone
 
-from core.models import TimeStampedModel
+from core.html import HTML_VERSION, content_hash, sanitize_html
+from core.models import TimeStampedModel, StoredCountersMixin
+from core.services import vote_deltas
+from posts.ranking import RISING_VELOCITY_WINDOW, hot_rank, hot_rank_shift, rising_rank
+from posts.text import EXCERPT_LENGTH, excerpt, plain_text, reading_time, word_count
 from tags.models import Tag
 from django.core.validators import MinValueValidator, MaxValueValidator
 from groups.models import Group
 import uuid
 
-class Post(TimeStampedModel):
+class Post(StoredCountersMixin, TimeStampedModel):
     class STATUS(models.TextChoices):
         DRAFT = "DRAFT"
         PUBLIC = "PUBLIC"
@@ -16,6 +20,18 @@ class Post(TimeStampedModel):
 
     title = models.CharField(max_length=200)
     content = models.TextField(blank=False)
+    content_html = models.TextField(
+        blank=True, default='', editable=False,
+        help_text='Sanitized content, rendered when the content is saved'
+    )
+    content_hash = models.CharField(max_length=64, blank=True, default='', editable=False)
+    html_version = models.PositiveSmallIntegerField(default=0, editable=False)
+    excerpt = models.CharField(max_length=EXCERPT_LENGTH, blank=True, default='')
+    word_count = models.PositiveIntegerField(default=0)
+    reading_time = models.PositiveIntegerField(
+        default=0,
+        help_text='Estimated reading time in minutes'
+    )
     uuid = models.UUIDField(unique=True, default=uuid.uuid4)
     author = models.ForeignKey(
         User,
@@ -25,7 +41,8 @@ class Post(TimeStampedModel):
     tags = models.ManyToManyField(
         Tag, blank=True,
         verbose_name="tags",
-        related_name="posts"
+        related_name="posts",
+        through='PostTag'
     )
     status = models.CharField(
         choices=STATUS.choices,
@@ -37,22 +54,158 @@ class Post(TimeStampedModel):
         related_name="posts",
         on_delete=models.SET_NULL,
     )
+    score = models.IntegerField(default=0)
+    upvotes = models.PositiveIntegerField(default=0)
+    downvotes = models.PositiveIntegerField(default=0)
+    hot_rank = models.FloatField(default=0)
+    rising_rank = models.FloatField(default=0)
+    views = models.PositiveIntegerField(default=0)
+    comment_count = models.PositiveIntegerField(
+        default=0,
+        help_text='Comments that are not removed'
+    )
+
+    STORED_COUNTERS = (
+        'score', 'upvotes', 'downvotes', 'hot_rank', 'rising_rank', 'views', 'comment_count'
+    )
 
     class Meta:
         verbose_name = "Post"
         verbose_name_plural = "Posts"
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=['-hot_rank', '-id'], name='posts_post_hot_idx'),
+            models.Index(fields=['-rising_rank', '-id'], name='posts_post_rising_idx'),
+            models.Index(fields=['-score', '-id'], name='posts_post_top_idx'),
+            models.Index(
+                fields=['-created_at', '-id'], name='posts_post_new_idx',
+                condition=~models.Q(status='DRAFT'),
+            ),
+            models.Index(fields=['author', '-created_at', '-id'], name='posts_post_author_new_idx'),
+            models.Index(fields=['group', '-created_at', '-id'], name='posts_post_group_new_idx'),
+            models.Index(fields=['group', '-hot_rank', '-id'], name='posts_post_group_hot_idx'),
+            models.Index(fields=['group', '-rising_rank', '-id'], name='posts_post_group_rising_idx'),
+            models.Index(fields=['group', '-score', '-id'], name='posts_post_group_top_idx'),
+            models.Index(
+                fields=['group', 'created_at', 'id'], name='posts_post_group_public_idx',
+                condition=models.Q(status='PUBLIC'),
+            ),
+        ]
 
     def __str__(self):
         return f"Post: {self.uuid} published by {self.author.username}"
 
-    def _get_score(self):
-        score = 0
-        votes = PostVote.objects.filter(post=self)
-        if votes.exists():
-    	    score = votes.aggregate(Sum('vote'))['vote__sum'] or 0
-        return score
-    score = property(_get_score)
+    def refresh_text_stats(self):
+        """
+        Recomputes the stored excerpt, word count and reading time from the
+        content.
+        """
+        text = plain_text(self.content)
+        self.excerpt = excerpt(text)
+        self.word_count = word_count(text)
+        self.reading_time = reading_time(self.word_count)
+
+    def render_content(self):
+        """
+        Renders the sanitized content unless it was already rendered from
+        the same content with the current sanitizer rules. Returns whether
+        it was rendered.
+        """
+        digest = content_hash(self.content)
+        if digest == self.content_hash and self.html_version == HTML_VERSION:
+            return False
+        self.content_html = sanitize_html(self.content)
+        self.content_hash = digest
+        self.html_version = HTML_VERSION
+        return True
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._stored_status = dict(zip(field_names, values)).get('status')
+        return instance
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if 'content' not in self.get_deferred_fields() and (
+                update_fields is None or 'content' in update_fields):
+            self.refresh_text_stats()
+            self.render_content()
+            if update_fields is not None:
+                kwargs['update_fields'] = {
+                    *update_fields, 'excerpt', 'word_count', 'reading_time',
+                    'content_html', 'content_hash', 'html_version'
+                }
+        if self._state.adding:
+            created_at = self.created_at or timezone.now()
+            self.hot_rank = hot_rank(self.score, created_at)
+            self.rising_rank = rising_rank(self.score, created_at, timezone.now())
+        super().save(*args, **kwargs)
+        self._stored_status = self.status
+
+    @classmethod
+    def refresh_ranks(cls, post_ids, now=None):
+        """
+        Recomputes the stored ranks of the given posts from their score and
+        from the net votes cast within the rising velocity window.
+        """
+        now = now or timezone.now()
+        posts = list(
+            cls.objects.filter(pk__in=post_ids)
+            .only('pk', 'score', 'created_at')
+        )
+        recent = dict(
+            PostVote.objects
+            .filter(post__in=post_ids, updated_at__gte=now - RISING_VELOCITY_WINDOW)
+            .order_by()
+            .values('post')
+            .annotate(total=models.Sum('vote'))
+            .values_list('post', 'total')
+        )
+        for post in posts:
+            post.hot_rank = hot_rank(post.score, post.created_at)
+            post.rising_rank = rising_rank(recent.get(post.pk, 0), post.created_at, now)
+        cls.objects.bulk_update(posts, ['hot_rank', 'rising_rank'])
+        return len(posts)
+
+    @classmethod
+    def apply_vote_change(cls, post_id, previous, current):
+        """
+        Shift the stored vote counters of a post for a vote going from
+        ``previous`` to ``current``, where 0 means no vote.
+        """
+        cls.apply_vote_deltas({post_id: vote_deltas(previous, current)})
+
+    @classmethod
+    def apply_vote_deltas(cls, deltas):
+        """
+        Shift the stored vote counters of several posts at once. ``deltas``
+        maps post ids to (score, upvotes, downvotes) changes.
+        """
+        cls.shift_counters({
+            post_id: {'score': score, 'upvotes': upvotes, 'downvotes': downvotes}
+            for post_id, (score, upvotes, downvotes) in deltas.items()
+        }, derived={'hot_rank': lambda changes: hot_rank_shift(changes['score'])})
+
+
+class PostTag(models.Model):
+    """
+    Through table of ``Post.tags``. Besides the (post, tag) unique index it
+    is indexed by (tag, post), so a tag filter reads the posts of a tag from
+    the index alone.
+    """
+    post = models.ForeignKey(Post, on_delete=models.CASCADE)
+    tag = models.ForeignKey(Tag, on_delete=models.CASCADE)
+
+    class Meta:
+        db_table = 'posts_post_tags'
+        unique_together = [('post', 'tag')]
+        indexes = [
+            models.Index(fields=['tag', 'post'], name='posts_posttag_tag_post_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.tag_id} on {self.post_id}"
 
 
 class PostVote(TimeStampedModel):
@@ -75,8 +228,27 @@ class PostVote(TimeStampedModel):
 
     class Meta:
         ordering = ['created_at',]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['post', 'user'],
+                name='posts_postvote_unique_voter'
+            ),
+        ]
         verbose_name = "Post Vote"
         verbose_name_plural = "Post Votes"
 
     def __str__(self):
         return f"{self.vote}  point by  {self.user.username}"
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._stored_vote = dict(zip(field_names, values)).get('vote', 0)
+        return instance
+
+    def save(self, *args, **kwargs):
+        previous = getattr(self, '_stored_vote', 0)
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            Post.apply_vote_change(self.post_id, previous, self.vote)
+        self._stored_vote = self.vote
@@ -0,0 +1,72 @@
+"""
+Ranking formulas of the post feed.
+
+Every post stores its ranks in indexed columns (``hot_rank``, ``rising_rank``
+and the ``score`` counter), so sorting the feed is a plain index-ordered read.
+The hot rank moves with the score in the same UPDATE as the vote counters.
+Rising depends on the age of the post and of its votes, so it is recomputed
+for all recent posts by the ``refresh_post_ranks`` command, which should run
+periodically (e.g. every few minutes from cron); it also rounds off the hot
+ranks shifted since.
+"""
+import math
+from datetime import datetime, timedelta, timezone
+
+from django.db.models import F, FloatField, Value
+from django.db.models.functions import Abs, Cast, Greatest, Log, Sign
+
+# Reddit's "hot" formula: the order of magnitude of the score plus the post
+# age, where 45000 seconds (12.5 hours) of age are worth a tenfold score.
+HOT_EPOCH = datetime(2005, 12, 8, 7, 46, 43, tzinfo=timezone.utc)
+HOT_DECAY_SECONDS = 45000
+
+# Posts older than the window are not rising anymore.
+RISING_WINDOW = timedelta(hours=24)
+# Rising measures the net votes cast (or changed) within this window.
+RISING_VELOCITY_WINDOW = timedelta(hours=2)
+
+SORTS = {
+    'hot': ('-hot_rank', '-id'),
+    'new': ('-created_at', '-id'),
+    'top': ('-score', '-id'),
+    'rising': ('-rising_rank', '-id'),
+}
+DEFAULT_SORT = 'new'
+
+
+def hot_rank(score, created_at):
+    order = math.log10(max(abs(score), 1))
+    sign = (score > 0) - (score < 0)
+    seconds = (created_at - HOT_EPOCH).total_seconds()
+    return round(sign * order + seconds / HOT_DECAY_SECONDS, 7)
+
+
+def hot_order(score):
+    """The score term of ``hot_rank`` as a database expression"""
+    score = Cast(score, FloatField())
+    return Sign(score) * Log(Value(10.0), Greatest(Abs(score), Value(1.0)))
+
+
+def hot_rank_shift(score_change):
+    """
+    Expression of the new ``hot_rank`` of a post whose score moves by
+    ``score_change``, for the UPDATE that moves it: the age term stays, and
+    ``F('score')`` still reads the score before the UPDATE.
+    """
+    return F('hot_rank') + hot_order(F('score') + score_change) - hot_order(F('score'))
+
+
+def rising_rank(recent_score, created_at, now):
+    """
+    Recent vote velocity: the net votes cast within the last
+    ``RISING_VELOCITY_WINDOW`` (``recent_score``) per hour, for posts
+    younger than ``RISING_WINDOW``. A post younger than the velocity window
+    is measured over its age, with the first hour counted as a whole hour
+    so a couple of early votes do not outrank a sustained velocity. A post
+    whose votes all came early stops rising once they leave the window.
+    """
+    age = now - created_at
+    if age >= RISING_WINDOW:
+        return 0.0
+    hours = min(max(age, timedelta(hours=1)), RISING_VELOCITY_WINDOW).total_seconds() / 3600
+    return round(recent_score / hours, 7)
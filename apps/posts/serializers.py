@@ -2,11 +2,11 @@ from rest_framework import serializers
 from posts.models import Post, PostVote
 from profiles.serializers import UserSerializer
 from tags.serializers import TagSerializer
-from comments.models import PostComment
 from bookmarks.models import PostBookmark
 from bookmarks.serializers import PostBookmarkLightSerializer
 from django.db.models import Sum
-from core.serializers import ModelReadOnlySerializer
+from core.buffers import overlay_pending_votes
+from core.serializers import DynamicFieldsModelSerializer, ModelReadOnlySerializer
 from groups.serializers import GroupSerializer, GroupReadOnlyLightSerializer
 
 
@@ -16,54 +16,83 @@ class PostVoteSerializer(serializers.ModelSerializer):
         fields = ('id', 'vote')
 
 
-class PostSerializer(serializers.ModelSerializer):
+class PostSerializer(DynamicFieldsModelSerializer):
     author = UserSerializer()
-    votes = serializers.ReadOnlyField(source='_get_score')
+    votes = serializers.ReadOnlyField(source='score')
     user_vote = serializers.SerializerMethodField()
     user_bookmark = serializers.SerializerMethodField()
-    comments = serializers.SerializerMethodField()
+    comments = serializers.ReadOnlyField(source='comment_count')
     tags = TagSerializer(required=False, many=True)
     group = GroupReadOnlyLightSerializer(required=False)
 
     class Meta:
         model = Post
         fields = (
-            'title', 'content', 'uuid', 'author', 'votes',
+            'title', 'content', 'content_html', 'uuid', 'author', 'votes',
             'comments', 'created_at', 'updated_at', 'tags',
             'user_vote', 'user_bookmark', 'group', 'status',
+            'word_count', 'reading_time', 'views',
         )
 
-    def get_comments(self, obj):
-        return PostComment.objects.filter(post=obj, is_removed=False).count()
+    def get_viewer_state(self):
+        """
+        Returns the page-level map built by ``posts.services.load_viewer_state``
+        when the view passed one through the context.
+        """
+        return self.context.get('viewer_state', None)
 
     def get_user_vote(self, obj):
+        state = self.get_viewer_state()
+        if state is not None:
+            vote = state['votes'].get(obj.pk)
+            return PostVoteSerializer(vote).data if vote is not None else None
         request = self.context.get('request', None)
         if request is not None and request.user.is_authenticated:
-            votes = PostVote.objects.filter(post=obj, user=request.user)\
-                .order_by('-updated_at')
-            if votes.exists():
-                return PostVoteSerializer(votes.first()).data
+            vote = PostVote.objects.filter(post=obj, user=request.user)\
+                .order_by('-updated_at').first()
+            votes = {obj.pk: vote} if vote is not None else {}
+            overlay_pending_votes(votes, PostVote, 'post', request.user, [obj.pk])
+            if obj.pk in votes:
+                return PostVoteSerializer(votes[obj.pk]).data
         return None
 
     def get_user_bookmark(self, obj):
+        state = self.get_viewer_state()
+        if state is not None:
+            bookmark = state['bookmarks'].get(obj.pk)
+            return PostBookmarkLightSerializer(bookmark).data if bookmark is not None else None
         request = self.context.get('request', None)
         if request is not None and request.user.is_authenticated:
-            bookmarks = PostBookmark.objects.filter(post=obj, user=request.user)\
-            .order_by('-updated_at')
-            if bookmarks.exists():
-                return PostBookmarkLightSerializer(bookmarks.first()).data
+            bookmark = PostBookmark.objects.filter(post=obj, user=request.user)\
+                .order_by('-updated_at').first()
+            if bookmark is not None:
+                return PostBookmarkLightSerializer(bookmark).data
         return None
 
 
+class PostListSerializer(PostSerializer):
+    """
+    Feed card representation: the stored excerpt instead of the content
+    and its HTML, which list querysets defer.
+    """
+    class Meta(PostSerializer.Meta):
+        fields = tuple(
+            'excerpt' if name == 'content' else name
+            for name in PostSerializer.Meta.fields
+            if name != 'content_html'
+        )
+
+
 class PostReadOnlySerializer(ModelReadOnlySerializer):
     author = UserSerializer()
     group = GroupReadOnlyLightSerializer(required=False)
-    votes = serializers.ReadOnlyField(source='_get_score')
+    votes = serializers.ReadOnlyField(source='score')
+    comments = serializers.ReadOnlyField(source='comment_count')
 
     class Meta:
         model = Post
         fields  = (
-            'uuid', 'title', 'content', 'author', 'votes',
+            'uuid', 'title', 'content', 'author', 'votes', 'comments',
             'created_at', 'group', 'status'
         )
 
@@ -89,3 +118,17 @@ class PostEditSerializer(serializers.ModelSerializer):
         extra_kwargs = {
             'group': {'write_only': True},
         }
+
+
+class ViewerStateRequestSerializer(serializers.Serializer):
+    # Upper bound of post uuids and of comment ids per request
+    MAX_ITEMS = 300
+
+    posts = serializers.ListField(
+        child=serializers.UUIDField(), required=False, default=list,
+        max_length=MAX_ITEMS
+    )
+    comments = serializers.ListField(
+        child=serializers.IntegerField(min_value=1), required=False, default=list,
+        max_length=MAX_ITEMS
+    )
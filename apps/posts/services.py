@@ -0,0 +1,83 @@
+from core.buffers import get_vote_buffer, overlay_pending_votes
+from core.services import upsert_vote
+from posts.models import Post, PostVote
+from bookmarks.models import PostBookmark
+from comments.models import PostComment, PostCommentVote
+
+
+def load_viewer_state(posts, user):
+    """
+    Loads the votes and bookmarks of ``user`` on a page of posts with one
+    query each. Every map is keyed by post id.
+    """
+    post_ids = [post.pk for post in posts]
+    state = {'votes': {}, 'bookmarks': {}}
+    if not post_ids:
+        return state
+
+    if user is not None and user.is_authenticated:
+        votes = PostVote.objects\
+            .filter(post__in=post_ids, user=user)\
+            .order_by('updated_at')
+        state['votes'] = overlay_pending_votes(
+            {vote.post_id: vote for vote in votes},
+            PostVote, 'post', user, post_ids
+        )
+        bookmarks = PostBookmark.objects\
+            .filter(post__in=post_ids, user=user)\
+            .order_by('updated_at')
+        state['bookmarks'] = {bookmark.post_id: bookmark for bookmark in bookmarks}
+    return state
+
+
+def vote_post(post, user, value):
+    """
+    Sets ``user``'s vote on ``post`` to ``value`` (1, -1, or 0 to remove it)
+    and returns the previous vote. The vote is queued instead of written
+    when the vote buffer is enabled.
+    """
+    buffer = get_vote_buffer()
+    if buffer is not None:
+        return buffer.add(PostVote, 'post', post.pk, user.pk, value)
+    return upsert_vote(PostVote, 'post', post, user, value)
+
+
+def load_bulk_viewer_state(user, post_uuids=(), comment_ids=()):
+    """
+    Loads the votes and bookmarks of ``user`` on many posts and the votes on
+    many comments, with one query per table. Returns
+    ``{'posts': {uuid: {'vote': ..., 'bookmark': ...}}, 'comments': {id: vote}}``
+    with unknown posts and comments left out.
+    """
+    state = {'posts': {}, 'comments': {}}
+    post_ids = dict(Post.objects.filter(uuid__in=post_uuids).values_list('pk', 'uuid'))
+    if post_ids:
+        votes = overlay_pending_votes(
+            {vote.post_id: vote for vote in PostVote.objects.filter(post__in=post_ids, user=user)},
+            PostVote, 'post', user, list(post_ids)
+        )
+        bookmarks = {
+            bookmark.post_id: bookmark for bookmark
+            in PostBookmark.objects.filter(post__in=post_ids, user=user)
+        }
+        state['posts'] = {
+            post_uuid: {'vote': votes.get(post_id), 'bookmark': bookmarks.get(post_id)}
+            for post_id, post_uuid in post_ids.items()
+        }
+
+    comment_ids = set(
+        PostComment.objects.filter(pk__in=comment_ids).values_list('pk', flat=True)
+    )
+    if comment_ids:
+        votes = overlay_pending_votes(
+            {
+                vote.post_comment_id: vote for vote
+                in PostCommentVote.objects.filter(post_comment__in=comment_ids, user=user)
+            },
+            PostCommentVote, 'post_comment', user, list(comment_ids)
+        )
+        state['comments'] = {
+            comment_id: votes[comment_id].vote if comment_id in votes else 0
+            for comment_id in comment_ids
+        }
+    return state
@@ -0,0 +1,66 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from comments.models import PostComment
+from core.services import vote_counters_deferred
+from core.signals import counters_changed
+from posts.cache import group_scope, post_cache, post_scope
+from posts.models import Post, PostTag, PostVote
+from tags.models import Tag
+
+
+@receiver(post_delete, sender=PostVote)
+def post_vote_deleted_hook(sender, instance, **kwargs):
+    if vote_counters_deferred():
+        return
+    previous = getattr(instance, '_stored_vote', instance.vote)
+    Post.apply_vote_change(instance.post_id, previous, 0)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def post_changed_hook(sender, instance, **kwargs):
+    scopes = ['listing', post_scope(instance.pk)]
+    if instance.group_id is not None:
+        scopes.append(group_scope(instance.group_id))
+    post_cache.invalidate(*scopes)
+
+
+@receiver(post_save, sender=PostVote)
+@receiver(post_delete, sender=PostVote)
+@receiver(post_save, sender=PostComment)
+@receiver(post_delete, sender=PostComment)
+def post_activity_hook(sender, instance, **kwargs):
+    post_cache.invalidate(post_scope(instance.post_id))
+
+
+@receiver(counters_changed, sender=Post)
+def post_counters_changed_hook(sender, pks, **kwargs):
+    post_cache.invalidate(*[post_scope(pk) for pk in pks])
+
+
+@receiver(m2m_changed, sender=PostTag)
+def post_tags_added_hook(sender, instance, action, reverse, pk_set, **kwargs):
+    # Removals delete PostTag rows one by one and are counted by
+    # post_tag_deleted_hook; additions are bulk inserts without post_save.
+    if action != 'post_add' or not pk_set:
+        return
+    if reverse:
+        Tag.shift_counters({instance.pk: {'post_count': len(pk_set)}})
+        post_ids = pk_set
+    else:
+        Tag.shift_counters({tag_id: {'post_count': 1} for tag_id in pk_set})
+        post_ids = [instance.pk]
+    post_cache.invalidate('listing', *[post_scope(post_id) for post_id in post_ids])
+
+
+@receiver(post_save, sender=PostTag)
+def post_tag_saved_hook(sender, instance, created, **kwargs):
+    if created:
+        Tag.shift_counters({instance.tag_id: {'post_count': 1}})
+    post_cache.invalidate('listing', post_scope(instance.post_id))
+
+
+@receiver(post_delete, sender=PostTag)
+def post_tag_deleted_hook(sender, instance, **kwargs):
+    Tag.shift_counters({instance.tag_id: {'post_count': -1}})
+    post_cache.invalidate('listing', post_scope(instance.post_id))
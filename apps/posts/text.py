@@ -0,0 +1,43 @@
+"""
+Plain-text summaries of post bodies.
+
+Post content is CKEditor HTML, which can run to tens of kilobytes. The feed
+only needs a short plain-text excerpt and a length estimate, so these are
+computed once when a post is saved and stored next to the content.
+"""
+from html import unescape
+import math
+import re
+
+from django.utils.html import strip_tags
+from django.utils.text import Truncator
+
+EXCERPT_LENGTH = 280
+WORDS_PER_MINUTE = 200
+
+WHITESPACE = re.compile(r'\s+')
+
+
+def plain_text(html):
+    """
+    Returns the text of an HTML fragment with its whitespace collapsed.
+    Block tags are spaced out first so adjacent paragraphs do not run
+    together.
+    """
+    html = re.sub(r'<(br|/p|/div|/li|/h[1-6]|/blockquote)\b[^>]*>', ' ', html or '')
+    return WHITESPACE.sub(' ', unescape(strip_tags(html))).strip()
+
+
+def excerpt(text, length=EXCERPT_LENGTH):
+    return Truncator(text).chars(length)
+
+
+def word_count(text):
+    return len(text.split())
+
+
+def reading_time(words):
+    """
+    Minutes needed to read ``words`` words, at least one for any text.
+    """
+    return math.ceil(words / WORDS_PER_MINUTE) if words else 0
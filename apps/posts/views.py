@@ -1,6 +1,10 @@
-from posts.models import Post, PostVote
+from posts.models import Post
 from core.views import BaseViewSet, BaseReadOnlyViewSet
-from posts.serializers import PostSerializer, PostEditSerializer
+from posts.serializers import (
+    PostSerializer, PostListSerializer, PostEditSerializer,
+    PostVoteSerializer, ViewerStateRequestSerializer,
+)
+from bookmarks.serializers import PostBookmarkLightSerializer
 from rest_framework import viewsets, generics, status, filters
 from rest_framework.response import Response
 from rest_framework.decorators import action
@@ -8,47 +12,220 @@ from rest_framework.pagination import PageNumberPagination
 from rest_framework.permissions import IsAuthenticated
 from comments.serializers import PostCommentCreateSerializer, PostCommentSerializer
 from django.contrib.auth.models import User
+from profiles.serializers import UserSerializer
 from posts.filters import PostFilterSet
+from posts.services import load_bulk_viewer_state, load_viewer_state, vote_post
+from core.cache import cache_response
+from core.conditional import conditional_response, newest
+from core.counters import count_view
+from core.mixins import CachedResponseMixin
+from core.services import VOTE_VALUES, vote_deltas
+from posts.cache import post_cache, post_scope
+from posts import ranking
+from timelines.pagination import TimelinePagination
 
 
 class PostPagination(PageNumberPagination):
     page_size = 12
 
 
-class PostViewSet(BaseReadOnlyViewSet):
-    queryset = Post.objects.all().exclude(status=Post.STATUS.DRAFT)
+# PostSerializer fields read from the page-level viewer state
+VIEWER_STATE_FIELDS = {'user_vote', 'user_bookmark'}
+
+
+def author_version(post):
+    return tuple(getattr(post.author, name) for name in UserSerializer.Meta.fields)
+
+
+def group_version(post):
+    return (post.group.pk, post.group.name) if post.group_id else None
+
+
+def tags_version(post):
+    return sorted(
+        (tag.pk, tag.name, tag.tag_type_id, tag.tag_type.title if tag.tag_type_id else None)
+        for tag in post.tags.all()
+    )
+
+
+# Versions of the related rows a serialized post shows
+RELATED_VERSIONS = {
+    'author': author_version,
+    'group': group_version,
+    'tags': tags_version,
+}
+
+
+def post_version(post, fields):
+    """
+    Returns the values the serializer ``fields`` of a post show, reading its
+    author, group and tags as loaded with the post. The viewer's own state
+    is versioned separately.
+    """
+    return (post.pk,) + tuple(
+        RELATED_VERSIONS[name](post) if name in RELATED_VERSIONS else field.get_attribute(post)
+        for name, field in fields.items() if name not in VIEWER_STATE_FIELDS
+    )
+
+
+class PostViewerStateMixin(object):
+    # (post pks, state) of the last page loaded by load_page_viewer_state
+    page_viewer_state = None
+
+    def wants_viewer_state(self, context):
+        fields = self.get_serializer_class()(context=context).fields
+        return bool(VIEWER_STATE_FIELDS & set(fields))
+
+    def load_page_viewer_state(self, page):
+        """
+        Loads the viewer's votes and bookmarks of ``page``, once per request
+        for the validators and the serializer context alike.
+        """
+        pks = [post.pk for post in page]
+        if self.page_viewer_state is None or self.page_viewer_state[0] != pks:
+            self.page_viewer_state = (pks, load_viewer_state(page, self.request.user))
+        return self.page_viewer_state[1]
+
+    def get_page_serializer_context(self, page, context=None):
+        """
+        Loads the viewer's votes and bookmarks of the whole page at once, so
+        PostSerializer does no per-post queries. Nothing is loaded when the
+        requested fields leave them all out.
+        """
+        context = dict(context or self.get_serializer_context())
+        if self.wants_viewer_state(context):
+            context['viewer_state'] = self.load_page_viewer_state(page)
+        return context
+
+
+class PostViewSet(PostViewerStateMixin, CachedResponseMixin, BaseReadOnlyViewSet):
+    queryset = Post.objects.all().exclude(status=Post.STATUS.DRAFT)\
+        .select_related('author', 'group')\
+        .prefetch_related('tags__tag_type')
     serializer_class = PostSerializer
+    serializer_action_classes = {
+        'list': PostListSerializer,
+        'home': PostListSerializer,
+    }
     pagination_class = PostPagination
     lookup_field = 'uuid'
     filterset_class = PostFilterSet
+    response_cache = post_cache
 
     def get_serializer_context(self):
         context = super(PostViewSet, self).get_serializer_context()
         context.update({'source': 'Post'})
         return context
 
+    def get_page_serializer_context(self, page, context=None):
+        self.add_cache_scopes(*[post_scope(post.pk) for post in page])
+        return super(PostViewSet, self).get_page_serializer_context(page, context)
+
+    def get_list_queryset(self, sort):
+        return self.filter_queryset(self.get_queryset())\
+            .defer('content', 'content_html')\
+            .order_by(*ranking.SORTS[sort])
+
+    def get_response_validators(self, request, uuid=None):
+        """
+        Versions a response by the values its posts show, their author,
+        group and tags included, plus the viewer's own votes and bookmarks.
+        A list loads the requested page, which the response then serializes
+        without querying it again.
+        """
+        if self.action == 'retrieve':
+            posts = list(self.get_queryset().filter(uuid=uuid))
+        else:
+            sort = request.query_params.get('sort', ranking.DEFAULT_SORT)
+            if sort not in ranking.SORTS:
+                return None
+            posts = self.paginate_for_validators(self.get_list_queryset(sort))
+        if not posts:
+            return None
+        state = {'votes': {}, 'bookmarks': {}}
+        if self.wants_viewer_state({'request': request}):
+            state = self.load_page_viewer_state(posts)
+        fields = self.get_serializer().fields
+        version = (
+            [post_version(post, fields) for post in posts],
+            sorted((post_id, vote.vote) for post_id, vote in state['votes'].items()),
+            sorted(state['bookmarks']),
+        )
+        if 'updated_at' in posts[0].get_deferred_fields():
+            return version, None
+        return version, newest(posts)
+
+    @cache_response
+    @conditional_response
     def list(self, request):
-        queryset = self.filter_queryset(self.get_queryset())
-        return self.paginated_response(queryset, context={'request': request})
-
+        sort = request.query_params.get('sort', ranking.DEFAULT_SORT)
+        if sort not in ranking.SORTS:
+            return Response(
+                {'error': f"Unknown sort '{sort}'. Use one of: {', '.join(ranking.SORTS)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return self.paginated_response(
+            self.get_list_queryset(sort), context={'request': request}
+        )
+
+    @count_view
+    @cache_response
+    @conditional_response
     def retrieve(self, request, uuid=None):
         post = self.get_object()
         serializer_class = self.get_serializer_class()
-        serializer = serializer_class(post, context={'request': request})
+        context = self.get_page_serializer_context([post], {'request': request})
+        serializer = serializer_class(post, context=context)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
     def _common_vote_method(self, request, method):
         post = self.get_object()
-        user = request.user
-        vote, created = PostVote.objects.get_or_create(post=post, user=user)
-        if method == "upvote":
-            vote.vote = 1
-        elif method == "downvote":
-            vote.vote = -1
-        else:
-            vote.vote = 0
-        vote.save()
-        return Response({"vote": vote.vote, "votes": post.score}, status=status.HTTP_200_OK)
+        value = VOTE_VALUES.get(method, 0)
+        previous = vote_post(post, request.user, value)
+        votes = post.score + vote_deltas(previous, value)[0]
+        return Response({"vote": value, "votes": votes}, status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated])
+    def home(self, request):
+        """
+        Lists the caller's home timeline: the newest posts of their own, of
+        the users they follow and of their groups, paged with a cursor.
+        """
+        paginator = TimelinePagination()
+        page = paginator.paginate_timeline(
+            request.user, self.get_queryset().defer('content', 'content_html'), request
+        )
+        context = self.get_page_serializer_context(page, self.get_serializer_context())
+        serializer = self.get_serializer_class()(page, many=True, context=context)
+        return paginator.get_paginated_response(serializer.data)
+
+    @action(detail=False, methods=['post'], permission_classes=[IsAuthenticated])
+    def viewer_state(self, request):
+        """
+        Returns the caller's votes and bookmarks on up to a few hundred posts
+        (``posts``: uuids) and votes on comments (``comments``: ids) at once.
+        """
+        serializer = ViewerStateRequestSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        state = load_bulk_viewer_state(
+            request.user,
+            serializer.validated_data['posts'],
+            serializer.validated_data['comments'],
+        )
+        posts = {
+            str(post_uuid): {
+                'user_vote': PostVoteSerializer(post['vote']).data if post['vote'] else None,
+                'user_bookmark': PostBookmarkLightSerializer(post['bookmark']).data
+                    if post['bookmark'] else None,
+            }
+            for post_uuid, post in state['posts'].items()
+        }
+        comments = {
+            str(comment_id): {'vote': vote}
+            for comment_id, vote in state['comments'].items()
+        }
+        return Response({'posts': posts, 'comments': comments}, status=status.HTTP_200_OK)
 
     @action(detail=True, methods=['put'])
     def upvote(self, request, uuid=None):
@@ -63,17 +240,19 @@ class PostViewSet(BaseReadOnlyViewSet):
         return self._common_vote_method(request, "remove_vote")
 
 
-class PostSelfViewSet(BaseViewSet):
-    queryset = Post.objects.all().order_by('-created_at')
+class PostSelfViewSet(PostViewerStateMixin, BaseViewSet):
+    queryset = Post.objects.all().order_by('-created_at')\
+        .select_related('author', 'group')\
+        .prefetch_related('tags__tag_type')
     lookup_field = 'uuid'
     serializer_class = PostEditSerializer
     pagination_class = PostPagination
     permission_classes = [IsAuthenticated, ]
     serializer_action_classes = {
-        'list' : PostSerializer,
+        'list' : PostListSerializer,
         'create' : PostEditSerializer,
         'update' : PostEditSerializer,
-        'drafts' : PostSerializer,
+        'drafts' : PostListSerializer,
     }
 
     def get_queryset(self):
@@ -81,6 +260,10 @@ class PostSelfViewSet(BaseViewSet):
         queryset = self.queryset.filter(author=user)
         return queryset
 
+    def list(self, request):
+        queryset = self.filter_queryset(self.get_queryset()).defer('content', 'content_html')
+        return self.paginated_response(queryset, context=self.get_serializer_context())
+
     def create(self, request):
         data = request.data
         if not request.user.is_authenticated:
@@ -2,6 +2,7 @@ from django.shortcuts import render
 import datetime
 from profiles.serializers import UserSerializer
 from django.contrib.auth.models import User
+from core.conditional import conditional_response
 from core.views import BaseViewSet
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.decorators import action
@@ -37,6 +38,21 @@ class ProfileViewSet(BaseViewSet):
     search_fields = ['first_name', 'last_name', 'username']
     ordering = ['first_name','last_name']
 
+    def get_response_validators(self, request, username=None):
+        """
+        Versions a profile by the serialized columns of its user. Users have
+        no timestamp to fingerprint, so the unpaginated list is not validated.
+        """
+        row = self.get_queryset().filter(username=username)\
+            .values_list(*UserSerializer.Meta.fields).first()
+        if row is None:
+            return None
+        return row, None
+
+    @conditional_response
+    def retrieve(self, request, *args, **kwargs):
+        return super(ProfileViewSet, self).retrieve(request, *args, **kwargs)
+
     @action(detail=False)
     def auth(self, request):
         if request.user.is_authenticated:
@@ -195,7 +211,10 @@ class ProfileViewSet(BaseViewSet):
         """ Returns user bookmarks """
         user = self.get_object()
         if user.is_authenticated:
-            queryset = PostBookmark.objects.filter(user__username=user.username).order_by('-created_at')
+            queryset = PostBookmark.objects\
+                .filter(user__username=user.username)\
+                .select_related('post__author', 'post__group')\
+                .order_by('-created_at')
             serializer_class = self.get_serializer_class()
             serializer = serializer_class(queryset, many=True)
             return Response(serializer.data, status=status.HTTP_200_OK)
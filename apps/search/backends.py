@@ -0,0 +1,182 @@
+"""
+Full-text search index of posts and comments.
+
+The index lives in a single table keyed by a document id that encodes both
+the kind and the primary key of the indexed object (``pk * 2 + kind code``),
+so every update or removal is a primary key lookup. SQLite uses an FTS5
+virtual table ranked with bm25, PostgreSQL a tsvector column with a GIN
+index ranked with ts_rank. The table is created by the search migrations.
+Other databases get a backend that indexes and finds nothing, so saving
+posts and comments works without search.
+"""
+import re
+
+from django.db import connection
+
+from posts.text import plain_text
+
+KINDS = {'post': 0, 'comment': 1}
+KIND_NAMES = {code: kind for kind, code in KINDS.items()}
+
+
+def document_id(kind, object_id):
+    return object_id * len(KINDS) + KINDS[kind]
+
+
+def split_document_id(doc_id):
+    return KIND_NAMES[doc_id % len(KINDS)], doc_id // len(KINDS)
+
+
+def query_terms(query):
+    """Words of a user query, stripped of any search syntax"""
+    return re.findall(r'\w+', query.lower())
+
+
+class SearchBackend(object):
+    table = 'search_index'
+
+    def index(self, kind, object_id, title, body):
+        raise NotImplementedError
+
+    def remove(self, kind, object_id):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {self.table} WHERE {self.id_column} = %s',
+                [document_id(kind, object_id)]
+            )
+
+    def clear(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.table}')
+
+    def search(self, query, kind=None, limit=20, offset=0):
+        """
+        Returns (kind, object id, rank) tuples of the best matches, best first.
+        """
+        raise NotImplementedError
+
+    def kind_filter(self, kind):
+        if kind is None:
+            return '', []
+        return f' AND {self.id_column} %% %s = %s', [len(KINDS), KINDS[kind]]
+
+
+class SQLiteSearchBackend(SearchBackend):
+    id_column = 'rowid'
+
+    def index(self, kind, object_id, title, body):
+        doc_id = document_id(kind, object_id)
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.table} WHERE rowid = %s', [doc_id])
+            cursor.execute(
+                f'INSERT INTO {self.table} (rowid, title, body) VALUES (%s, %s, %s)',
+                [doc_id, title, body]
+            )
+
+    def search(self, query, kind=None, limit=20, offset=0):
+        terms = query_terms(query)
+        if not terms:
+            return []
+        match = ' '.join(f'"{term}"' for term in terms)
+        where, params = self.kind_filter(kind)
+        with connection.cursor() as cursor:
+            # bm25 is lower for better matches, titles weigh ten times the body
+            cursor.execute(
+                f'SELECT rowid, bm25({self.table}, 10.0, 1.0) AS rank '
+                f'FROM {self.table} WHERE {self.table} MATCH %s{where} '
+                'ORDER BY rank LIMIT %s OFFSET %s',
+                [match, *params, limit, offset]
+            )
+            rows = cursor.fetchall()
+        return [(*split_document_id(doc_id), -rank) for doc_id, rank in rows]
+
+
+class PostgreSQLSearchBackend(SearchBackend):
+    id_column = 'id'
+    config = 'english'
+
+    def index(self, kind, object_id, title, body):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'INSERT INTO {self.table} (id, document) VALUES (%s, '
+                'setweight(to_tsvector(%s, %s), \'A\') || setweight(to_tsvector(%s, %s), \'B\')) '
+                'ON CONFLICT (id) DO UPDATE SET document = EXCLUDED.document',
+                [document_id(kind, object_id), self.config, title, self.config, body]
+            )
+
+    def search(self, query, kind=None, limit=20, offset=0):
+        terms = query_terms(query)
+        if not terms:
+            return []
+        where, params = self.kind_filter(kind)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT id, ts_rank(document, query) AS rank '
+                f'FROM {self.table}, plainto_tsquery(%s, %s) query '
+                f'WHERE document @@ query{where} '
+                'ORDER BY rank DESC LIMIT %s OFFSET %s',
+                [self.config, ' '.join(terms), *params, limit, offset]
+            )
+            rows = cursor.fetchall()
+        return [(*split_document_id(doc_id), rank) for doc_id, rank in rows]
+
+
+class NullSearchBackend(SearchBackend):
+    """Backend of databases without full-text search, which has no table"""
+
+    def index(self, kind, object_id, title, body):
+        pass
+
+    def remove(self, kind, object_id):
+        pass
+
+    def clear(self):
+        pass
+
+    def search(self, query, kind=None, limit=20, offset=0):
+        return []
+
+
+BACKENDS = {
+    'sqlite': SQLiteSearchBackend,
+    'postgresql': PostgreSQLSearchBackend,
+}
+
+
+def get_backend(vendor=None):
+    vendor = vendor or connection.vendor
+    return BACKENDS.get(vendor, NullSearchBackend)()
+
+
+def post_document(post):
+    return post.title, plain_text(post.content)
+
+
+def comment_document(comment):
+    return '', comment._comment
+
+
+def index_post(post, backend=None):
+    backend = backend or get_backend()
+    if post.status == post.STATUS.DRAFT:
+        backend.remove('post', post.pk)
+    else:
+        backend.index('post', post.pk, *post_document(post))
+
+
+def index_comment(comment, backend=None):
+    backend = backend or get_backend()
+    if comment.is_removed or comment.post.status == comment.post.STATUS.DRAFT:
+        backend.remove('comment', comment.pk)
+    else:
+        backend.index('comment', comment.pk, *comment_document(comment))
+
+
+def index_post_comments(post, backend=None):
+    """
+    Indexes the comments of a published post, or removes those of a draft.
+    """
+    backend = backend or get_backend()
+    for comment in post.comments.only('pk', 'post', 'is_removed', '_comment'):
+        comment.post = post
+        index_comment(comment, backend=backend)
@@ -0,0 +1,35 @@
+from django.db import migrations
+
+# The index tables as of this migration, see search.backends
+CREATE_INDEX = {
+    'sqlite': [
+        'CREATE VIRTUAL TABLE search_index USING fts5('
+        "title, body, tokenize = 'porter unicode61')",
+    ],
+    'postgresql': [
+        'CREATE TABLE search_index (id bigint PRIMARY KEY, document tsvector NOT NULL)',
+        'CREATE INDEX search_index_document_idx ON search_index USING GIN (document)',
+    ],
+}
+
+
+def create_index(apps, schema_editor):
+    # Other databases have no index and search nothing
+    for statement in CREATE_INDEX.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(statement)
+
+
+def drop_index(apps, schema_editor):
+    schema_editor.execute('DROP TABLE IF EXISTS search_index')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0006_added_post_ranks'),
+        ('comments', '0003_alter_postcomment_id_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
@@ -0,0 +1,5 @@
+from rest_framework_nested import routers
+from search.views import SearchViewSet
+
+router = routers.SimpleRouter()
+router.register(r'search', SearchViewSet, basename='search')
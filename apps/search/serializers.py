@@ -0,0 +1,13 @@
+from rest_framework import serializers
+from comments.serializers import PostCommentLightSerializer
+from comments.models import PostComment
+from profiles.serializers import UserSerializer
+
+
+class SearchCommentSerializer(PostCommentLightSerializer):
+    user = UserSerializer()
+    post = serializers.SlugRelatedField(slug_field='uuid', read_only=True)
+
+    class Meta:
+        model = PostComment
+        fields = ('id', 'comment', 'user', 'post', 'created_at')
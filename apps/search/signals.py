@@ -0,0 +1,34 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from posts.models import Post
+from comments.models import PostComment
+from search.backends import get_backend, index_post, index_comment, index_post_comments
+
+
+@receiver(post_save, sender=Post)
+def post_indexing_hook(sender, instance, raw=False, created=False, **kwargs):
+    if raw:
+        return
+    index_post(instance)
+    # Comments are searchable while their post is published. _stored_status
+    # is the status before this save, see Post.save.
+    previous = getattr(instance, '_stored_status', None)
+    draft = Post.STATUS.DRAFT
+    if not created and (previous == draft) != (instance.status == draft):
+        index_post_comments(instance)
+
+
+@receiver(post_delete, sender=Post)
+def post_unindexing_hook(sender, instance, **kwargs):
+    get_backend().remove('post', instance.pk)
+
+
+@receiver(post_save, sender=PostComment)
+def comment_indexing_hook(sender, instance, raw=False, **kwargs):
+    if not raw:
+        index_comment(instance)
+
+
+@receiver(post_delete, sender=PostComment)
+def comment_unindexing_hook(sender, instance, **kwargs):
+    get_backend().remove('comment', instance.pk)
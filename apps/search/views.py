@@ -0,0 +1,78 @@
+from collections import OrderedDict
+
+from rest_framework import status, viewsets
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param, remove_query_param
+
+from posts.models import Post
+from posts.serializers import PostReadOnlySerializer
+from comments.models import PostComment
+from search.backends import get_backend, KINDS
+from search.serializers import SearchCommentSerializer
+
+
+class SearchViewSet(viewsets.ViewSet):
+    """
+    Ranked full-text search over posts and comments.
+    ``?q=`` is the query, ``?type=post|comment`` limits the results to one
+    kind and ``?page=`` selects the page.
+    """
+    page_size = 20
+
+    def list(self, request):
+        query = request.query_params.get('q', '').strip()
+        kind = request.query_params.get('type') or None
+        if not query:
+            return Response({'error': 'The q parameter is required'}, status=status.HTTP_400_BAD_REQUEST)
+        if kind is not None and kind not in KINDS:
+            return Response(
+                {'error': f"Unknown type '{kind}'. Use one of: {', '.join(KINDS)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            page = max(int(request.query_params.get('page', 1)), 1)
+        except ValueError:
+            return Response({'error': 'Invalid page'}, status=status.HTTP_400_BAD_REQUEST)
+
+        hits = get_backend().search(
+            query, kind=kind,
+            limit=self.page_size + 1,
+            offset=(page - 1) * self.page_size
+        )
+        has_next = len(hits) > self.page_size
+        hits = hits[:self.page_size]
+
+        results = self.serialize_hits(hits)
+        url = request.build_absolute_uri()
+        return Response(OrderedDict([
+            ('next', replace_query_param(url, 'page', page + 1) if has_next else None),
+            ('previous', None if page == 1 else (
+                remove_query_param(url, 'page') if page == 2
+                else replace_query_param(url, 'page', page - 1))),
+            ('results', results),
+        ]), status=status.HTTP_200_OK)
+
+    def serialize_hits(self, hits):
+        post_ids = [object_id for kind, object_id, rank in hits if kind == 'post']
+        comment_ids = [object_id for kind, object_id, rank in hits if kind == 'comment']
+        posts = Post.objects\
+            .filter(pk__in=post_ids)\
+            .exclude(status=Post.STATUS.DRAFT)\
+            .select_related('author', 'group')\
+            .in_bulk()
+        comments = PostComment.objects\
+            .filter(pk__in=comment_ids, is_removed=False)\
+            .exclude(post__status=Post.STATUS.DRAFT)\
+            .select_related('user', 'post')\
+            .in_bulk()
+
+        results = []
+        for kind, object_id, rank in hits:
+            if kind == 'post' and object_id in posts:
+                data = PostReadOnlySerializer(posts[object_id]).data
+            elif kind == 'comment' and object_id in comments:
+                data = SearchCommentSerializer(comments[object_id]).data
+            else:
+                continue
+            results.append({'type': kind, 'rank': rank, kind: data})
+        return results
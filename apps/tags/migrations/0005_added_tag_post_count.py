@@ -0,0 +1,36 @@
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def count_tag_posts(apps, schema_editor):
+    Tag = apps.get_model('tags', 'Tag')
+    PostTag = apps.get_model('posts', 'PostTag')
+    posts = PostTag.objects\
+        .filter(tag=OuterRef('pk'))\
+        .order_by()\
+        .values('tag')\
+        .annotate(total=Count('pk'))\
+        .values('total')
+    Tag.objects.update(post_count=Coalesce(Subquery(posts), Value(0)))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tags', '0004_alter_tag_id_alter_tagtype_id'),
+        ('posts', '0009_added_post_tag_model'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tag',
+            name='post_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='tag',
+            index=models.Index(fields=['-post_count', '-id'], name='tags_tag_popular_idx'),
+        ),
+        migrations.RunPython(count_tag_posts, migrations.RunPython.noop),
+    ]
@@ -1,5 +1,5 @@
 from django.db import models
-from core.models import TimeStampedModel
+from core.models import TimeStampedModel, StoredCountersMixin
 from django.utils.translation import gettext_lazy as _
 
 
@@ -14,7 +14,7 @@ class TagType(TimeStampedModel):
         return f"{self.title}"
 
 
-class Tag(TimeStampedModel):
+class Tag(StoredCountersMixin, TimeStampedModel):
     name = models.CharField(max_length=30)
     tag_type = models.ForeignKey(
         TagType, null=True,
@@ -22,9 +22,16 @@ class Tag(TimeStampedModel):
         related_name="tags",
         on_delete=models.SET_NULL
     )
+    post_count = models.PositiveIntegerField(default=0)
+
+    STORED_COUNTERS = ('post_count',)
+
     class Meta:
         verbose_name = 'Tag'
         verbose_name_plural = 'Tags'
+        indexes = [
+            models.Index(fields=['-post_count', '-id'], name='tags_tag_popular_idx'),
+        ]
 
     def __str__(self):
         return f"{self.name}"
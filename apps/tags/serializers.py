@@ -23,3 +23,9 @@ class TagReadOnlySerializer(ModelReadOnlySerializer):
     class Meta:
         model = Tag
         fields = '__all__'
+
+
+class TagPostCountSerializer(TagSerializer):
+    class Meta(TagSerializer.Meta):
+        fields = TagSerializer.Meta.fields + ('post_count',)
+        read_only_fields = ('id', 'post_count')
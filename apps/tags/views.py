@@ -1,12 +1,36 @@
 from django.shortcuts import render
+from rest_framework.exceptions import ValidationError
 from .models import Tag
 from core.views import BaseViewSet
-from .serializers import TagSerializer
+from .serializers import TagSerializer, TagPostCountSerializer
 from .filters import TagFilterSet
 
+# ``popular`` reads the stored post counts in index order.
+SORTS = {
+    'new': ('-created_at', '-id'),
+    'popular': ('-post_count', '-id'),
+    'name': ('name', 'id'),
+}
+DEFAULT_SORT = 'new'
+
 
 class TagViewSet(BaseViewSet):
     queryset = Tag.objects.all()
     serializer_class = TagSerializer
+    serializer_action_classes = {
+        'list': TagPostCountSerializer,
+        'retrieve': TagPostCountSerializer,
+    }
     filterset_class = TagFilterSet
     ordering = ['-created_at']
+
+    def get_queryset(self):
+        queryset = super(TagViewSet, self).get_queryset()
+        if self.action != 'list':
+            return queryset
+        sort = self.request.query_params.get('sort', DEFAULT_SORT)
+        if sort not in SORTS:
+            raise ValidationError(
+                {'error': f"Unknown sort '{sort}'. Use one of: {', '.join(SORTS)}"}
+            )
+        return queryset.select_related('tag_type').order_by(*SORTS[sort])
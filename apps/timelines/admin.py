@@ -0,0 +1,12 @@
+from django.contrib import admin
+from timelines.models import PullSource
+
+
+@admin.register(PullSource)
+class PullSourceAdmin(admin.ModelAdmin):
+    list_display = (
+        'id',
+        'author',
+        'group',
+    )
+    raw_id_fields = ('author', 'group')
@@ -0,0 +1,67 @@
+from django.db import models
+from django.db.models import Q
+from django.contrib.auth.models import User
+
+from groups.models import Group
+from posts.models import Post
+
+
+class TimelineEntry(models.Model):
+    """
+    A post pushed to the home timeline of a user. Entries are read newest
+    post first on the (user, post) unique index.
+    """
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="timeline_entries"
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name="timeline_entries"
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'post'],
+                name='timelines_timelineentry_unique_post'
+            ),
+        ]
+        verbose_name = "Timeline Entry"
+        verbose_name_plural = "Timeline Entries"
+
+    def __str__(self):
+        return f"Post {self.post_id} on the timeline of {self.user_id}"
+
+
+class PullSource(models.Model):
+    """
+    An author or group with too large an audience to fan out to. Its posts
+    are not pushed to timelines but merged into them on read.
+    """
+    author = models.OneToOneField(
+        User, null=True, blank=True,
+        on_delete=models.CASCADE,
+        related_name="+"
+    )
+    group = models.OneToOneField(
+        Group, null=True, blank=True,
+        on_delete=models.CASCADE,
+        related_name="+"
+    )
+
+    class Meta:
+        constraints = [
+            models.CheckConstraint(
+                condition=Q(author__isnull=False, group__isnull=True)
+                | Q(author__isnull=True, group__isnull=False),
+                name='timelines_pullsource_author_or_group'
+            ),
+        ]
+        verbose_name = "Pull Source"
+        verbose_name_plural = "Pull Sources"
+
+    def __str__(self):
+        return f"Pulled posts of {self.author_id or f'group {self.group_id}'}"
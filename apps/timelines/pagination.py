@@ -0,0 +1,38 @@
+from core.pagination import KeysetPagination
+from posts.models import Post
+from timelines.services import timeline_post_ids
+
+
+class TimelinePagination(KeysetPagination):
+    """
+    Keyset pagination of a home timeline, newest post first. Pages are
+    merged from the pushed entries and the pulled posts of the timeline
+    rather than read from a single queryset.
+    """
+    page_size = 24
+
+    def paginate_timeline(self, user, queryset, request):
+        """
+        Returns the posts of ``queryset`` on the requested page of the
+        timeline of ``user``.
+        """
+        self.request = request
+        self.model = Post
+        self.ordering = [('id', True)]
+
+        cursor = self.decode_cursor(request)
+        start, reverse = None, False
+        if cursor is not None:
+            (start,), reverse = cursor
+        post_ids = timeline_post_ids(user, self.page_size + 1, start, reverse)
+        has_more = len(post_ids) > self.page_size
+        post_ids = post_ids[:self.page_size]
+        if reverse:
+            post_ids.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, cursor is not None
+
+        posts = queryset.in_bulk(post_ids)
+        self.page = [posts[post_id] for post_id in post_ids if post_id in posts]
+        return self.page
@@ -0,0 +1,246 @@
+"""
+Materialized home timelines.
+
+A post is fanned out when it is published: its id is pushed to the timeline
+of its author, of the author's followers and of the members of its group.
+An audience larger than ``TIMELINE['FANOUT_LIMIT']`` is not written to;
+its author or group becomes a ``PullSource`` and its posts are merged into
+the timelines of its followers or members when they are read.
+
+Every timeline keeps about ``TIMELINE['MAX_ENTRIES']`` newest entries.
+Trimming reads the timeline down to that depth, so instead of trimming on
+every push, each recipient is trimmed with a chance of one in
+``TIMELINE['TRIM_INTERVAL']``, which keeps timelines within a few
+``TRIM_INTERVAL`` entries of the cap. The ``rebuild_timelines`` command
+rebuilds timelines and pull sources from the follower and member tables.
+"""
+import random
+
+from django.conf import settings
+from django.db.models import Count, OuterRef, Q, Subquery
+
+from followers.models import UserFollower
+from groups.models import GroupMember
+from posts.models import Post
+from timelines.models import PullSource, TimelineEntry
+
+DEFAULTS = {
+    'MAX_ENTRIES': 800,
+    'FANOUT_LIMIT': 10000,
+    'TRIM_INTERVAL': 50,
+}
+
+
+def timeline_config():
+    return {**DEFAULTS, **getattr(settings, 'TIMELINE', {})}
+
+
+def visible_posts():
+    return Post.objects.exclude(status=Post.STATUS.DRAFT)
+
+
+def followed_authors(user):
+    return UserFollower.objects.filter(follower=user).values('followed_user')
+
+
+def joined_groups(user):
+    return GroupMember.objects.filter(user=user).values('group')
+
+
+def audiences(post):
+    """
+    Returns (source, recipient ids) pairs of the audiences of a post: the
+    followers of its author and the members of its group.
+    """
+    sources = [
+        ({'author_id': post.author_id}, UserFollower.objects
+            .filter(followed_user_id=post.author_id)
+            .values_list('follower_id', flat=True)),
+    ]
+    if post.group_id is not None:
+        sources.append(({'group_id': post.group_id}, GroupMember.objects
+            .filter(group_id=post.group_id)
+            .values_list('user_id', flat=True)))
+    return sources
+
+
+def push(user_ids, post_ids):
+    """
+    Adds every post to every timeline, then trims a sample of them.
+    """
+    config = timeline_config()
+    TimelineEntry.objects.bulk_create(
+        [TimelineEntry(user_id=user_id, post_id=post_id)
+         for user_id in user_ids for post_id in post_ids],
+        batch_size=1000, ignore_conflicts=True
+    )
+    trim([
+        user_id for user_id in user_ids
+        if len(post_ids) > 1 or random.random() * config['TRIM_INTERVAL'] < 1
+    ])
+
+
+def trim(user_ids):
+    """
+    Deletes the entries of the given timelines past ``MAX_ENTRIES``.
+    """
+    if not user_ids:
+        return 0
+    depth = timeline_config()['MAX_ENTRIES']
+    oldest_kept = TimelineEntry.objects\
+        .filter(user=OuterRef('user'))\
+        .order_by('-post_id')\
+        .values('post_id')[depth - 1:depth]
+    deleted, _ = TimelineEntry.objects\
+        .filter(user__in=user_ids, post_id__lt=Subquery(oldest_kept))\
+        .delete()
+    return deleted
+
+
+def fan_out(post):
+    """
+    Pushes a published post to the timelines of its audiences, or records
+    the audiences too large to push to as pull sources. Returns the number
+    of timelines pushed to.
+    """
+    limit = timeline_config()['FANOUT_LIMIT']
+    recipients = {post.author_id}
+    for source, recipient_ids in audiences(post):
+        recipient_ids = list(recipient_ids[:limit + 1])
+        if len(recipient_ids) > limit:
+            PullSource.objects.get_or_create(**source)
+        else:
+            recipients.update(recipient_ids)
+    push(list(recipients), [post.pk])
+    return len(recipients)
+
+
+def backfill(user_id, **source):
+    """
+    Pushes the newest posts of an author or group (``author=`` or
+    ``group=``) to the timeline of a user who started following it.
+    """
+    if PullSource.objects.filter(**source).exists():
+        return
+    post_ids = list(
+        visible_posts().filter(**source)
+        .order_by('-id')
+        .values_list('id', flat=True)[:timeline_config()['MAX_ENTRIES']]
+    )
+    if post_ids:
+        push([user_id], post_ids)
+
+
+def unfollow(user, author):
+    """
+    Removes the posts of an author from the timeline of a user, except
+    those still shown through one of the user's groups.
+    """
+    TimelineEntry.objects\
+        .filter(user=user, post__author=author)\
+        .exclude(post__group__in=joined_groups(user))\
+        .delete()
+
+
+def leave_group(user, group):
+    """
+    Removes the posts of a group from the timeline of a user, except their
+    own and those of authors they follow.
+    """
+    TimelineEntry.objects\
+        .filter(user=user, post__group=group)\
+        .exclude(post__author=user)\
+        .exclude(post__author__in=followed_authors(user))\
+        .delete()
+
+
+def pulled_posts(user):
+    """
+    Returns the posts of the pull sources a user follows or is a member of,
+    or None when there are none.
+    """
+    sources = PullSource.objects.filter(
+        Q(author__in=followed_authors(user)) | Q(group__in=joined_groups(user))
+    ).values_list('author_id', 'group_id')
+    authors = [author_id for author_id, group_id in sources if author_id]
+    groups = [group_id for author_id, group_id in sources if group_id]
+    if not authors and not groups:
+        return None
+    return visible_posts().filter(Q(author__in=authors) | Q(group__in=groups))
+
+
+def timeline_post_ids(user, limit, start=None, reverse=False):
+    """
+    Returns up to ``limit`` post ids of the home timeline of a user, newest
+    first, past the post id ``start``. With ``reverse`` the ids before
+    ``start`` are returned instead, oldest first.
+
+    Pushed entries and pulled posts are each read in post id order up to
+    ``limit`` and merged.
+    """
+    order = 'post_id' if reverse else '-post_id'
+    seek = 'gt' if reverse else 'lt'
+    pushed = TimelineEntry.objects\
+        .filter(user=user)\
+        .exclude(post__status=Post.STATUS.DRAFT)
+    pulled = pulled_posts(user)
+    if start is not None:
+        pushed = pushed.filter(**{f'post_id__{seek}': start})
+    post_ids = set(pushed.order_by(order).values_list('post_id', flat=True)[:limit])
+    if pulled is not None:
+        if start is not None:
+            pulled = pulled.filter(**{f'id__{seek}': start})
+        post_ids.update(
+            pulled.order_by(order.replace('post_id', 'id')).values_list('id', flat=True)[:limit]
+        )
+    return sorted(post_ids, reverse=not reverse)[:limit]
+
+
+def refresh_pull_sources():
+    """
+    Makes the authors and groups whose audiences exceed ``FANOUT_LIMIT``
+    the pull sources, and only them. Returns their number.
+    """
+    limit = timeline_config()['FANOUT_LIMIT']
+    authors = UserFollower.objects\
+        .order_by()\
+        .values('followed_user')\
+        .annotate(total=Count('pk'))\
+        .filter(total__gt=limit)\
+        .values_list('followed_user', flat=True)
+    groups = GroupMember.objects\
+        .order_by()\
+        .values('group')\
+        .annotate(total=Count('pk'))\
+        .filter(total__gt=limit)\
+        .values_list('group', flat=True)
+    sources = [PullSource(author_id=author_id) for author_id in authors]\
+        + [PullSource(group_id=group_id) for group_id in groups]
+    PullSource.objects.all().delete()
+    PullSource.objects.bulk_create(sources)
+    return len(sources)
+
+
+def rebuild_timeline(user_id):
+    """
+    Replaces the timeline of a user with the newest posts of their own, of
+    the authors they follow and of their groups, leaving out pull sources.
+    """
+    pulled = PullSource.objects.all()
+    post_ids = list(
+        visible_posts().filter(
+            Q(author=user_id)
+            | Q(author__in=followed_authors(user_id).exclude(
+                followed_user__in=pulled.exclude(author=None).values('author')))
+            | Q(group__in=joined_groups(user_id).exclude(
+                group__in=pulled.exclude(group=None).values('group')))
+        )
+        .order_by('-id')
+        .values_list('id', flat=True)[:timeline_config()['MAX_ENTRIES']]
+    )
+    TimelineEntry.objects.filter(user=user_id).delete()
+    TimelineEntry.objects.bulk_create(
+        [TimelineEntry(user_id=user_id, post_id=post_id) for post_id in post_ids],
+        batch_size=1000
+    )
+    return len(post_ids)
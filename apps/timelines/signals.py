@@ -0,0 +1,38 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from followers.models import UserFollower
+from groups.models import GroupMember
+from posts.models import Post
+from timelines.services import backfill, fan_out, leave_group, unfollow
+
+
+@receiver(post_save, sender=Post)
+def post_published_hook(sender, instance, raw=False, **kwargs):
+    # Fans out new posts and drafts being published. _stored_status is the
+    # status loaded from the database; it is not updated until save returns.
+    previous = getattr(instance, '_stored_status', Post.STATUS.DRAFT)
+    if not raw and previous == Post.STATUS.DRAFT \
+            and instance.status != Post.STATUS.DRAFT:
+        fan_out(instance)
+
+
+@receiver(post_save, sender=UserFollower)
+def user_followed_hook(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        backfill(instance.follower_id, author=instance.followed_user_id)
+
+
+@receiver(post_delete, sender=UserFollower)
+def user_unfollowed_hook(sender, instance, **kwargs):
+    unfollow(instance.follower_id, instance.followed_user_id)
+
+
+@receiver(post_save, sender=GroupMember)
+def group_joined_hook(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        backfill(instance.user_id, group=instance.group_id)
+
+
+@receiver(post_delete, sender=GroupMember)
+def group_left_hook(sender, instance, **kwargs):
+    leave_group(instance.user_id, instance.group_id)
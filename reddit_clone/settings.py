@@ -83,7 +83,9 @@ INSTALLED_APPS = [
     'bookmarks',
     'followers',
     'reports',
-    'groups'
+    'groups',
+    'search',
+    'timelines',
 ]
 
 REST_FRAMEWORK = {
@@ -97,6 +99,43 @@ REST_FRAMEWORK = {
     ],
 }
 
+# Caches. Local memory by default; set CACHE_BACKEND and CACHE_LOCATION to use
+# a cache shared by all processes, e.g. django.core.cache.backends.redis.RedisCache
+# with redis://127.0.0.1:6379/1
+CACHES = {
+    'default': {
+        'BACKEND': get_env_variable('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': get_env_variable('CACHE_LOCATION', 'reddit-clone'),
+    }
+}
+
+# Cache of anonymous post responses, see apps/core/cache.py
+RESPONSE_CACHE = {
+    'ALIAS': get_env_variable('RESPONSE_CACHE_ALIAS', 'default'),
+    'TIMEOUT': int(get_env_variable('RESPONSE_CACHE_TIMEOUT', '60')),
+}
+
+# Write-behind vote buffer, see apps/core/buffers.py for its crash semantics
+VOTE_BUFFER = {
+    'ENABLED': get_env_variable('VOTE_BUFFER_ENABLED', 'False').lower() in ('true', '1', 'yes', 'on'),
+    'BATCH_SIZE': int(get_env_variable('VOTE_BUFFER_BATCH_SIZE', '500')),
+    'FLUSH_INTERVAL': float(get_env_variable('VOTE_BUFFER_FLUSH_INTERVAL', '1.0')),
+}
+
+# Write-behind post view counters, see apps/core/counters.py for their crash semantics
+VIEW_COUNTER = {
+    'ENABLED': get_env_variable('VIEW_COUNTER_ENABLED', 'False').lower() in ('true', '1', 'yes', 'on'),
+    'BATCH_SIZE': int(get_env_variable('VIEW_COUNTER_BATCH_SIZE', '1000')),
+    'FLUSH_INTERVAL': float(get_env_variable('VIEW_COUNTER_FLUSH_INTERVAL', '10.0')),
+}
+
+# Home timelines, see apps/timelines/services.py
+TIMELINE = {
+    'MAX_ENTRIES': int(get_env_variable('TIMELINE_MAX_ENTRIES', '800')),
+    'FANOUT_LIMIT': int(get_env_variable('TIMELINE_FANOUT_LIMIT', '10000')),
+    'TRIM_INTERVAL': int(get_env_variable('TIMELINE_TRIM_INTERVAL', '50')),
+}
+
 # REST Auth settings
 REST_AUTH = {
     'LOGIN_SERIALIZER': 'dj_rest_auth.serializers.LoginSerializer',
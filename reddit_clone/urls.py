@@ -48,6 +48,7 @@ urlpatterns = [
     path('', include('groups.urls')),
     path('', include('profiles.urls')),
     path('', include('reports.urls')),
+    path('', include('search.urls')),
         path(
         "api/swagger/",
         schema_view.with_ui("swagger", cache_timeout=0),
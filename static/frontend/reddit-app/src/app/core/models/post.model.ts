@@ -6,7 +6,8 @@ import { Report } from './report.model';
 export class Post {
   uuid: string;
   title: string;
-  content: string;
+  content?: string;
+  excerpt?: string;
   status: string;
   created_at: string;
   updated_at: string;
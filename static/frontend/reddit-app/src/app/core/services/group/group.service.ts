@@ -21,8 +21,8 @@ export class GroupService {
     return this.http.get(this.baseUrl + 'groups/');
   }
 
-  getGroupPosts(group_id: number){
-    return this.http.get(this.baseUrl + 'groups/' + group_id + '/posts/');
+  getGroupPosts(group_id: number, next?: string){
+    return this.http.get(next || this.baseUrl + 'groups/' + group_id + '/posts/');
   }
 
   getGroupDetail(group_id: number) {
@@ -18,6 +18,8 @@ export class GroupFeedComponent implements OnInit {
   user: User;
   @Input() group: Group;
   isLoading: boolean = true;
+  showLoader: boolean = false;
+  next: string;
 
   constructor(
     private groupService: GroupService,
@@ -32,6 +34,8 @@ export class GroupFeedComponent implements OnInit {
 
   ngOnChanges(changes: SimpleChanges): void {
     if(this.group){
+      this.groupPosts = [];
+      this.next = null;
       this.getFeed();
     }
   }
@@ -49,18 +53,25 @@ export class GroupFeedComponent implements OnInit {
   }
 
   getFeed(){
-    this.groupService.getGroupPosts(this.group.id).subscribe(
+    this.groupService.getGroupPosts(this.group.id, this.next).subscribe(
       (response: any) => {
-        this.groupPosts = response;
-        console.log(this.groupPosts);
+        this.groupPosts = [...this.groupPosts, ...response.results];
+        this.next = response.next;
         this.isLoading = false;
+        this.showLoader = false;
       },
       (err: any) => {
         console.log(err);
         this.isLoading = false;
+        this.showLoader = false;
       })
   }
 
+  loadMorePosts(): void {
+    this.showLoader = true;
+    this.getFeed();
+  }
+
   redirect(){
     this.router.navigate(['submit-post'], {relativeTo: this.route})
   }
@@ -0,0 +1,125 @@
+"""
+Test cases for the archive_posts command
+"""
+from datetime import datetime, timedelta, timezone as dt_timezone
+from io import StringIO
+import unittest
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.contrib.auth.models import User
+from django.utils import timezone
+
+from groups.models import Group
+from posts.models import Post
+
+
+class ArchivePostsTest(TestCase):
+    """Test cases for chunked auto-archiving"""
+
+    def setUp(self):
+        """Set up test data"""
+        cache.clear()
+        self.user = User.objects.create_user(username='author', password='testpass123')
+        self.group = Group.objects.create(name='Archived', archive_posts=True, archive_after_months=1)
+        self.kept = Group.objects.create(name='Kept')
+
+    def post(self, title, days, group=None, **kwargs):
+        post = Post.objects.create(
+            title=title, content='Content', author=self.user,
+            group=group or self.group, **kwargs
+        )
+        Post.objects.filter(pk=post.pk).update(created_at=timezone.now() - timedelta(days=days))
+        return post
+
+    def archive(self, *args):
+        out = StringIO()
+        call_command('archive_posts', *args, stdout=out)
+        return out.getvalue()
+
+    def statuses(self):
+        return dict(Post.objects.values_list('title', 'status'))
+
+    def test_archives_due_posts_only(self):
+        """Test only old public posts of archiving groups are archived"""
+        self.post('Old', 60)
+        self.post('Recent', 10)
+        self.post('Old draft', 60, status=Post.STATUS.DRAFT)
+        self.post('Other group', 60, group=self.kept)
+
+        output = self.archive()
+        self.assertEqual(self.statuses(), {
+            'Old': Post.STATUS.ARCHIVED,
+            'Recent': Post.STATUS.PUBLIC,
+            'Old draft': Post.STATUS.DRAFT,
+            'Other group': Post.STATUS.PUBLIC,
+        })
+        self.assertIn('Archived 1 posts', output)
+        self.assertIn('rows/s', output)
+
+    def test_age_per_group(self):
+        """Test each group archives after its own number of months"""
+        self.group.archive_after_months = 3
+        self.group.save()
+        self.post('Two months', 60)
+        self.post('Four months', 120)
+        self.archive()
+        self.assertEqual(self.statuses()['Two months'], Post.STATUS.PUBLIC)
+        self.assertEqual(self.statuses()['Four months'], Post.STATUS.ARCHIVED)
+
+    def test_bounded_batches(self):
+        """Test posts are archived with one bounded UPDATE per batch"""
+        for i in range(5):
+            self.post(f'Post {i}', 60 + i)
+        with CaptureQueriesContext(connection) as queries:
+            self.archive('--batch-size', '2')
+        updates = [
+            q['sql'] for q in queries
+            if q['sql'].startswith('UPDATE "posts_post"')
+        ]
+        self.assertEqual(len(updates), 3)
+        self.assertEqual(Post.objects.filter(status=Post.STATUS.ARCHIVED).count(), 5)
+
+    def test_late_posts_are_archived(self):
+        """Test posts back-dated or moved into the group after a run are archived next"""
+        self.post('Old', 90)
+        self.archive()
+        backdated = self.post('Back-dated', 5)
+        moved = self.post('Moved', 120, group=self.kept)
+
+        Post.objects.filter(pk=backdated.pk).update(created_at=timezone.now() - timedelta(days=100))
+        Post.objects.filter(pk=moved.pk).update(group=self.group)
+        self.archive()
+        self.assertEqual(self.statuses()['Back-dated'], Post.STATUS.ARCHIVED)
+        self.assertEqual(self.statuses()['Moved'], Post.STATUS.ARCHIVED)
+
+    @unittest.skipUnless(connection.vendor == 'sqlite', 'the plan is read in SQLite terms')
+    def test_reads_public_posts_from_index(self):
+        """Test a batch reads the due public posts from their partial index"""
+        plan = Post.objects.filter(
+            group=self.group, status=Post.STATUS.PUBLIC, created_at__lt=timezone.now()
+        ).order_by('created_at', 'id').values_list('pk')[:10].explain()
+        self.assertIn('posts_post_group_public_idx', plan)
+        self.assertNotIn('TEMP B-TREE', plan)
+
+    def test_invalidates_cached_feeds(self):
+        """Test archiving invalidates the cached feed and group pages"""
+        self.post('Old', 60)
+        for url in ('/api/v1/posts/', f'/api/v1/groups/{self.group.pk}/posts/'):
+            self.client.get(url)
+
+        self.archive()
+        for url in ('/api/v1/posts/', f'/api/v1/groups/{self.group.pk}/posts/'):
+            response = self.client.get(url)
+            self.assertEqual(response['X-Cache'], 'MISS')
+            self.assertEqual(response.json()['results'][0]['status'], Post.STATUS.ARCHIVED)
+
+    def test_archive_cutoff(self):
+        """Test the cutoff moves back by calendar months"""
+        now = datetime(2024, 3, 31, 12, tzinfo=dt_timezone.utc)
+        self.assertEqual(self.group.archive_cutoff(now), datetime(2024, 2, 29, 12, tzinfo=dt_timezone.utc))
+        self.group.archive_after_months = 15
+        self.assertEqual(self.group.archive_cutoff(now), datetime(2022, 12, 31, 12, tzinfo=dt_timezone.utc))
@@ -0,0 +1,108 @@
+"""
+Test cases for the stored comment reply counts
+"""
+from io import StringIO
+
+from django.core.management import call_command
+from django.contrib.auth.models import User
+from django.test import TestCase
+from rest_framework.test import APITestCase
+from rest_framework import status
+
+from comments.models import PostComment
+from posts.models import Post
+
+
+class ReplyCountTest(TestCase):
+    """Test cases for child and descendant counts kept on writes"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.user = User.objects.create_user(username='author', password='testpass123')
+        self.post = Post.objects.create(title='Post', content='Content', author=self.user)
+        self.root = self.comment('Root')
+        self.reply = self.comment('Reply', self.root)
+        self.nested = self.comment('Nested', self.reply)
+
+    def comment(self, text, parent=None, **kwargs):
+        return PostComment.objects.create(
+            post=self.post, user=self.user, parent=parent, _comment=text, **kwargs
+        )
+
+    def counts(self, comment):
+        comment = PostComment.objects.get(pk=comment.pk)
+        return comment.child_count, comment.descendant_count
+
+    def test_insert(self):
+        """Test a reply counts for its parent and all its ancestors"""
+        self.assertEqual(self.counts(self.root), (1, 2))
+        self.assertEqual(self.counts(self.reply), (1, 1))
+        self.assertEqual(self.counts(self.nested), (0, 0))
+        self.comment('Removed', self.reply, is_removed=True)
+        self.assertEqual(self.counts(self.root), (1, 2))
+
+    def test_remove_and_restore(self):
+        """Test removing a reply uncounts it and restoring counts it again"""
+        nested = PostComment.objects.get(pk=self.nested.pk)
+        nested.is_removed = True
+        nested.save()
+        self.assertEqual(self.counts(self.root), (1, 1))
+        self.assertEqual(self.counts(self.reply), (0, 0))
+
+        nested.is_removed = False
+        nested.save()
+        self.assertEqual(self.counts(self.root), (1, 2))
+        self.assertEqual(self.counts(self.reply), (1, 1))
+
+    def test_move(self):
+        """Test moving a subtree moves its counts"""
+        other = self.comment('Other')
+        reply = PostComment.objects.get(pk=self.reply.pk)
+        reply.parent = other
+        reply.save()
+        self.assertEqual(self.counts(self.root), (0, 0))
+        self.assertEqual(self.counts(other), (1, 2))
+
+    def test_delete(self):
+        """Test deleting a subtree uncounts every deleted reply"""
+        PostComment.objects.get(pk=self.reply.pk).delete()
+        self.assertEqual(self.counts(self.root), (0, 0))
+
+    def test_recount(self):
+        """Test recount_counters rebuilds the reply counts"""
+        PostComment.objects.update(child_count=0, descendant_count=5)
+        call_command('recount_counters', stdout=StringIO())
+        self.assertEqual(self.counts(self.root), (1, 2))
+        self.assertEqual(self.counts(self.nested), (0, 0))
+
+
+class ReplyCountAPITest(APITestCase):
+    """Test cases for listings reading the stored counts"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.user = User.objects.create_user(username='author', password='testpass123')
+        self.post = Post.objects.create(title='Post', content='Content', author=self.user)
+        self.url = f'/api/v1/posts/{self.post.uuid}/comments/'
+
+    def test_listing_shows_removed_comments_with_replies(self):
+        """Test removed comments are listed only while they have replies"""
+        kept = PostComment.objects.create(
+            post=self.post, user=self.user, _comment='Kept', is_removed=True
+        )
+        PostComment.objects.create(post=self.post, user=self.user, parent=kept, _comment='Reply')
+        PostComment.objects.create(
+            post=self.post, user=self.user, _comment='Hidden', is_removed=True
+        )
+        for index in range(5):
+            PostComment.objects.create(post=self.post, user=self.user, _comment=f'Top {index}')
+
+        with self.assertNumQueries(5):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 6)
+        self.assertEqual(response.data['results'][0]['child_count'], 1)
+        self.assertEqual(response.data['results'][0]['descendant_count'], 1)
+
+        response = self.client.get(f'{self.url}{kept.pk}/children/')
+        self.assertEqual([row['comment'] for row in response.data['results']], ['Reply'])
@@ -0,0 +1,92 @@
+"""
+Test cases for mentions on comment create
+"""
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+from rest_framework import status
+
+from comments.models import PostComment
+from comments.services import MENTION_PATTERN, mention_users
+from posts.models import Post
+
+
+class MentionUsersTest(TestCase):
+    """Test cases for comments.services.mention_users"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.user = User.objects.create_user(username='author', password='testpass123')
+        self.alice = User.objects.create_user(username='alice', password='testpass123')
+        self.bob = User.objects.create_user(username='bob.smith', password='testpass123')
+        self.post = Post.objects.create(title='Post', content='Content', author=self.user)
+        self.comment = PostComment.objects.create(
+            post=self.post, user=self.user, _comment='Comment'
+        )
+
+    def mentioned(self):
+        return sorted(self.comment.mentioned_users.values_list('username', flat=True))
+
+    def test_pattern(self):
+        """Test usernames are read from mentions and not from emails"""
+        self.assertEqual(
+            MENTION_PATTERN.findall('Hi @alice, @bob.smith. Mail alice@example.com'),
+            ['alice', 'bob.smith']
+        )
+
+    def test_ids_and_names(self):
+        """Test ids and names are resolved together and unknown ones ignored"""
+        with CaptureQueriesContext(connection) as queries:
+            users = mention_users(
+                self.comment, [self.alice.pk, 999, 'x'], 'Thanks @bob.smith and @nobody!'
+            )
+        self.assertEqual(len(users), 2)
+        self.assertEqual(len(queries), 2)
+        self.assertEqual(self.mentioned(), ['alice', 'bob.smith'])
+
+    def test_repeated_mentions(self):
+        """Test mentioning a user again does not fail or duplicate"""
+        mention_users(self.comment, [self.alice.pk], '@alice @alice')
+        mention_users(self.comment, [self.alice.pk])
+        self.assertEqual(self.mentioned(), ['alice'])
+
+    def test_nothing_to_resolve(self):
+        """Test a comment without mentions runs no query"""
+        with self.assertNumQueries(0):
+            self.assertEqual(mention_users(self.comment, [], 'No mentions here'), [])
+
+
+class MentionAPITest(APITestCase):
+    """Test cases for mentions on the comment create endpoint"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.user = User.objects.create_user(username='author', password='testpass123')
+        self.post = Post.objects.create(title='Post', content='Content', author=self.user)
+        self.url = f'/api/v1/posts/{self.post.uuid}/comments/'
+        self.client.force_authenticate(user=self.user)
+
+    def create(self, text, mentioned_users):
+        return self.client.post(self.url, {
+            'user': self.user.pk, 'comment': text, 'mentioned_users': mentioned_users
+        }, format='json')
+
+    def test_query_count_does_not_grow(self):
+        """Test twenty mentions cost as many queries as one"""
+        users = [
+            User.objects.create_user(username=f'user{index}', password='testpass123')
+            for index in range(20)
+        ]
+        with CaptureQueriesContext(connection) as single:
+            response = self.create('One mention', [users[0].pk])
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        with CaptureQueriesContext(connection) as many:
+            response = self.create(
+                'Also @user18 and @user19', [user.pk for user in users[:18]]
+            )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(many), len(single))
+        self.assertEqual(len(response.data['mentioned_users']), 20)
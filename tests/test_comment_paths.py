@@ -0,0 +1,122 @@
+"""
+Test cases for the materialized comment paths
+"""
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+from rest_framework import status
+
+from comments.models import PostComment
+from comments.paths import path_segment, rebuild_paths
+from posts.models import Post
+
+
+class CommentPathTest(TestCase):
+    """Test cases for paths maintained on insert and on moves"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.user = User.objects.create_user(username='author', password='testpass123')
+        self.post = Post.objects.create(title='Post', content='Content', author=self.user)
+
+    def comment(self, text, parent=None):
+        return PostComment.objects.create(
+            post=self.post, user=self.user, parent=parent, _comment=text
+        )
+
+    def test_path_segment(self):
+        """Test segments are fixed width and sort like the ids"""
+        self.assertEqual(path_segment(35), '000000z')
+        self.assertLess(path_segment(99), path_segment(100))
+        with self.assertRaises(ValueError):
+            path_segment(36 ** 7)
+        with self.assertRaises(ValueError):
+            path_segment(36 ** 7 - 1)
+
+    def test_paths_on_insert(self):
+        """Test a comment path extends its parent path"""
+        first = self.comment('First')
+        reply = self.comment('Reply', first)
+        nested = self.comment('Nested', reply)
+        nested.refresh_from_db()
+        self.assertEqual(nested.depth, 2)
+        self.assertEqual(
+            nested.path,
+            path_segment(first.pk) + path_segment(reply.pk) + path_segment(nested.pk)
+        )
+
+    def test_subtree_in_path_order(self):
+        """Test a subtree is read depth first by one indexed range query"""
+        first = self.comment('First')
+        reply = self.comment('Reply', first)
+        second = self.comment('Second')
+        nested = self.comment('Nested', reply)
+        other = self.comment('Other', first)
+        self.comment('Outside', second)
+
+        with CaptureQueriesContext(connection) as queries:
+            subtree = [comment.pk for comment in first.subtree()]
+        self.assertEqual(subtree, [first.pk, reply.pk, nested.pk, other.pk])
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn('LIKE', queries[0]['sql'])
+        if connection.vendor == 'sqlite':
+            plan = first.subtree().explain()
+            self.assertIn('comments_comment_path_idx (post_id=? AND path>? AND path<?)', plan)
+
+    def test_move_rewrites_subtree(self):
+        """Test changing the parent moves the replies along"""
+        first = self.comment('First')
+        second = self.comment('Second')
+        reply = self.comment('Reply', first)
+        nested = self.comment('Nested', reply)
+
+        reply.parent = second
+        reply.save()
+        nested.refresh_from_db()
+        self.assertTrue(nested.path.startswith(second.path + path_segment(reply.pk)))
+        self.assertEqual(nested.depth, 2)
+        self.assertEqual([comment.pk for comment in first.subtree()], [first.pk])
+
+        second.parent = nested
+        with self.assertRaises(ValueError):
+            second.save()
+
+    def test_rebuild_paths(self):
+        """Test the backfill recomputes paths from parent ids"""
+        first = self.comment('First')
+        reply = self.comment('Reply', first)
+        expected = sorted(PostComment.objects.values_list('pk', 'path', 'depth'))
+        PostComment.objects.update(path='', depth=0)
+        self.assertEqual(rebuild_paths(PostComment), 2)
+        self.assertEqual(sorted(PostComment.objects.values_list('pk', 'path', 'depth')), expected)
+        self.assertEqual(PostComment.objects.get(pk=reply.pk).depth, 1)
+
+
+class CommentSubtreeAPITest(APITestCase):
+    """Test cases for ?root= on the thread endpoint"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.user = User.objects.create_user(username='author', password='testpass123')
+        self.post = Post.objects.create(title='Post', content='Content', author=self.user)
+        self.url = f'/api/v1/posts/{self.post.uuid}/comments/thread/'
+
+    def test_continue_thread(self):
+        """Test a subtree is returned with its root on top"""
+        first = PostComment.objects.create(post=self.post, user=self.user, _comment='First')
+        reply = PostComment.objects.create(
+            post=self.post, user=self.user, parent=first, _comment='Reply'
+        )
+        PostComment.objects.create(post=self.post, user=self.user, parent=reply, _comment='Nested')
+        PostComment.objects.create(post=self.post, user=self.user, _comment='Second')
+
+        response = self.client.get(self.url, {'root': reply.pk})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 2)
+        self.assertEqual([node['id'] for node in response.data['results']], [reply.pk])
+        self.assertEqual(response.data['results'][0]['replies'][0]['comment'], 'Nested')
+
+        response = self.client.get(self.url, {'root': 999})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
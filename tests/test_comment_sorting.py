@@ -0,0 +1,110 @@
+"""
+Test cases for the stored comment sort keys
+"""
+from io import StringIO
+
+from django.core.management import call_command
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase
+from rest_framework.test import APITestCase
+from rest_framework import status
+
+from comments.models import PostComment, PostCommentVote
+from comments.ranking import best_rank, controversy
+from comments.services import vote_comment
+from posts.models import Post
+
+
+class CommentRankingTest(SimpleTestCase):
+    """Test cases for the ranking formulas"""
+
+    def test_best_rank(self):
+        """Test more votes with the same share rank higher"""
+        self.assertEqual(best_rank(0, 0), 0)
+        self.assertGreater(best_rank(100, 10), best_rank(10, 1))
+        self.assertGreater(best_rank(10, 1), best_rank(1, 0))
+
+    def test_controversy(self):
+        """Test evenly split votes are the most controversial"""
+        self.assertEqual(controversy(10, 0), 0)
+        self.assertGreater(controversy(10, 10), controversy(15, 5))
+        self.assertGreater(controversy(20, 20), controversy(10, 10))
+
+
+class CommentSortingTest(APITestCase):
+    """Test cases for ?sort= on comment listings"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.author = User.objects.create_user(username='author', password='testpass123')
+        self.voters = [
+            User.objects.create_user(username=f'voter{index}', password='testpass123')
+            for index in range(7)
+        ]
+        self.post = Post.objects.create(title='Post', content='Content', author=self.author)
+        self.url = f'/api/v1/posts/{self.post.uuid}/comments/'
+        self.liked = self.comment('Liked', up=2, down=0)
+        self.mixed = self.comment('Mixed', up=5, down=2)
+        self.split = self.comment('Split', up=3, down=3)
+        self.disliked = self.comment('Disliked', up=0, down=2)
+
+    def comment(self, text, up, down, parent=None):
+        comment = PostComment.objects.create(
+            post=self.post, user=self.author, parent=parent, _comment=text
+        )
+        for voter in self.voters[:up]:
+            vote_comment(comment, voter, 1)
+        for voter in self.voters[up:up + down]:
+            vote_comment(comment, voter, -1)
+        return comment
+
+    def texts(self, sort, url=None):
+        response = self.client.get(url or self.url, {'sort': sort})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [comment['comment'] for comment in response.data['results']]
+
+    def test_stored_counters(self):
+        """Test votes keep the counters and sort keys up to date"""
+        split = PostComment.objects.get(pk=self.split.pk)
+        self.assertEqual((split.upvotes, split.downvotes, split.score), (3, 3, 0))
+        self.assertEqual(split.controversy, controversy(3, 3))
+        PostCommentVote.objects.filter(post_comment=split, vote=-1).delete()
+        split.refresh_from_db()
+        self.assertEqual((split.upvotes, split.downvotes), (3, 0))
+        self.assertEqual(split.best_rank, best_rank(3, 0))
+        self.assertEqual(split.controversy, 0)
+
+    def test_sorts(self):
+        """Test each sort orders the listing by its stored key"""
+        self.assertEqual(self.texts('old'), ['Liked', 'Mixed', 'Split', 'Disliked'])
+        self.assertEqual(self.texts('new'), ['Disliked', 'Split', 'Mixed', 'Liked'])
+        self.assertEqual(self.texts('top'), ['Mixed', 'Liked', 'Split', 'Disliked'])
+        self.assertEqual(self.texts('best'), ['Liked', 'Mixed', 'Split', 'Disliked'])
+        self.assertEqual(self.texts('controversial')[:2], ['Split', 'Mixed'])
+
+    def test_replies_and_thread(self):
+        """Test replies and the thread are sorted too"""
+        self.comment('Reply one', up=0, down=1, parent=self.liked)
+        self.comment('Reply two', up=2, down=0, parent=self.liked)
+        children = f'{self.url}{self.liked.pk}/children/'
+        self.assertEqual(self.texts('top', children), ['Reply two', 'Reply one'])
+
+        roots = self.client.get(f'{self.url}thread/', {'sort': 'top'}).data['results']
+        self.assertEqual([node['comment'] for node in roots], ['Mixed', 'Liked', 'Split', 'Disliked'])
+        self.assertEqual([node['comment'] for node in roots[1]['replies']], ['Reply two', 'Reply one'])
+
+    def test_unknown_sort(self):
+        """Test an unknown sort is rejected"""
+        response = self.client.get(self.url, {'sort': 'random'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get(f'{self.url}thread/', {'sort': 'random'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_recount(self):
+        """Test recount_counters rebuilds the counters and sort keys"""
+        PostComment.objects.update(upvotes=0, downvotes=0, best_rank=0, controversy=0)
+        call_command('recount_counters', stdout=StringIO())
+        split = PostComment.objects.get(pk=self.split.pk)
+        self.assertEqual((split.upvotes, split.downvotes), (3, 3))
+        self.assertEqual(split.controversy, controversy(3, 3))
+        self.assertEqual(self.texts('best')[0], 'Liked')
@@ -0,0 +1,98 @@
+"""
+Test cases for the whole-thread comment tree endpoint
+"""
+from django.contrib.auth.models import User
+from rest_framework.test import APITestCase
+from rest_framework import status
+
+from comments.models import PostComment
+from comments.services import vote_comment
+from posts.models import Post
+
+
+class CommentThreadTest(APITestCase):
+    """Test cases for GET /posts/<uuid>/comments/thread/"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.user = User.objects.create_user(username='author', password='testpass123')
+        self.post = Post.objects.create(title='Post', content='Content', author=self.user)
+        self.url = f'/api/v1/posts/{self.post.uuid}/comments/thread/'
+
+    def comment(self, text, parent=None, **kwargs):
+        return PostComment.objects.create(
+            post=self.post, user=self.user, parent=parent, _comment=text, **kwargs
+        )
+
+    def test_nested_tree(self):
+        """Test replies are nested with their counts and votes"""
+        first = self.comment('First')
+        reply = self.comment('Reply', first)
+        self.comment('Nested', reply)
+        self.comment('Gone', first, is_removed=True)
+        second = self.comment('Second')
+        vote_comment(second, self.user, 1)
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 5)
+        roots = response.data['results']
+        self.assertEqual([node['id'] for node in roots], [first.pk, second.pk])
+        self.assertEqual(roots[0]['child_count'], 1)
+        self.assertEqual([node['comment'] for node in roots[0]['replies']], ['Reply'])
+        self.assertEqual(roots[0]['replies'][0]['replies'][0]['comment'], 'Nested')
+        self.assertEqual(roots[1]['votes'], 1)
+
+    def test_removed_comments_with_replies_are_kept(self):
+        """Test a removed comment stays in the tree while it has replies"""
+        removed = self.comment('Removed', is_removed=True)
+        self.comment('Reply', removed)
+        roots = self.client.get(self.url).data['results']
+        self.assertEqual(roots[0]['comment'], 'This comment has been removed')
+        self.assertEqual(len(roots[0]['replies']), 1)
+
+    def test_depth_and_limit(self):
+        """Test cut off comments report how many replies were left out"""
+        parent = None
+        for level in range(4):
+            parent = self.comment(f'Level {level}', parent)
+        for index in range(3):
+            self.comment(f'Root {index}')
+
+        roots = self.client.get(self.url, {'depth': 2}).data['results']
+        self.assertEqual(roots[0]['replies'][0]['replies'], [])
+        self.assertEqual(roots[0]['replies'][0]['more_replies'], 1)
+
+        response = self.client.get(self.url, {'limit': 2})
+        self.assertEqual(len(response.data['results']), 2)
+        self.assertEqual(response.data['more_replies'], 2)
+        self.assertEqual(response.data['results'][0]['replies'], [])
+        self.assertEqual(response.data['results'][0]['more_replies'], 1)
+
+        response = self.client.get(self.url, {'depth': 0})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_large_thread_in_one_query(self):
+        """Test a 2,000 comment thread is read with one query"""
+        roots = PostComment.objects.bulk_create([
+            PostComment(post=self.post, user=self.user, _comment=f'Root {index}')
+            for index in range(500)
+        ])
+        PostComment.objects.bulk_create([
+            PostComment(post=self.post, user=self.user, parent=roots[index % 500],
+                        _comment=f'Reply {index}')
+            for index in range(1500)
+        ])
+        # Besides the thread query, the ETag validators run two aggregates
+        with self.assertNumQueries(3):
+            response = self.client.get(self.url, {'limit': 2000})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['results']), 500)
+        self.assertEqual(sum(len(node['replies']) for node in response.data['results']), 1500)
+
+    def test_unknown_post(self):
+        """Test a thread of an unknown post answers 404"""
+        response = self.client.get(
+            '/api/v1/posts/00000000-0000-0000-0000-000000000000/comments/thread/'
+        )
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,192 @@
+"""
+Test cases for ETag / Last-Modified conditional GETs
+"""
+from django.core.cache import cache
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+from rest_framework import status
+
+from bookmarks.models import PostBookmark
+from comments.models import PostComment
+from comments.services import vote_comment
+from groups.models import Group, GroupMember
+from posts.models import Post
+from posts.services import vote_post
+from tags.models import Tag
+
+
+class ConditionalGetTest(APITestCase):
+    """Test cases for 304 responses on read endpoints"""
+
+    def setUp(self):
+        """Set up test data"""
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='author',
+            email='author@example.com',
+            password='testpass123'
+        )
+        self.group = Group.objects.create(name='Test Group')
+        self.post = Post.objects.create(
+            title='Test Post',
+            content='Test content',
+            author=self.user,
+            group=self.group
+        )
+        self.comment = PostComment.objects.create(
+            post=self.post,
+            user=self.user,
+            _comment='Test comment'
+        )
+
+    def assertNotModified(self, url, etag, **headers):
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag, **headers)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response['ETag'], etag)
+        self.assertEqual(response.content, b'')
+        return response
+
+    def assertModified(self, url, etag):
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+        return response
+
+    def etag(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response['ETag']
+
+    def test_post_list(self):
+        """Test the feed answers 304 until a post on the page changes"""
+        url = '/api/v1/posts/'
+        etag = self.etag(url)
+        self.assertNotModified(url, etag)
+
+        vote_post(self.post, self.user, 1)
+        etag = self.assertModified(url, etag)['ETag']
+
+        PostComment.objects.create(post=self.post, user=self.user, _comment='Another')
+        self.assertModified(url, etag)
+
+    def test_post_list_related_rows(self):
+        """Test the feed ETag follows the authors and tags the posts show"""
+        self.client.force_login(self.user)
+        url = '/api/v1/posts/'
+        etag = self.etag(url)
+
+        self.user.first_name = 'Renamed'
+        self.user.save()
+        etag = self.assertModified(url, etag)['ETag']
+
+        tag = Tag.objects.create(name='news')
+        self.post.tags.add(tag)
+        etag = self.assertModified(url, etag)['ETag']
+
+        tag.name = 'world news'
+        tag.save()
+        self.assertModified(url, etag)
+
+    def test_not_modified_skips_serialization(self):
+        """Test a 304 runs only the page queries"""
+        url = '/api/v1/posts/'
+        etag = self.etag(url)
+        cache.clear()
+        with self.assertNumQueries(3):
+            self.assertNotModified(url, etag)
+
+    def test_modified_reads_page_once(self):
+        """Test a 200 serializes the page the validators loaded"""
+        self.client.force_login(self.user)
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get('/api/v1/posts/', HTTP_IF_NONE_MATCH='"stale"')
+        sql = [query['sql'] for query in queries if query['sql'].startswith('SELECT')]
+        self.assertEqual(len(sql), len(set(sql)))
+
+    def test_not_modified_from_response_cache(self):
+        """Test a cached response answers 304 without queries"""
+        url = f'/api/v1/posts/{self.post.uuid}/'
+        etag = self.etag(url)
+        with self.assertNumQueries(0):
+            response = self.assertNotModified(url, etag)
+        self.assertEqual(response['X-Cache'], 'HIT')
+
+    def test_post_detail(self):
+        """Test a post answers 304 until it is edited"""
+        url = f'/api/v1/posts/{self.post.uuid}/'
+        response = self.client.get(url)
+        self.assertTrue(response.has_header('Last-Modified'))
+        self.assertNotModified(url, response['ETag'])
+
+        self.post.title = 'Edited'
+        self.post.save()
+        self.assertModified(url, response['ETag'])
+
+    def test_viewer_state_changes_etag(self):
+        """Test the viewer's own bookmarks are part of the version"""
+        self.client.force_login(self.user)
+        url = f'/api/v1/posts/{self.post.uuid}/'
+        etag = self.etag(url)
+        self.assertNotModified(url, etag)
+
+        PostBookmark.objects.create(post=self.post, user=self.user)
+        self.assertModified(url, etag)
+
+        self.client.logout()
+        self.assertNotEqual(self.etag(url), etag)
+
+    def test_groups(self):
+        """Test group list and detail answer 304 until membership changes"""
+        for url in ('/api/v1/groups/', f'/api/v1/groups/{self.group.pk}/'):
+            etag = self.etag(url)
+            self.assertNotModified(url, etag)
+
+        member = User.objects.create_user(username='member', password='testpass123')
+        GroupMember.objects.bulk_create([GroupMember(group=self.group, user=member)])
+        for url in ('/api/v1/groups/', f'/api/v1/groups/{self.group.pk}/'):
+            self.assertModified(url, etag)
+
+    def test_if_modified_since(self):
+        """Test Last-Modified is honored when no ETag is sent"""
+        url = f'/api/v1/groups/{self.group.pk}/'
+        last_modified = self.client.get(url)['Last-Modified']
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_profile(self):
+        """Test a profile answers 304 until the user changes"""
+        url = f'/api/v1/users/{self.user.username}/'
+        etag = self.etag(url)
+        self.assertNotModified(url, etag)
+
+        self.user.first_name = 'Renamed'
+        self.user.save()
+        self.assertModified(url, etag)
+
+    def test_comment_listings(self):
+        """Test comment listings answer 304 until a comment or its votes change"""
+        url = f'/api/v1/posts/{self.post.uuid}/comments/'
+        etag = self.etag(url)
+        self.assertNotModified(url, etag)
+
+        vote_comment(self.comment, self.user, 1)
+        etag = self.assertModified(url, etag)['ETag']
+
+        reply = PostComment.objects.create(
+            post=self.post, user=self.user, parent=self.comment, _comment='Reply'
+        )
+        self.assertModified(url, etag)
+
+        url = f'/api/v1/posts/{self.post.uuid}/comments/{self.comment.pk}/children/'
+        etag = self.etag(url)
+        self.assertNotModified(url, etag)
+        reply.is_removed = True
+        reply.save()
+        self.assertModified(url, etag)
+
+    def test_missing_objects_are_not_validated(self):
+        """Test unknown objects still answer 404"""
+        response = self.client.get('/api/v1/groups/999/', HTTP_IF_NONE_MATCH='*')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
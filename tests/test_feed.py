@@ -0,0 +1,287 @@
+"""
+Test cases for the post feed endpoints
+"""
+from datetime import timedelta
+from io import StringIO
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.utils import timezone
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+from rest_framework import status
+from posts.models import Post, PostVote
+from posts.ranking import hot_rank
+from bookmarks.models import PostBookmark
+from comments.models import PostComment
+from comments.services import vote_comment
+
+
+class FeedViewerStateTest(APITestCase):
+    """Test cases for the page-level viewer state of the post feed"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+
+    def create_posts(self, count):
+        for i in range(count):
+            post = Post.objects.create(
+                title=f'Post {i}',
+                content='Test content',
+                author=self.user
+            )
+            PostVote.objects.create(post=post, user=self.user, vote=1)
+            PostBookmark.objects.create(post=post, user=self.user)
+            PostComment.objects.create(_comment='A comment', user=self.user, post=post)
+
+    def count_list_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/v1/posts/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return len(queries), response
+
+    def test_list_query_count_is_fixed(self):
+        """Test the feed runs the same number of queries for any page size"""
+        self.client.force_authenticate(user=self.user)
+        self.create_posts(3)
+        small_page, _ = self.count_list_queries()
+
+        self.create_posts(9)
+        full_page, response = self.count_list_queries()
+
+        self.assertEqual(len(response.data['results']), 12)
+        self.assertEqual(small_page, full_page)
+
+    def test_list_returns_viewer_state(self):
+        """Test the feed serializes the viewer's vote, bookmark and comment count"""
+        self.client.force_authenticate(user=self.user)
+        self.create_posts(1)
+        _, response = self.count_list_queries()
+
+        post = response.data['results'][0]
+        self.assertEqual(post['user_vote']['vote'], 1)
+        self.assertIsNotNone(post['user_bookmark'])
+        self.assertEqual(post['comments'], 1)
+
+    def test_anonymous_list_has_no_viewer_state(self):
+        """Test anonymous users get empty viewer state"""
+        self.create_posts(1)
+        _, response = self.count_list_queries()
+
+        post = response.data['results'][0]
+        self.assertIsNone(post['user_vote'])
+        self.assertIsNone(post['user_bookmark'])
+        self.assertEqual(post['comments'], 1)
+
+
+class FeedRankingTest(APITestCase):
+    """Test cases for the hot / new / top / rising sorts of the feed"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.author = User.objects.create_user(
+            username='author',
+            email='author@example.com',
+            password='testpass123'
+        )
+        self.voters = [
+            User.objects.create_user(username=f'voter{i}', password='testpass123')
+            for i in range(3)
+        ]
+        now = timezone.now()
+        self.old = self.create_post('Old and popular', now - timedelta(days=3), votes=3)
+        self.fresh = self.create_post('Fresh', now - timedelta(hours=2), votes=2)
+        self.newest = self.create_post('Newest', now, votes=0)
+
+    def create_post(self, title, created_at, votes):
+        post = Post.objects.create(title=title, content='Test content', author=self.author)
+        Post.objects.filter(pk=post.pk).update(created_at=created_at)
+        for voter in self.voters[:votes]:
+            PostVote.objects.create(post=post, user=voter, vote=1)
+        Post.refresh_ranks([post.pk])
+        return post
+
+    def titles(self, sort):
+        response = self.client.get('/api/v1/posts/', {'sort': sort})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [post['title'] for post in response.data['results']]
+
+    def test_sorts(self):
+        """Test each sort orders the feed by its stored rank"""
+        self.assertEqual(self.titles('new'), ['Newest', 'Fresh', 'Old and popular'])
+        self.assertEqual(self.titles('top'), ['Old and popular', 'Fresh', 'Newest'])
+        self.assertEqual(self.titles('hot'), ['Fresh', 'Newest', 'Old and popular'])
+        self.assertEqual(self.titles('rising'), ['Fresh', 'Newest', 'Old and popular'])
+
+    def test_unknown_sort(self):
+        """Test an unknown sort is rejected"""
+        response = self.client.get('/api/v1/posts/', {'sort': 'random'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_vote_updates_hot_rank(self):
+        """Test a vote moves the hot rank in the counter update, rising on refresh"""
+        for voter in self.voters[:2]:
+            PostVote.objects.create(post=self.newest, user=voter, vote=1)
+        PostVote.objects.create(post=self.newest, user=self.voters[2], vote=-1)
+
+        post = Post.objects.get(pk=self.newest.pk)
+        self.assertAlmostEqual(post.hot_rank, hot_rank(1, post.created_at), places=6)
+        self.assertEqual(post.rising_rank, 0)
+
+        Post.refresh_ranks([post.pk])
+        self.assertGreater(Post.objects.get(pk=post.pk).rising_rank, 0)
+
+    def test_vote_runs_one_update(self):
+        """Test a vote updates the counters and the hot rank in one statement"""
+        with CaptureQueriesContext(connection) as queries:
+            Post.apply_vote_change(self.newest.pk, 0, 1)
+        self.assertEqual([q['sql'].split()[0] for q in queries], ['UPDATE'])
+
+    def test_rising_follows_recent_votes(self):
+        """Test rising counts the votes of the velocity window, not the whole life"""
+        PostVote.objects.filter(post=self.fresh).update(
+            updated_at=timezone.now() - timedelta(hours=5)
+        )
+        Post.refresh_ranks([self.fresh.pk])
+        self.assertEqual(Post.objects.get(pk=self.fresh.pk).rising_rank, 0)
+
+        PostVote.objects.create(post=self.fresh, user=self.voters[2], vote=1)
+        Post.refresh_ranks([self.fresh.pk])
+        self.assertEqual(Post.objects.get(pk=self.fresh.pk).rising_rank, 0.5)
+
+    def test_refresh_command_expires_rising(self):
+        """Test the periodic refresh drops posts out of the rising window"""
+        Post.objects.filter(pk=self.fresh.pk).update(
+            created_at=timezone.now() - timedelta(days=2)
+        )
+        call_command('refresh_post_ranks', stdout=StringIO())
+
+        self.assertEqual(Post.objects.get(pk=self.fresh.pk).rising_rank, 0)
+
+    def test_save_keeps_stored_counters(self):
+        """Test saving a stale instance does not overwrite the counters"""
+        post = Post.objects.get(pk=self.newest.pk)
+        PostVote.objects.create(post=self.newest, user=self.voters[0], vote=1)
+        post.title = 'Renamed'
+        post.save()
+
+        post.refresh_from_db()
+        self.assertEqual((post.title, post.score), ('Renamed', 1))
+
+
+class FeedExcerptTest(APITestCase):
+    """Test cases for the stored excerpt and the lightweight feed cards"""
+
+    def setUp(self):
+        """Set up test data"""
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='author',
+            email='author@example.com',
+            password='testpass123'
+        )
+        self.post = Post.objects.create(
+            title='Long Post',
+            content='<p>Fish &amp; chips</p><p>are ' + 'tasty ' * 500 + '</p>',
+            author=self.user
+        )
+
+    def test_text_stats_computed_on_save(self):
+        """Test saving a post stores a plain-text excerpt and its length"""
+        self.assertTrue(self.post.excerpt.startswith('Fish & chips are tasty'))
+        self.assertLessEqual(len(self.post.excerpt), 280)
+        self.assertTrue(self.post.excerpt.endswith('…'))
+        self.assertEqual(self.post.word_count, 504)
+        self.assertEqual(self.post.reading_time, 3)
+
+        self.post.content = '<h1>Short</h1>'
+        self.post.save(update_fields=['content'])
+        self.post.refresh_from_db()
+        self.assertEqual(
+            (self.post.excerpt, self.post.word_count, self.post.reading_time),
+            ('Short', 1, 1)
+        )
+
+    def test_list_defers_content(self):
+        """Test the feed sends the excerpt and never loads the content"""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/v1/posts/')
+
+        card = response.json()['results'][0]
+        self.assertNotIn('content', card)
+        self.assertEqual(card['excerpt'], self.post.excerpt)
+        self.assertEqual(card['reading_time'], 3)
+        self.assertFalse(any('"posts_post"."content"' in q['sql'] for q in queries))
+
+    def test_retrieve_sends_content(self):
+        """Test a single post still sends its full body"""
+        response = self.client.get(f'/api/v1/posts/{self.post.uuid}/')
+        self.assertEqual(response.json()['content'], self.post.content)
+
+
+class BulkViewerStateTest(APITestCase):
+    """Test cases for the bulk viewer state endpoint"""
+
+    url = '/api/v1/posts/viewer_state/'
+
+    def setUp(self):
+        """Set up test data"""
+        self.user = User.objects.create_user(
+            username='viewer',
+            email='viewer@example.com',
+            password='testpass123'
+        )
+        self.posts = [
+            Post.objects.create(title=f'Post {i}', content='Content', author=self.user)
+            for i in range(20)
+        ]
+        self.comments = [
+            PostComment.objects.create(_comment=f'Comment {i}', user=self.user, post=self.posts[0])
+            for i in range(20)
+        ]
+        PostVote.objects.create(post=self.posts[0], user=self.user, vote=-1)
+        PostBookmark.objects.create(post=self.posts[1], user=self.user)
+        vote_comment(self.comments[2], self.user, 1)
+        self.client.force_login(self.user)
+
+    def test_state_of_many_objects(self):
+        """Test votes and bookmarks come back for every requested object"""
+        data = {
+            'posts': [str(post.uuid) for post in self.posts],
+            'comments': [comment.pk for comment in self.comments] + [999999],
+        }
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(self.url, data, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        body = response.json()
+        self.assertEqual(len(body['posts']), 20)
+        self.assertEqual(body['posts'][str(self.posts[0].uuid)]['user_vote']['vote'], -1)
+        self.assertIsNone(body['posts'][str(self.posts[0].uuid)]['user_bookmark'])
+        self.assertIsNotNone(body['posts'][str(self.posts[1].uuid)]['user_bookmark'])
+        self.assertEqual(len(body['comments']), 20)
+        self.assertEqual(body['comments'][str(self.comments[2].pk)], {'vote': 1})
+        self.assertEqual(body['comments'][str(self.comments[3].pk)], {'vote': 0})
+
+        state_queries = [
+            q for q in queries
+            if any(table in q['sql'] for table in ('posts_post', 'bookmarks_', 'comments_'))
+        ]
+        self.assertEqual(len(state_queries), 5)
+
+    def test_limits(self):
+        """Test requests over the item limit are rejected"""
+        response = self.client.post(self.url, {'comments': list(range(1, 302))}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_requires_authentication(self):
+        """Test anonymous callers are refused"""
+        self.client.logout()
+        response = self.client.post(self.url, {'posts': []}, format='json')
+        self.assertIn(response.status_code, (status.HTTP_401_UNAUTHORIZED, status.HTTP_403_FORBIDDEN))
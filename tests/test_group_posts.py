@@ -0,0 +1,117 @@
+"""
+Test cases for the group post listing
+"""
+from django.core.cache import cache
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+from rest_framework import status
+
+from groups.models import Group
+from posts.models import Post
+from posts.services import vote_post
+
+
+class GroupPostsTest(APITestCase):
+    """Test cases for GroupViewSet.posts"""
+
+    def setUp(self):
+        """Set up test data"""
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='author',
+            email='author@example.com',
+            password='testpass123'
+        )
+        self.group = Group.objects.create(name='Test Group')
+        self.other = Group.objects.create(name='Other Group')
+        self.posts = [
+            Post.objects.create(
+                title=f'Post {i}', content='Content', author=self.user, group=self.group
+            )
+            for i in range(30)
+        ]
+        Post.objects.create(title='Elsewhere', content='Content', author=self.user, group=self.other)
+        Post.objects.create(
+            title='Draft', content='Content', author=self.user,
+            group=self.group, status=Post.STATUS.DRAFT
+        )
+        self.url = f'/api/v1/groups/{self.group.pk}/posts/'
+
+    def get(self, url=None, **params):
+        response = self.client.get(url or self.url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response
+
+    def test_pages_follow_each_other(self):
+        """Test the listing is paged with a cursor and leaves out drafts"""
+        first = self.get().json()
+        self.assertEqual(len(first['results']), 24)
+        second = self.get(first['next']).json()
+        self.assertIsNone(second['next'])
+
+        titles = [post['title'] for post in first['results'] + second['results']]
+        self.assertEqual(titles, [f'Post {i}' for i in reversed(range(30))])
+
+    def test_sorts(self):
+        """Test the feed sorts apply to group posts"""
+        vote_post(self.posts[3], self.user, 1)
+        response = self.get(sort='top')
+        self.assertEqual(response.json()['results'][0]['title'], 'Post 3')
+
+        response = self.client.get(self.url, {'sort': 'bogus'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_query_count_is_flat(self):
+        """Test a page costs the same queries however many posts the group has"""
+        # The group, the page and the tags of its posts
+        with self.assertNumQueries(3):
+            self.get(sort='hot')
+        cache.clear()
+        Post.objects.bulk_create([
+            Post(title='Bulk', content='Content', author=self.user, group=self.group)
+            for i in range(50)
+        ])
+        with self.assertNumQueries(3):
+            self.get(sort='hot')
+
+    def test_cards_leave_out_content(self):
+        """Test posts are listed as feed cards with the excerpt, as in the feed"""
+        with CaptureQueriesContext(connection) as queries:
+            post = self.get().json()['results'][0]
+        self.assertEqual(post['excerpt'], 'Content')
+        self.assertNotIn('content', post)
+        self.assertNotIn('content_html', post)
+        page_query = [query['sql'] for query in queries if 'FROM "posts_post"' in query['sql']][0]
+        self.assertNotIn('"posts_post"."content"', page_query)
+
+    def test_viewer_state_loaded_per_page(self):
+        """Test the viewer's votes and bookmarks are read once per page"""
+        vote_post(self.posts[-1], self.user, 1)
+        self.client.force_authenticate(user=self.user)
+        # The group, the page, its tags, the viewer's votes and bookmarks
+        with self.assertNumQueries(5):
+            post = self.get().json()['results'][0]
+        self.assertEqual(post['user_vote']['vote'], 1)
+
+    def test_cached_per_group(self):
+        """Test pages are cached and invalidated by their own group only"""
+        self.get()
+        self.assertEqual(self.get()['X-Cache'], 'HIT')
+
+        Post.objects.create(title='Elsewhere 2', content='Content', author=self.user, group=self.other)
+        self.assertEqual(self.get()['X-Cache'], 'HIT')
+
+        Post.objects.create(title='Fresh', content='Content', author=self.user, group=self.group)
+        response = self.get()
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.json()['results'][0]['title'], 'Fresh')
+
+    def test_vote_invalidates_page(self):
+        """Test a vote on a shown post invalidates the page"""
+        self.get()
+        vote_post(self.posts[-1], self.user, 1)
+        response = self.get()
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.json()['results'][0]['votes'], 1)
@@ -0,0 +1,120 @@
+"""
+Test cases for the stored, sanitized post and comment HTML
+"""
+from io import StringIO
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase
+from rest_framework.test import APITestCase
+from rest_framework import status
+
+from comments.models import PostComment
+from core import html
+from core.html import HTML_VERSION, content_hash, render_text, sanitize_html
+from posts.models import Post
+
+
+class SanitizeHtmlTest(SimpleTestCase):
+    """Test cases for the sanitizer rules"""
+
+    def test_keeps_allowed_markup(self):
+        """Test allowed tags and attributes are kept as written"""
+        source = '<p>Hello <strong>world</strong><br><img src="/a.png" alt="A"></p>'
+        self.assertEqual(sanitize_html(source), source)
+
+    def test_drops_scripts_and_handlers(self):
+        """Test script content, unknown tags and event handlers are dropped"""
+        self.assertEqual(
+            sanitize_html('<p onclick="x()">Hi<script>alert(1)</script></p><div>there</div>'),
+            '<p>Hi</p>there'
+        )
+
+    def test_drops_unsafe_urls(self):
+        """Test javascript: links lose their href and links get rel"""
+        self.assertEqual(
+            sanitize_html('<a href="java\tscript:alert(1)">x</a><a href="https://e.com">y</a>'),
+            '<a rel="nofollow noopener">x</a>'
+            '<a href="https://e.com" rel="nofollow noopener">y</a>'
+        )
+
+    def test_escapes_text_and_closes_tags(self):
+        """Test text is escaped and tags left open are closed"""
+        self.assertEqual(sanitize_html('<ul><li>1 &lt; 2 & <b>3'), '<ul><li>1 &lt; 2 &amp; <b>3</b></li></ul>')
+
+    def test_render_text(self):
+        """Test comment text is escaped into paragraphs"""
+        self.assertEqual(render_text('a <b>\n\nc'), '<p>a &lt;b&gt;</p>\n\n<p>c</p>')
+
+
+class StoredHtmlTest(APITestCase):
+    """Test cases for rendering on write and serving the stored HTML"""
+
+    def setUp(self):
+        """Set up test data"""
+        cache.clear()
+        self.user = User.objects.create_user(username='author', password='testpass123')
+        self.post = Post.objects.create(
+            title='Post', content='<p>Hi<script>x</script></p>', author=self.user
+        )
+        self.comment = PostComment.objects.create(
+            post=self.post, user=self.user, _comment='Hello <there>'
+        )
+
+    def test_rendered_on_save(self):
+        """Test posts and comments store their HTML, hash and version"""
+        self.assertEqual(self.post.content_html, '<p>Hi</p>')
+        self.assertEqual(self.post.content_hash, content_hash(self.post.content))
+        self.assertEqual(self.post.html_version, HTML_VERSION)
+        self.assertEqual(self.comment.comment_html, '<p>Hello &lt;there&gt;</p>')
+
+        self.post.content = '<p>Edited</p>'
+        self.post.save(update_fields=['content'])
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.content_html, '<p>Edited</p>')
+
+    def test_unchanged_content_is_not_rendered(self):
+        """Test saving the same content skips the sanitizer"""
+        post = Post.objects.get(pk=self.post.pk)
+        with mock.patch('posts.models.sanitize_html') as sanitize:
+            post.title = 'Renamed'
+            post.save()
+        sanitize.assert_not_called()
+
+    def test_serializers_read_stored_html(self):
+        """Test the API serves the stored HTML without rendering it"""
+        with mock.patch('posts.models.sanitize_html') as sanitize:
+            response = self.client.get(f'/api/v1/posts/{self.post.uuid}/')
+            comments = self.client.get(f'/api/v1/posts/{self.post.uuid}/comments/')
+        sanitize.assert_not_called()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['content_html'], '<p>Hi</p>')
+        self.assertEqual(comments.data['results'][0]['comment_html'], '<p>Hello &lt;there&gt;</p>')
+
+        response = self.client.get('/api/v1/posts/')
+        self.assertNotIn('content_html', response.data['results'][0])
+
+    def test_removed_comment_html(self):
+        """Test removed comments show the removal message"""
+        self.comment.is_removed = True
+        self.comment.save()
+        self.assertEqual(self.comment._get_comment_html(), '<p>This comment has been removed</p>')
+
+    def test_render_html_command(self):
+        """Test the command re-renders only rows of older versions"""
+        Post.objects.filter(pk=self.post.pk).update(content_html='', html_version=0)
+        out = StringIO()
+        with mock.patch.object(html, 'HTML_VERSION', HTML_VERSION + 1), \
+                mock.patch('core.management.commands.render_html.HTML_VERSION', HTML_VERSION + 1):
+            call_command('render_html', stdout=out)
+        self.assertIn('Rendered 1 posts', out.getvalue())
+        self.assertIn('Rendered 1 comments', out.getvalue())
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.content_html, '<p>Hi</p>')
+        self.assertEqual(self.post.html_version, HTML_VERSION + 1)
+
+        out = StringIO()
+        call_command('render_html', stdout=out)
+        self.assertIn('Rendered 0 posts', out.getvalue())
@@ -0,0 +1,113 @@
+"""
+Test cases for cursor (keyset) pagination
+"""
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+from rest_framework import status
+from posts.models import Post, PostVote
+from comments.models import PostComment
+from groups.models import Group, GroupMember
+
+
+class KeysetPaginationTest(APITestCase):
+    """Test cases for cursor pagination of posts, comments and members"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+        self.posts = [
+            Post.objects.create(title=f'Post {i}', content='Test content', author=self.user)
+            for i in range(30)
+        ]
+
+    def walk(self, url, params=None):
+        """Follows the next links and returns every page"""
+        pages = []
+        response = self.client.get(url, params)
+        while True:
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertNotIn('count', response.data)
+            pages.append(response.data)
+            if response.data['next'] is None:
+                return pages
+            response = self.client.get(response.data['next'])
+
+    def test_post_cursor_pages(self):
+        """Test cursor pages cover the feed once, in order"""
+        pages = self.walk('/api/v1/posts/', {'pagination': 'cursor'})
+
+        self.assertEqual([len(page['results']) for page in pages], [12, 12, 6])
+        uuids = [post['uuid'] for page in pages for post in page['results']]
+        expected = [str(post.uuid) for post in reversed(self.posts)]
+        self.assertEqual(uuids, expected)
+
+    def test_previous_link(self):
+        """Test the previous link returns the preceding page"""
+        first = self.client.get('/api/v1/posts/', {'pagination': 'cursor'}).data
+        self.assertIsNone(first['previous'])
+        second = self.client.get(first['next']).data
+        back = self.client.get(second['previous']).data
+
+        self.assertEqual(back['results'], first['results'])
+        self.assertIsNone(back['previous'])
+
+    def test_cursor_on_ranking_sort(self):
+        """Test the cursor follows a ranking sort with ties"""
+        voter = User.objects.create_user(username='voter', password='testpass123')
+        PostVote.objects.create(post=self.posts[3], user=voter, vote=1)
+        pages = self.walk('/api/v1/posts/', {'pagination': 'cursor', 'sort': 'top'})
+
+        uuids = [post['uuid'] for page in pages for post in page['results']]
+        self.assertEqual(len(set(uuids)), 30)
+        self.assertEqual(uuids[0], str(self.posts[3].uuid))
+
+    def test_page_cost_is_flat(self):
+        """Test a deep page runs the same queries as the first one"""
+        first = self.client.get('/api/v1/posts/', {'pagination': 'cursor'}).data
+        cache.clear()
+        with CaptureQueriesContext(connection) as first_queries:
+            self.client.get('/api/v1/posts/', {'pagination': 'cursor'})
+        with CaptureQueriesContext(connection) as deep_queries:
+            self.client.get(first['next'])
+
+        self.assertEqual(len(first_queries), len(deep_queries))
+        self.assertFalse(any('__count' in query['sql'] for query in deep_queries))
+
+    def test_invalid_cursor(self):
+        """Test a malformed cursor is a 404"""
+        response = self.client.get('/api/v1/posts/', {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_comment_cursor_pages(self):
+        """Test comments paginate with cursors"""
+        post = self.posts[0]
+        for i in range(30):
+            PostComment.objects.create(_comment=f'Comment {i}', user=self.user, post=post)
+        pages = self.walk(f'/api/v1/posts/{post.uuid}/comments/', {'pagination': 'cursor'})
+
+        comments = [comment['comment'] for page in pages for comment in page['results']]
+        self.assertEqual(comments, [f'Comment {i}' for i in range(30)])
+
+    def test_member_cursor_pages(self):
+        """Test group members paginate with cursors"""
+        group = Group.objects.create(name='Test Group')
+        members = [
+            User.objects.create_user(username=f'member{i}', password='testpass123')
+            for i in range(30)
+        ]
+        GroupMember.objects.bulk_create([
+            GroupMember(group=group, user=member) for member in members
+        ])
+        self.client.force_authenticate(user=self.user)
+        pages = self.walk(f'/api/v1/groups/{group.pk}/members/', {'pagination': 'cursor'})
+
+        ids = [member['id'] for page in pages for member in page['results']]
+        self.assertEqual(len(ids), 30)
+        self.assertEqual(len(set(ids)), 30)
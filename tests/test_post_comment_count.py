@@ -0,0 +1,92 @@
+"""
+Test cases for the stored post comment count
+"""
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+
+from bookmarks.models import PostBookmark
+from comments.models import PostComment
+from groups.models import Group
+from posts.models import Post
+
+
+class PostCommentCountTest(APITestCase):
+    """Test cases for Post.comment_count"""
+
+    def setUp(self):
+        """Set up test data"""
+        cache.clear()
+        self.user = User.objects.create_user(username='author', password='testpass123')
+        self.group = Group.objects.create(name='Group')
+        self.post = Post.objects.create(
+            title='Post', content='Content', author=self.user, group=self.group
+        )
+        self.comment = self.create_comment('First')
+
+    def create_comment(self, text, **kwargs):
+        return PostComment.objects.create(
+            post=self.post, user=self.user, _comment=text, **kwargs
+        )
+
+    def comment_count(self):
+        return Post.objects.get(pk=self.post.pk).comment_count
+
+    def test_kept_on_writes(self):
+        """Test creating, removing, restoring and deleting comments"""
+        reply = self.create_comment('Reply', parent=self.comment)
+        self.create_comment('Removed', is_removed=True)
+        self.assertEqual(self.comment_count(), 2)
+
+        reply = PostComment.objects.get(pk=reply.pk)
+        reply.is_removed = True
+        reply.save()
+        self.assertEqual(self.comment_count(), 1)
+        reply.is_removed = False
+        reply.save()
+        self.assertEqual(self.comment_count(), 2)
+
+        PostComment.objects.get(pk=self.comment.pk).delete()
+        self.assertEqual(self.comment_count(), 0)
+
+    def test_post_save_keeps_count(self):
+        """Test saving a loaded post does not write back its comment count"""
+        post = Post.objects.get(pk=self.post.pk)
+        self.create_comment('Second')
+        post.title = 'Edited'
+        post.save()
+        self.assertEqual(self.comment_count(), 2)
+
+    def test_recount(self):
+        """Test recount_counters rebuilds the comment counts"""
+        Post.objects.update(comment_count=7)
+        call_command('recount_counters', stdout=StringIO())
+        self.assertEqual(self.comment_count(), 1)
+
+    def test_recount_picked_families(self):
+        """Test recount_counters only recounts the families it is given"""
+        Post.objects.update(comment_count=7)
+        call_command('recount_counters', '--tag-posts', '--post-votes', stdout=StringIO())
+        self.assertEqual(self.comment_count(), 7)
+        call_command('recount_counters', '--post-comments', stdout=StringIO())
+        self.assertEqual(self.comment_count(), 1)
+
+    def test_listings_read_stored_count(self):
+        """Test feed, group and bookmark listings do not query comments"""
+        PostBookmark.objects.create(post=self.post, user=self.user)
+        self.client.force_authenticate(user=self.user)
+        for url in ('/api/v1/posts/', f'/api/v1/groups/{self.group.pk}/posts/',
+                    f'/api/v1/users/{self.user.username}/bookmarks/'):
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200, url)
+            self.assertFalse(
+                [query for query in queries if 'comments_postcomment' in query['sql']], url
+            )
+        response = self.client.get(f'/api/v1/users/{self.user.username}/bookmarks/')
+        self.assertEqual(response.data[0]['post']['comments'], 1)
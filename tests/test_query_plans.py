@@ -0,0 +1,116 @@
+"""
+Test cases for the query plans of the hot endpoints
+
+Every SELECT an endpoint runs is replayed through EXPLAIN QUERY PLAN, and
+the test fails when SQLite would read a table from end to end instead of
+going through an index, or when a paged listing would sort its rows in a
+temporary b-tree instead of reading them in index order.
+"""
+import re
+import unittest
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+from rest_framework import status
+
+from bookmarks.models import PostBookmark
+from comments.models import PostComment
+from groups.models import Group, GroupMember, MemberRequest
+from posts.models import Post
+
+# "SCAN <table>" alone is a full table scan, while index scans read
+# "SCAN <table> USING [COVERING] INDEX <name>".
+FULL_SCAN = re.compile(r'^SCAN (\w+)$')
+TEMP_SORT = 'USE TEMP B-TREE FOR ORDER BY'
+
+
+@unittest.skipUnless(connection.vendor == 'sqlite', 'EXPLAIN QUERY PLAN is SQLite syntax')
+class QueryPlanTest(APITestCase):
+    """Test cases for the endpoints' queries being served by indexes"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.user = User.objects.create_user(username='author', password='testpass123')
+        self.other = User.objects.create_user(username='member', password='testpass123')
+        self.group = Group.objects.create(name='Group')
+        GroupMember.objects.bulk_create([GroupMember(group=self.group, user=self.user)])
+        MemberRequest.objects.bulk_create([MemberRequest(group=self.group, user=self.other)])
+        self.post = Post.objects.create(
+            title='Post', content='Content', author=self.user, group=self.group
+        )
+        Post.objects.create(
+            title='Draft', content='Content', author=self.user, status=Post.STATUS.DRAFT
+        )
+        self.comment = PostComment.objects.create(
+            post=self.post, user=self.user, _comment='Comment'
+        )
+        PostComment.objects.create(
+            post=self.post, user=self.other, parent=self.comment, _comment='Reply'
+        )
+        PostBookmark.objects.create(post=self.post, user=self.user)
+
+    def explain(self, sql):
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+            return [row[-1] for row in cursor.fetchall()]
+
+    def assertIndexedPlans(self, url, ordered=False):
+        """
+        Requests ``url`` and checks the plan of every SELECT it ran. With
+        ``ordered``, the rows must also come out of an index in order.
+        """
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK, url)
+        selects = [query['sql'] for query in queries if query['sql'].startswith('SELECT')]
+        self.assertTrue(selects, url)
+        for sql in selects:
+            plan = self.explain(sql)
+            scans = [line for line in plan if FULL_SCAN.match(line)]
+            self.assertFalse(scans, f'{url} scans a whole table:\n{sql}\n{plan}')
+            if ordered:
+                self.assertNotIn(TEMP_SORT, plan, f'{url} sorts outside an index:\n{sql}')
+
+    def test_feed(self):
+        """Test every feed sort reads the published posts from its index"""
+        for sort in ('new', 'hot', 'top', 'rising'):
+            self.assertIndexedPlans(f'/api/v1/posts/?sort={sort}', ordered=True)
+
+    def test_feed_skips_drafts_by_partial_index(self):
+        """Test the newest posts are read from the index without drafts"""
+        plan = Post.objects.exclude(status=Post.STATUS.DRAFT)\
+            .order_by('-created_at', '-id')[:10].explain()
+        self.assertIn('posts_post_new_idx', plan)
+        self.assertNotIn(TEMP_SORT, plan)
+
+    def test_posts(self):
+        """Test post details and the viewer's votes and bookmarks"""
+        self.client.force_authenticate(user=self.user)
+        self.assertIndexedPlans(f'/api/v1/posts/{self.post.uuid}/')
+        self.assertIndexedPlans('/api/v1/posts/', ordered=True)
+        self.assertIndexedPlans('/api/v1/posts/home/')
+
+    def test_groups(self):
+        """Test group details, members, requests and posts"""
+        self.client.force_authenticate(user=self.other)
+        self.assertIndexedPlans(f'/api/v1/groups/{self.group.pk}/')
+        self.assertIndexedPlans(f'/api/v1/groups/{self.group.pk}/members/')
+        for sort in ('new', 'hot', 'top', 'rising'):
+            self.assertIndexedPlans(
+                f'/api/v1/groups/{self.group.pk}/posts/?sort={sort}', ordered=True
+            )
+
+    def test_comments(self):
+        """Test comment listings in every sort, replies and the thread"""
+        url = f'/api/v1/posts/{self.post.uuid}/comments/'
+        for sort in ('best', 'top', 'new', 'old', 'controversial'):
+            self.assertIndexedPlans(f'{url}?sort={sort}', ordered=True)
+        self.assertIndexedPlans(f'{url}{self.comment.pk}/children/')
+        self.assertIndexedPlans(f'{url}thread/')
+
+    def test_bookmarks(self):
+        """Test the bookmarks of a user are read newest first from an index"""
+        self.client.force_authenticate(user=self.user)
+        self.assertIndexedPlans(f'/api/v1/users/{self.user.username}/bookmarks/', ordered=True)
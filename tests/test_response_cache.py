@@ -0,0 +1,132 @@
+"""
+Test cases for the anonymous post response cache
+"""
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.contrib.auth.models import User
+
+from comments.models import PostComment
+from posts.cache import post_cache, post_scope
+from posts.models import Post, PostVote
+from posts.services import vote_post
+from posts.views import PostViewSet
+
+
+class PostResponseCacheTest(TestCase):
+    """Test cases for caching PostViewSet list and retrieve responses"""
+
+    def setUp(self):
+        """Set up test data"""
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='author',
+            email='author@example.com',
+            password='testpass123'
+        )
+        self.posts = [
+            Post.objects.create(title=f'Post {i}', content='Content', author=self.user)
+            for i in range(3)
+        ]
+
+    def get(self, url, **params):
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_list_is_cached(self):
+        """Test a repeated anonymous listing is served without queries"""
+        first = self.get('/api/v1/posts/')
+        self.assertEqual(first['X-Cache'], 'MISS')
+
+        with self.assertNumQueries(0):
+            second = self.get('/api/v1/posts/')
+        self.assertEqual(second['X-Cache'], 'HIT')
+        self.assertEqual(first.json(), second.json())
+
+    def test_key_includes_query_parameters(self):
+        """Test pages and sorts are cached separately"""
+        self.get('/api/v1/posts/', sort='new')
+        self.assertEqual(self.get('/api/v1/posts/', sort='top')['X-Cache'], 'MISS')
+        self.assertEqual(self.get('/api/v1/posts/', sort='new')['X-Cache'], 'HIT')
+        self.assertEqual(self.get('/api/v1/posts/', sort='new', page=1)['X-Cache'], 'MISS')
+
+    def test_authenticated_requests_bypass_cache(self):
+        """Test responses carrying viewer state are never cached"""
+        self.client.force_login(self.user)
+        self.get('/api/v1/posts/')
+        response = self.get('/api/v1/posts/')
+        self.assertFalse(response.has_header('X-Cache'))
+
+    def test_new_post_invalidates_list(self):
+        """Test adding a post invalidates the listings"""
+        self.get('/api/v1/posts/')
+        Post.objects.create(title='Fresh', content='Content', author=self.user)
+
+        response = self.get('/api/v1/posts/')
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.json()['results'][0]['title'], 'Fresh')
+
+    def test_vote_invalidates_post_only(self):
+        """Test a vote invalidates the responses showing the voted post only"""
+        voted, other = self.posts[0], self.posts[1]
+        self.get(f'/api/v1/posts/{voted.uuid}/')
+        self.get(f'/api/v1/posts/{other.uuid}/')
+        self.get('/api/v1/posts/')
+
+        vote_post(voted, self.user, 1)
+
+        response = self.get(f'/api/v1/posts/{voted.uuid}/')
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.json()['votes'], 1)
+        self.assertEqual(self.get(f'/api/v1/posts/{other.uuid}/')['X-Cache'], 'HIT')
+        self.assertEqual(self.get('/api/v1/posts/')['X-Cache'], 'MISS')
+
+    def test_vote_and_comment_signals_invalidate(self):
+        """Test post_save/post_delete of votes and comments invalidate the post"""
+        post = self.posts[0]
+        url = f'/api/v1/posts/{post.uuid}/'
+        self.get(url)
+
+        vote = PostVote.objects.create(post=post, user=self.user, vote=1)
+        self.assertEqual(self.get(url)['X-Cache'], 'MISS')
+        vote.delete()
+        self.assertEqual(self.get(url).json()['votes'], 0)
+
+        PostComment.objects.create(post=post, user=self.user, _comment='Hi')
+        response = self.get(url)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.json()['comments'], 1)
+
+    def test_change_while_serializing_is_not_stored(self):
+        """Test a post changed while its page is serialized is not cached stale"""
+        build_context = PostViewSet.get_page_serializer_context
+
+        def change_during_build(view, page, context=None):
+            context = build_context(view, page, context)
+            post_cache.invalidate(post_scope(page[0].pk))
+            return context
+
+        with mock.patch.object(PostViewSet, 'get_page_serializer_context', change_during_build):
+            self.get('/api/v1/posts/')
+        self.assertEqual(self.get('/api/v1/posts/')['X-Cache'], 'MISS')
+        self.assertEqual(self.get('/api/v1/posts/')['X-Cache'], 'HIT')
+
+    def test_hit_and_miss_counters(self):
+        """Test the cache counts hits and misses"""
+        before = post_cache.stats()
+        self.get('/api/v1/posts/')
+        self.get('/api/v1/posts/')
+        self.get('/api/v1/posts/')
+        after = post_cache.stats()
+
+        self.assertEqual(after['hits'] - before['hits'], 2)
+        self.assertEqual(after['misses'] - before['misses'], 1)
+
+    def test_errors_are_not_cached(self):
+        """Test error responses are rebuilt every time"""
+        self.client.get('/api/v1/posts/', {'sort': 'bogus'})
+        response = self.client.get('/api/v1/posts/', {'sort': 'bogus'})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response['X-Cache'], 'MISS')
@@ -0,0 +1,150 @@
+"""
+Test cases for the full-text search endpoint
+"""
+from io import StringIO
+from unittest import mock
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from rest_framework.test import APITestCase
+from rest_framework import status
+from posts.models import Post
+from comments.models import PostComment
+from search.backends import NullSearchBackend, get_backend
+
+
+class SearchAPITest(APITestCase):
+    """Test cases for /api/v1/search/"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+        self.django_post = Post.objects.create(
+            title='Deploying Django apps',
+            content='<p>Notes about <b>gunicorn</b> and whitenoise</p>',
+            author=self.user
+        )
+        self.other_post = Post.objects.create(
+            title='Cooking pasta',
+            content='<p>Boil water, mention django once</p>',
+            author=self.user
+        )
+        self.comment = PostComment.objects.create(
+            _comment='Gunicorn workers need tuning',
+            user=self.user,
+            post=self.other_post
+        )
+
+    def search(self, **params):
+        response = self.client.get('/api/v1/search/', params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def test_ranked_results(self):
+        """Test title matches rank above body matches"""
+        results = self.search(q='django')['results']
+
+        self.assertEqual(
+            [result['post']['uuid'] for result in results],
+            [str(self.django_post.uuid), str(self.other_post.uuid)]
+        )
+
+    def test_posts_and_comments(self):
+        """Test both kinds are searched and can be filtered"""
+        results = self.search(q='gunicorn')['results']
+        self.assertEqual(sorted(result['type'] for result in results), ['comment', 'post'])
+
+        results = self.search(q='gunicorn', type='comment')['results']
+        self.assertEqual(len(results), 1)
+        self.assertEqual(results[0]['comment']['post'], self.other_post.uuid)
+
+    def test_markup_and_syntax_are_ignored(self):
+        """Test HTML tags are not indexed and query syntax is neutralized"""
+        self.assertEqual(self.search(q='b')['results'], [])
+        self.assertEqual(len(self.search(q='"gunicorn" ^(')['results']), 2)
+
+    def test_entities_are_unescaped(self):
+        """Test HTML entities are indexed as the characters they stand for"""
+        post = Post.objects.create(
+            title='Menu', content='<p>Caf&eacute; salt &amp; pepper</p>', author=self.user
+        )
+        results = self.search(q='café')['results']
+        self.assertEqual([result['post']['uuid'] for result in results], [str(post.uuid)])
+        self.assertEqual(self.search(q='amp')['results'], [])
+
+    def test_index_follows_updates(self):
+        """Test saves, drafts, removals and deletes update the index"""
+        self.django_post.title = 'Deploying Flask apps'
+        self.django_post.save()
+        self.assertEqual(len(self.search(q='flask')['results']), 1)
+
+        self.django_post.status = Post.STATUS.DRAFT
+        self.django_post.save()
+        self.assertEqual(self.search(q='flask')['results'], [])
+
+        self.comment.is_removed = True
+        self.comment.save()
+        self.assertEqual(self.search(q='workers')['results'], [])
+
+        self.other_post.delete()
+        self.assertEqual(self.search(q='pasta')['results'], [])
+
+    def test_comments_of_drafts_are_hidden(self):
+        """Test comments are searchable only while their post is published"""
+        self.other_post.status = Post.STATUS.DRAFT
+        self.other_post.save()
+        self.assertEqual(self.search(q='workers')['results'], [])
+
+        PostComment.objects.create(_comment='More workers', user=self.user, post=self.other_post)
+        call_command('rebuild_search_index', stdout=StringIO())
+        self.assertEqual(self.search(q='workers')['results'], [])
+
+        self.other_post.status = Post.STATUS.PUBLIC
+        self.other_post.save()
+        self.assertEqual(len(self.search(q='workers', type='comment')['results']), 2)
+
+    def test_pagination(self):
+        """Test results are paginated with next links"""
+        for i in range(25):
+            Post.objects.create(title=f'Paginated {i}', content='Body', author=self.user)
+        first = self.search(q='paginated')
+        self.assertEqual(len(first['results']), 20)
+        second = self.client.get(first['next']).data
+
+        self.assertEqual(len(second['results']), 5)
+        self.assertIsNone(second['next'])
+        self.assertIsNotNone(second['previous'])
+
+    def test_missing_query(self):
+        """Test the q parameter is required"""
+        response = self.client.get('/api/v1/search/')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_unsupported_database(self):
+        """Test other databases get a backend that indexes and finds nothing"""
+        backend = get_backend('mysql')
+        self.assertIsInstance(backend, NullSearchBackend)
+        backend.index('post', self.django_post.pk, 'Django', 'Body')
+        backend.remove('post', self.django_post.pk)
+        self.assertEqual(backend.search('django'), [])
+
+    def test_rebuild_command(self):
+        """Test the rebuild command restores a wiped index"""
+        with connection.cursor() as cursor:
+            cursor.execute('DELETE FROM search_index')
+        call_command('rebuild_search_index', stdout=StringIO())
+
+        self.assertEqual(len(self.search(q='gunicorn')['results']), 2)
+
+    def test_failed_rebuild_keeps_index(self):
+        """Test a rebuild failing halfway leaves the previous index"""
+        with mock.patch('core.management.commands.rebuild_search_index.index_comment',
+                        side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                call_command('rebuild_search_index', stdout=StringIO())
+
+        self.assertEqual(len(self.search(q='gunicorn')['results']), 2)
@@ -0,0 +1,91 @@
+"""
+Test cases for sparse fieldsets (?fields= / ?omit=)
+"""
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.contrib.auth.models import User
+from rest_framework.test import APIRequestFactory, APITestCase
+
+from comments.models import PostComment
+from posts.models import Post
+from posts.serializers import PostSerializer
+from posts.views import PostViewSet
+
+
+class UnpaginatedPostViewSet(PostViewSet):
+    pagination_class = None
+    response_cache = None
+
+
+class SparseFieldsTest(APITestCase):
+    """Test cases for the dynamic fields serializers"""
+
+    def setUp(self):
+        """Set up test data"""
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='author',
+            email='author@example.com',
+            password='testpass123'
+        )
+        self.post = Post.objects.create(
+            title='Test Post',
+            content='Test content',
+            author=self.user
+        )
+        PostComment.objects.create(post=self.post, user=self.user, _comment='Comment')
+
+    def test_fields_limit_output_and_columns(self):
+        """Test ?fields= limits the output, the columns and the queries"""
+        self.client.force_login(self.user)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/v1/posts/', {'fields': 'title,uuid,votes,author'})
+
+        post = response.json()['results'][0]
+        self.assertEqual(set(post), {'title', 'uuid', 'votes', 'author'})
+        self.assertEqual(post['author']['username'], 'author')
+        sql = [query['sql'] for query in queries]
+        page_query = next(q for q in sql if 'FROM "posts_post"' in q and 'LIMIT' in q)
+        self.assertNotIn('"posts_post"."content"', page_query)
+        self.assertFalse(any('comments_postcomment' in q for q in sql))
+        self.assertFalse(any('posts_postvote' in q for q in sql))
+        self.assertFalse(any('tags_tag' in q for q in sql))
+
+    def test_omit(self):
+        """Test ?omit= drops fields and skips their method fields"""
+        response = self.client.get('/api/v1/posts/', {'omit': 'content,tags,comments'})
+        post = response.json()['results'][0]
+        self.assertNotIn('content', post)
+        self.assertNotIn('comments', post)
+        self.assertIn('title', post)
+
+    def test_method_fields_still_work(self):
+        """Test kept method fields keep their values"""
+        response = self.client.get('/api/v1/posts/', {'fields': 'uuid,comments'})
+        self.assertEqual(response.json()['results'][0], {
+            'uuid': str(self.post.uuid), 'comments': 1
+        })
+
+    def test_retrieve_and_comments(self):
+        """Test single posts and comment listings honor ?fields="""
+        response = self.client.get(f'/api/v1/posts/{self.post.uuid}/', {'fields': 'title'})
+        self.assertEqual(response.json(), {'title': 'Test Post'})
+
+        response = self.client.get(
+            f'/api/v1/posts/{self.post.uuid}/comments/', {'fields': 'id,comment'}
+        )
+        self.assertEqual(set(response.json()['results'][0]), {'id', 'comment'})
+
+    def test_serializer_keyword(self):
+        """Test the fields keyword overrides the request"""
+        serializer = PostSerializer(self.post, fields=['title', 'votes'])
+        self.assertEqual(serializer.data, {'title': 'Test Post', 'votes': 0})
+
+    def test_unpaginated_branch(self):
+        """Test paginated_response without a paginator serializes the queryset"""
+        view = UnpaginatedPostViewSet.as_view({'get': 'list'})
+        request = APIRequestFactory().get('/posts/', {'fields': 'title'})
+        response = view(request)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, [{'title': 'Test Post'}])
@@ -0,0 +1,128 @@
+"""
+Test cases for tag filtering and stored tag post counts
+"""
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.contrib.auth.models import User
+from rest_framework.test import APITestCase
+from rest_framework import status
+
+from posts.models import Post, PostTag
+from tags.models import Tag
+
+
+class TagFilterTest(APITestCase):
+    """Test cases for any-of and all-of tag filters"""
+
+    def setUp(self):
+        """Set up test data"""
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='author',
+            email='author@example.com',
+            password='testpass123'
+        )
+        self.python, self.django, self.rust = [
+            Tag.objects.create(name=name) for name in ('python', 'django', 'rust')
+        ]
+        self.both = Post.objects.create(title='Both', content='Content', author=self.user)
+        self.both.tags.add(self.python, self.django)
+        self.only_python = Post.objects.create(title='Python', content='Content', author=self.user)
+        self.only_python.tags.add(self.python)
+        self.untagged = Post.objects.create(title='None', content='Content', author=self.user)
+
+    def titles(self, **params):
+        response = self.client.get('/api/v1/posts/', params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return sorted(post['title'] for post in response.json()['results'])
+
+    def test_any_of(self):
+        """Test ?tags= keeps posts having any of the tags, once each"""
+        tags = f'{self.python.pk},{self.django.pk}'
+        self.assertEqual(self.titles(tags=tags), ['Both', 'Python'])
+        self.assertEqual(self.titles(tags=self.rust.pk), [])
+
+    def test_all_of(self):
+        """Test ?tags_all= keeps posts having every tag"""
+        self.assertEqual(self.titles(tags_all=f'{self.python.pk},{self.django.pk}'), ['Both'])
+        self.assertEqual(self.titles(tags_all=self.python.pk), ['Both', 'Python'])
+        self.assertEqual(self.titles(tags_all=f'{self.python.pk},{self.rust.pk}'), [])
+
+    def test_filter_uses_through_table_without_distinct(self):
+        """Test tag filters match post ids from the through table"""
+        with CaptureQueriesContext(connection) as queries:
+            self.titles(tags_all=f'{self.python.pk},{self.django.pk}')
+        sql = queries[0]['sql']
+        self.assertNotIn('DISTINCT', sql)
+        self.assertNotIn('JOIN', sql)
+        self.assertEqual(sql.count('FROM "posts_post_tags"'), 2)
+
+    def test_tagging_invalidates_cached_listing(self):
+        """Test tagging a post invalidates the cached filtered listing"""
+        self.assertEqual(self.titles(tags=self.rust.pk), [])
+        self.untagged.tags.add(self.rust)
+        self.assertEqual(self.titles(tags=self.rust.pk), ['None'])
+
+
+class TagPostCountTest(APITestCase):
+    """Test cases for the stored tag post counts"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.user = User.objects.create_user(username='author', password='testpass123')
+        self.tags = [Tag.objects.create(name=f'tag{i}') for i in range(3)]
+        self.posts = [
+            Post.objects.create(title=f'Post {i}', content='Content', author=self.user)
+            for i in range(3)
+        ]
+
+    def counts(self):
+        return list(
+            Tag.objects.order_by('pk').values_list('post_count', flat=True)
+        )
+
+    def test_counts_follow_tag_changes(self):
+        """Test adding, removing and clearing tags shift the counts"""
+        first, second, third = self.tags
+        self.posts[0].tags.add(first, second)
+        self.posts[1].tags.add(first)
+        second.posts.add(self.posts[1], self.posts[2])
+        self.posts[0].tags.add(first)
+        self.assertEqual(self.counts(), [2, 3, 0])
+
+        self.posts[0].tags.remove(second)
+        self.posts[1].tags.clear()
+        PostTag.objects.create(post=self.posts[2], tag=third)
+        self.assertEqual(self.counts(), [1, 1, 1])
+
+        self.posts[2].delete()
+        self.assertEqual(self.counts(), [1, 0, 0])
+
+    def test_recount(self):
+        """Test recount_counters rebuilds the counts from the through table"""
+        PostTag.objects.bulk_create([
+            PostTag(post=post, tag=self.tags[1]) for post in self.posts
+        ])
+        Tag.objects.filter(pk=self.tags[0].pk).update(post_count=7)
+        call_command('recount_counters', stdout=open('/dev/null', 'w'))
+        self.assertEqual(self.counts(), [0, 3, 0])
+
+    def test_popular_sort(self):
+        """Test tags are listed by their stored post counts"""
+        self.posts[0].tags.add(self.tags[2], self.tags[1])
+        self.posts[1].tags.add(self.tags[2])
+
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/v1/tags/', {'sort': 'popular'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [(tag['name'], tag['post_count']) for tag in response.json()],
+            [('tag2', 2), ('tag1', 1), ('tag0', 0)]
+        )
+
+    def test_unknown_sort(self):
+        """Test an unknown sort is rejected"""
+        response = self.client.get('/api/v1/tags/', {'sort': 'bogus'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,129 @@
+"""
+Test cases for the materialized home timeline
+"""
+from django.core.management import call_command
+from django.test import override_settings
+from django.contrib.auth.models import User
+from rest_framework.test import APITestCase
+from rest_framework import status
+
+from followers.models import UserFollower
+from groups.models import Group, GroupMember
+from posts.models import Post
+from timelines.models import PullSource, TimelineEntry
+
+
+class HomeTimelineTest(APITestCase):
+    """Test cases for fan-out on write and the home endpoint"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.reader = User.objects.create_user(username='reader', password='testpass123')
+        self.author = User.objects.create_user(username='author', password='testpass123')
+        self.stranger = User.objects.create_user(username='stranger', password='testpass123')
+        self.group = Group.objects.create(name='Test Group')
+        UserFollower.objects.create(follower=self.reader, followed_user=self.author)
+        GroupMember.objects.bulk_create([GroupMember(group=self.group, user=self.reader)])
+
+    def post(self, author, title, **kwargs):
+        return Post.objects.create(title=title, content='Content', author=author, **kwargs)
+
+    def titles(self, user=None, url='/api/v1/posts/home/'):
+        self.client.force_login(user or self.reader)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [post['title'] for post in response.json()['results']]
+
+    def test_followed_group_and_own_posts(self):
+        """Test the timeline holds followed, group and own posts, newest first"""
+        self.post(self.author, 'Followed')
+        self.post(self.stranger, 'Stranger')
+        self.post(self.stranger, 'In group', group=self.group)
+        self.post(self.reader, 'Own')
+        self.assertEqual(self.titles(), ['Own', 'In group', 'Followed'])
+        self.assertEqual(self.titles(self.stranger), ['In group', 'Stranger'])
+
+    def test_requires_authentication(self):
+        """Test anonymous users have no timeline"""
+        response = self.client.get('/api/v1/posts/home/')
+        self.assertIn(response.status_code, (status.HTTP_401_UNAUTHORIZED, status.HTTP_403_FORBIDDEN))
+
+    def test_drafts_are_pushed_when_published(self):
+        """Test drafts reach timelines once published"""
+        draft = self.post(self.author, 'Draft', status=Post.STATUS.DRAFT)
+        self.assertEqual(self.titles(), [])
+
+        draft = Post.objects.get(pk=draft.pk)
+        draft.status = Post.STATUS.PUBLIC
+        draft.save()
+        self.assertEqual(self.titles(), ['Draft'])
+
+    def test_cursor_pagination(self):
+        """Test pages follow each other without gaps or repeats"""
+        for i in range(30):
+            self.post(self.author, f'Post {i}')
+        self.client.force_login(self.reader)
+        first = self.client.get('/api/v1/posts/home/').json()
+        self.assertEqual(len(first['results']), 24)
+        self.assertIsNone(first['previous'])
+
+        second = self.client.get(first['next']).json()
+        titles = [post['title'] for post in first['results'] + second['results']]
+        self.assertEqual(titles, [f'Post {i}' for i in reversed(range(30))])
+        self.assertIsNone(second['next'])
+
+        previous = self.client.get(second['previous']).json()
+        self.assertEqual(previous['results'], first['results'])
+
+    def test_follow_and_unfollow(self):
+        """Test following backfills a timeline and unfollowing empties it"""
+        self.post(self.stranger, 'Earlier')
+        self.post(self.stranger, 'Shared', group=self.group)
+        follow = UserFollower.objects.create(follower=self.reader, followed_user=self.stranger)
+        self.assertEqual(self.titles(), ['Shared', 'Earlier'])
+
+        follow.delete()
+        self.assertEqual(self.titles(), ['Shared'])
+
+    def test_leave_group(self):
+        """Test leaving a group removes its posts but not followed ones"""
+        self.post(self.author, 'Followed', group=self.group)
+        self.post(self.stranger, 'Group only', group=self.group)
+        GroupMember.objects.filter(user=self.reader).delete()
+        self.assertEqual(self.titles(), ['Followed'])
+
+    @override_settings(TIMELINE={'FANOUT_LIMIT': 1})
+    def test_large_audiences_are_pulled(self):
+        """Test posts of large audiences are merged on read instead of pushed"""
+        UserFollower.objects.create(follower=self.stranger, followed_user=self.author)
+        self.post(self.reader, 'Pushed before')
+        pulled = self.post(self.author, 'Pulled')
+        self.post(self.reader, 'Pushed after')
+
+        self.assertTrue(PullSource.objects.filter(author=self.author).exists())
+        self.assertFalse(TimelineEntry.objects.filter(post=pulled).exclude(user=self.author).exists())
+        self.assertEqual(self.titles(), ['Pushed after', 'Pulled', 'Pushed before'])
+        self.assertEqual(self.titles(self.stranger), ['Pulled'])
+
+    @override_settings(TIMELINE={'MAX_ENTRIES': 3, 'TRIM_INTERVAL': 1})
+    def test_timelines_are_capped(self):
+        """Test a timeline keeps its newest entries only"""
+        for i in range(5):
+            self.post(self.author, f'Post {i}')
+        self.assertEqual(TimelineEntry.objects.filter(user=self.reader).count(), 3)
+        self.assertEqual(self.titles(), ['Post 4', 'Post 3', 'Post 2'])
+
+    def test_rebuild_command(self):
+        """Test timelines and pull sources are rebuilt from the follower tables"""
+        self.post(self.author, 'Followed')
+        self.post(self.stranger, 'In group', group=self.group)
+        TimelineEntry.objects.all().delete()
+
+        call_command('rebuild_timelines', stdout=open('/dev/null', 'w'))
+        self.assertEqual(self.titles(), ['In group', 'Followed'])
+
+        with override_settings(TIMELINE={'FANOUT_LIMIT': 0}):
+            call_command('rebuild_timelines', 'reader', stdout=open('/dev/null', 'w'))
+            self.assertEqual(TimelineEntry.objects.filter(user=self.reader).count(), 0)
+            self.assertEqual(PullSource.objects.count(), 2)
+            self.assertEqual(self.titles(), ['In group', 'Followed'])
@@ -0,0 +1,152 @@
+"""
+Test cases for the buffered post view counters
+"""
+import threading
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.contrib.auth.models import User
+
+from core.counters import close_view_counter, get_view_counter
+from posts.models import Post
+
+VIEW_COUNTER = {'ENABLED': True, 'BATCH_SIZE': 100, 'FLUSH_INTERVAL': 3600}
+
+
+@override_settings(VIEW_COUNTER=VIEW_COUNTER)
+class ViewCounterTest(TestCase):
+    """Test cases for counting post views"""
+
+    def setUp(self):
+        """Set up test data"""
+        cache.clear()
+        self.user = User.objects.create_user(username='author', password='testpass123')
+        self.posts = [
+            Post.objects.create(title=f'Post {i}', content='Content', author=self.user)
+            for i in range(3)
+        ]
+        self.counter = get_view_counter()
+
+    def tearDown(self):
+        close_view_counter()
+
+    def view(self, post, **headers):
+        return self.client.get(f'/api/v1/posts/{post.uuid}/', **headers)
+
+    def views(self):
+        return list(Post.objects.order_by('pk').values_list('views', flat=True))
+
+    def test_views_are_buffered(self):
+        """Test views are summed in memory and written on flush"""
+        for i in range(3):
+            self.view(self.posts[0])
+        self.view(self.posts[1])
+        self.assertEqual(self.views(), [0, 0, 0])
+        self.assertEqual(len(self.counter), 2)
+
+        self.assertEqual(self.counter.flush(), 2)
+        self.assertEqual(self.views(), [3, 1, 0])
+        self.assertEqual(len(self.counter), 0)
+
+    def test_flush_updates_in_bulk(self):
+        """Test a flush runs one UPDATE per distinct increment"""
+        for post, count in zip(self.posts, (2, 2, 5)):
+            for i in range(count):
+                self.view(post)
+        with CaptureQueriesContext(connection) as queries:
+            self.counter.flush()
+        updates = [q['sql'] for q in queries if q['sql'].startswith('UPDATE')]
+        self.assertEqual(len(updates), 2)
+        self.assertEqual(self.views(), [2, 2, 5])
+
+    def test_cache_hits_and_not_modified_are_counted(self):
+        """Test views served by the response cache or a 304 are counted"""
+        etag = self.view(self.posts[0])['ETag']
+        self.assertEqual(self.view(self.posts[0])['X-Cache'], 'HIT')
+        self.assertEqual(self.view(self.posts[0], HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.client.get('/api/v1/posts/00000000-0000-0000-0000-000000000000/')
+
+        self.counter.flush()
+        self.assertEqual(self.views(), [3, 0, 0])
+
+    def test_views_are_serialized(self):
+        """Test the stored count is exposed on posts"""
+        Post.objects.filter(pk=self.posts[0].pk).update(views=7)
+        response = self.view(self.posts[0])
+        self.assertEqual(response.json()['views'], 7)
+
+    def test_save_keeps_flushed_views(self):
+        """Test saving a loaded post does not overwrite the counter"""
+        post = Post.objects.get(pk=self.posts[0].pk)
+        self.view(post)
+        self.counter.flush()
+        post.title = 'Edited'
+        post.save()
+        self.assertEqual(self.views()[0], 1)
+
+    def test_batch_size_triggers_flush(self):
+        """Test the counter flushes once enough posts have pending views"""
+        self.counter.batch_size = 2
+        self.view(self.posts[0])
+        self.assertEqual(self.views(), [0, 0, 0])
+        self.view(self.posts[1])
+        self.assertEqual(self.views(), [1, 1, 0])
+
+    def test_shutdown_flushes_views(self):
+        """Test closing the counter on exit writes the pending views"""
+        self.view(self.posts[2])
+        close_view_counter()
+        self.assertEqual(self.views(), [0, 0, 1])
+
+    def test_disabled(self):
+        """Test views are not counted unless enabled"""
+        with override_settings(VIEW_COUNTER={'ENABLED': False}):
+            self.assertIsNone(get_view_counter())
+            self.view(self.posts[0])
+        self.assertEqual(self.views(), [0, 0, 0])
+
+
+@override_settings(VIEW_COUNTER=VIEW_COUNTER)
+class ConcurrentViewCounterTest(TransactionTestCase):
+    """Test cases for views counted by concurrent requests"""
+
+    def setUp(self):
+        """Set up test data"""
+        cache.clear()
+        user = User.objects.create_user(username='author', password='testpass123')
+        self.posts = [
+            Post.objects.create(title=f'Post {i}', content='Content', author=user)
+            for i in range(2)
+        ]
+
+    def tearDown(self):
+        close_view_counter()
+
+    def test_concurrent_requests(self):
+        """Test no view is lost when many requests count at once"""
+        threads_count, requests_count = 8, 24
+        errors = []
+
+        def browse():
+            client = Client()
+            try:
+                for i in range(requests_count):
+                    post = self.posts[i % 2]
+                    response = client.get(f'/api/v1/posts/{post.uuid}/')
+                    if response.status_code != 200:
+                        errors.append(response.status_code)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=browse) for i in range(threads_count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        get_view_counter().flush()
+        views = list(Post.objects.order_by('pk').values_list('views', flat=True))
+        self.assertEqual(views, [threads_count * requests_count // 2] * 2)
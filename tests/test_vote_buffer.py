@@ -0,0 +1,184 @@
+"""
+Test cases for the write-behind vote buffer
+"""
+from unittest import mock
+
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.contrib.auth.models import User
+from rest_framework import status
+
+from comments.models import PostComment
+from core.buffers import close_vote_buffer, get_vote_buffer
+from posts.models import Post, PostVote
+
+
+@override_settings(VOTE_BUFFER={'ENABLED': True, 'BATCH_SIZE': 100, 'FLUSH_INTERVAL': 3600})
+class VoteBufferTest(TestCase):
+    """Test cases for queued votes"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.author = User.objects.create_user(
+            username='author',
+            email='author@example.com',
+            password='testpass123'
+        )
+        self.voters = [
+            User.objects.create_user(username=f'voter{i}', password='testpass123')
+            for i in range(3)
+        ]
+        self.post = Post.objects.create(
+            title='Test Post',
+            content='Test content',
+            author=self.author
+        )
+        self.comment = PostComment.objects.create(
+            post=self.post,
+            user=self.author,
+            _comment='Test comment'
+        )
+        self.buffer = get_vote_buffer()
+
+    def tearDown(self):
+        close_vote_buffer()
+
+    def vote(self, user, method, url=None):
+        self.client.force_login(user)
+        url = url or f'/api/v1/posts/{self.post.uuid}'
+        return self.client.put(f'{url}/{method}/')
+
+    def test_votes_are_queued(self):
+        """Test votes are not written until the buffer is flushed"""
+        response = self.vote(self.voters[0], 'upvote')
+
+        self.assertEqual(response.json(), {'vote': 1, 'votes': 1})
+        self.assertFalse(PostVote.objects.exists())
+        self.assertEqual(len(self.buffer), 1)
+
+        self.assertEqual(self.buffer.flush(), 1)
+        self.post.refresh_from_db()
+        self.assertEqual((self.post.score, self.post.upvotes), (1, 1))
+        self.assertEqual(len(self.buffer), 0)
+
+    def test_toggles_are_coalesced(self):
+        """Test repeated toggles by one user are written as their last vote"""
+        for method in ('upvote', 'downvote', 'remove_vote', 'upvote', 'downvote'):
+            self.vote(self.voters[0], method)
+        self.assertEqual(len(self.buffer), 1)
+
+        self.buffer.flush()
+        votes = PostVote.objects.filter(post=self.post)
+        self.assertEqual(list(votes.values_list('vote', flat=True)), [-1])
+        self.post.refresh_from_db()
+        self.assertEqual((self.post.score, self.post.upvotes, self.post.downvotes), (-1, 0, 1))
+
+    def test_flush_writes_in_bulk(self):
+        """Test a flush uses the same statements for any number of votes"""
+        PostVote.objects.create(post=self.post, user=self.voters[2], vote=1)
+        self.vote(self.voters[0], 'upvote')
+        self.vote(self.voters[1], 'downvote')
+        self.vote(self.voters[2], 'remove_vote')
+        self.vote(self.voters[0], 'upvote', f'/api/v1/posts/{self.post.uuid}/comments/{self.comment.pk}')
+
+        with CaptureQueriesContext(connection) as queries:
+            self.buffer.flush()
+
+        statements = [q['sql'].split()[0] for q in queries]
+        self.assertEqual(statements.count('INSERT'), 2)
+        self.assertEqual(statements.count('DELETE'), 1)
+        self.post.refresh_from_db()
+        self.comment.refresh_from_db()
+        self.assertEqual((self.post.score, self.post.upvotes, self.post.downvotes), (0, 1, 1))
+        self.assertEqual(self.comment.score, 1)
+        self.assertEqual(PostVote.objects.count(), 2)
+
+    def test_batch_size_triggers_flush(self):
+        """Test the buffer flushes once it holds a full batch"""
+        self.buffer.batch_size = 2
+        self.vote(self.voters[0], 'upvote')
+        self.assertFalse(PostVote.objects.exists())
+
+        self.vote(self.voters[1], 'upvote')
+        self.assertEqual(PostVote.objects.count(), 2)
+        self.assertEqual(len(self.buffer), 0)
+
+    def test_voter_reads_own_queued_vote(self):
+        """Test a voter sees their queued vote before it is flushed"""
+        self.vote(self.voters[0], 'downvote')
+        response = self.client.get(f'/api/v1/posts/{self.post.uuid}/')
+        self.assertEqual(response.json()['user_vote']['vote'], -1)
+
+        response = self.client.get('/api/v1/posts/')
+        self.assertEqual(response.json()['results'][0]['user_vote']['vote'], -1)
+
+        comment_url = f'/api/v1/posts/{self.post.uuid}/comments/{self.comment.pk}'
+        self.vote(self.voters[0], 'upvote', comment_url)
+        response = self.client.get(f'{comment_url}/check_vote/')
+        self.assertEqual(response.json()['vote'], 1)
+
+        self.client.force_login(self.voters[1])
+        response = self.client.get(f'/api/v1/posts/{self.post.uuid}/')
+        self.assertIsNone(response.json()['user_vote'])
+
+    def test_queued_removal_hides_stored_vote(self):
+        """Test a queued vote removal hides the stored vote from the voter"""
+        PostVote.objects.create(post=self.post, user=self.voters[0], vote=1)
+        response = self.vote(self.voters[0], 'remove_vote')
+        self.assertEqual(response.json(), {'vote': 0, 'votes': 0})
+
+        response = self.client.get(f'/api/v1/posts/{self.post.uuid}/')
+        self.assertIsNone(response.json()['user_vote'])
+
+    def test_failed_flush_requeues_votes(self):
+        """Test votes of a failed flush are kept unless superseded"""
+        self.vote(self.voters[0], 'upvote')
+        self.vote(self.voters[1], 'upvote')
+
+        with mock.patch.object(Post, 'apply_vote_deltas', side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                self.buffer.flush()
+        self.assertFalse(PostVote.objects.exists())
+        self.assertEqual(len(self.buffer), 2)
+
+        self.vote(self.voters[1], 'downvote')
+        self.buffer.flush()
+        votes = dict(PostVote.objects.values_list('user__username', 'vote'))
+        self.assertEqual(votes, {'voter0': 1, 'voter1': -1})
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.score, 0)
+
+    def test_votes_of_deleted_targets_are_dropped(self):
+        """Test a post or voter deleted while votes are queued does not block the flush"""
+        live = Post.objects.create(title='Live', content='Live content', author=self.author)
+        self.vote(self.voters[0], 'upvote')
+        self.vote(self.voters[1], 'upvote', f'/api/v1/posts/{live.uuid}')
+        self.vote(self.voters[2], 'upvote', f'/api/v1/posts/{live.uuid}')
+        self.post.delete()
+        self.voters[2].delete()
+
+        with self.assertLogs('core.buffers', 'WARNING'):
+            self.buffer.flush()
+        self.assertEqual(
+            list(PostVote.objects.values_list('post', 'user')), [(live.pk, self.voters[1].pk)]
+        )
+        self.assertEqual(len(self.buffer), 0)
+        live.refresh_from_db()
+        self.assertEqual(live.score, 1)
+
+    def test_shutdown_flushes_votes(self):
+        """Test closing the buffer on exit writes the queued votes"""
+        self.vote(self.voters[0], 'upvote')
+        close_vote_buffer()
+
+        self.assertEqual(PostVote.objects.count(), 1)
+        self.assertIsNot(get_vote_buffer(), self.buffer)
+
+    def test_buffer_disabled_by_default(self):
+        """Test votes are written directly unless the buffer is enabled"""
+        with override_settings(VOTE_BUFFER={'ENABLED': False}):
+            self.assertIsNone(get_vote_buffer())
+            response = self.vote(self.voters[0], 'upvote')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(PostVote.objects.count(), 1)
@@ -1,11 +1,20 @@
 """
 Test cases for voting functionality
 """
+from io import StringIO
+from django.core.management import call_command
+from django.db import IntegrityError, connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.contrib.auth.models import User
 from rest_framework.test import APITestCase
 from rest_framework import status
+from comments.models import PostComment, PostCommentVote
+from comments.services import vote_comment
+from posts.cache import post_cache, post_scope
 from posts.models import Post, PostVote
+from posts.ranking import hot_rank
+from posts.services import vote_post
 
 
 class VotingModelTest(TestCase):
@@ -180,4 +189,176 @@ class VotingAPITest(APITestCase):
             status.HTTP_401_UNAUTHORIZED,
             status.HTTP_404_NOT_FOUND,
             status.HTTP_405_METHOD_NOT_ALLOWED
-        ])
\ No newline at end of file
+        ])
+
+
+class VoteCounterTest(TestCase):
+    """Test cases for the stored post vote counters"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.author = User.objects.create_user(
+            username='author',
+            email='author@example.com',
+            password='testpass123'
+        )
+        self.voter = User.objects.create_user(
+            username='voter',
+            email='voter@example.com',
+            password='testpass123'
+        )
+        self.post = Post.objects.create(
+            title='Test Post',
+            content='Test content',
+            author=self.author
+        )
+
+    def assertCounters(self, score, upvotes, downvotes):
+        self.post.refresh_from_db()
+        self.assertEqual(
+            (self.post.score, self.post.upvotes, self.post.downvotes),
+            (score, upvotes, downvotes)
+        )
+
+    def test_counters_follow_vote_changes(self):
+        """Test counters are shifted when a vote is created, changed and deleted"""
+        vote = PostVote.objects.create(user=self.voter, post=self.post, vote=1)
+        self.assertCounters(1, 1, 0)
+
+        vote.vote = -1
+        vote.save()
+        self.assertCounters(-1, 0, 1)
+
+        vote = PostVote.objects.get(pk=vote.pk)
+        vote.vote = 0
+        vote.save()
+        self.assertCounters(0, 0, 0)
+
+        vote.vote = 1
+        vote.save()
+        vote.delete()
+        self.assertCounters(0, 0, 0)
+
+    def test_counters_follow_cascade_delete(self):
+        """Test counters are decremented when the voter is deleted"""
+        PostVote.objects.create(user=self.voter, post=self.post, vote=-1)
+        self.voter.delete()
+        self.assertCounters(0, 0, 0)
+
+    def test_recount_counters_command(self):
+        """Test the recount command repairs drifted counters"""
+        PostVote.objects.create(user=self.voter, post=self.post, vote=1)
+        Post.objects.filter(pk=self.post.pk).update(score=10, upvotes=7, downvotes=3)
+
+        Post.objects.filter(pk=self.post.pk).update(hot_rank=0)
+        scopes = ['listing', post_scope(self.post.pk)]
+        versions = post_cache.versions(scopes)
+
+        call_command('recount_counters', stdout=StringIO())
+        self.assertCounters(1, 1, 0)
+        post = Post.objects.get(pk=self.post.pk)
+        self.assertEqual(post.hot_rank, hot_rank(1, post.created_at))
+        new_versions = post_cache.versions(scopes)
+        for scope in scopes:
+            self.assertNotEqual(new_versions[scope], versions[scope])
+
+    def test_vote_endpoint_reads_counters(self):
+        """Test the vote endpoint answers with the stored score"""
+        self.client.force_login(self.voter)
+        response = self.client.put(f'/api/v1/posts/{self.post.uuid}/downvote/')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json(), {'vote': -1, 'votes': -1})
+        self.assertCounters(-1, 0, 1)
+
+
+class VoteUpsertTest(TestCase):
+    """Test cases for the single statement vote upsert"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.author = User.objects.create_user(
+            username='author',
+            email='author@example.com',
+            password='testpass123'
+        )
+        self.voter = User.objects.create_user(
+            username='voter',
+            email='voter@example.com',
+            password='testpass123'
+        )
+        self.post = Post.objects.create(
+            title='Test Post',
+            content='Test content',
+            author=self.author
+        )
+        self.comment = PostComment.objects.create(
+            post=self.post,
+            user=self.author,
+            _comment='Test comment'
+        )
+
+    def test_duplicate_vote_rejected(self):
+        """Test the database refuses a second vote row for the same voter"""
+        PostVote.objects.create(user=self.voter, post=self.post, vote=1)
+        with self.assertRaises(IntegrityError):
+            PostVote.objects.create(user=self.voter, post=self.post, vote=-1)
+
+    def test_upsert_keeps_one_row(self):
+        """Test repeated votes update the same row and shift the counters"""
+        self.assertEqual(vote_post(self.post, self.voter, 1), 0)
+        self.assertEqual(vote_post(self.post, self.voter, -1), 1)
+        self.assertEqual(vote_post(self.post, self.voter, -1), -1)
+
+        votes = PostVote.objects.filter(user=self.voter, post=self.post)
+        self.assertEqual(list(votes.values_list('vote', flat=True)), [-1])
+        self.post.refresh_from_db()
+        self.assertEqual((self.post.score, self.post.upvotes, self.post.downvotes), (-1, 0, 1))
+
+    def test_remove_vote_deletes_row(self):
+        """Test removing a vote deletes the row instead of storing a 0"""
+        vote_post(self.post, self.voter, 1)
+        vote_post(self.post, self.voter, 0)
+
+        self.assertFalse(PostVote.objects.filter(user=self.voter, post=self.post).exists())
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.score, 0)
+
+    def test_vote_endpoint_queries(self):
+        """Test voting does not re-read the post counters"""
+        PostVote.objects.create(user=self.author, post=self.post, vote=1)
+        self.client.force_login(self.voter)
+        self.client.put(f'/api/v1/posts/{self.post.uuid}/upvote/')
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.put(f'/api/v1/posts/{self.post.uuid}/downvote/')
+
+        self.assertEqual(response.json(), {'vote': -1, 'votes': 0})
+        writes = [q['sql'] for q in queries if q['sql'].startswith('INSERT')]
+        self.assertEqual(len(writes), 1)
+        self.assertIn('ON CONFLICT', writes[0])
+
+    def test_comment_score_counter(self):
+        """Test comment votes keep the stored comment score current"""
+        other = User.objects.create_user(username='other', password='testpass123')
+        vote_comment(self.comment, self.voter, 1)
+        vote_comment(self.comment, other, 1)
+        vote_comment(self.comment, self.voter, -1)
+        self.comment.refresh_from_db()
+        self.assertEqual(self.comment.score, 0)
+
+        other.delete()
+        vote_comment(self.comment, self.voter, 0)
+        self.comment.refresh_from_db()
+        self.assertEqual(self.comment.score, 0)
+        self.assertFalse(PostCommentVote.objects.exists())
+
+    def test_comment_vote_endpoint(self):
+        """Test the comment vote endpoint answers with the new score"""
+        self.client.force_login(self.voter)
+        url = f'/api/v1/posts/{self.post.uuid}/comments/{self.comment.pk}'
+        response = self.client.put(f'{url}/upvote/')
+        self.assertEqual(response.json(), {'vote': 1, 'votes': 1})
+
+        response = self.client.get(f'{url}/check_vote/')
+        self.assertEqual(response.json(), {'vote': 1, 'votes': 1})